@@ -2,7 +2,10 @@ from datetime import date
 import json
 import streamlit as st
 
+from assistant.codec import as_dict
+from assistant.models import Course, LearningPlan, LearningPlanStep, UserProfile
 from assistant import (
+    WeeklyPlan,
     build_learning_plan,
     build_motivation_message,
     build_weekly_plan,
@@ -16,6 +19,8 @@ st.set_page_config(page_title="Learning Assistant", page_icon="🧠", layout="wi
 
 # ---------------- Utilities ----------------
 def to_dict(x):
+    if isinstance(x, (UserProfile, Course, LearningPlan, LearningPlanStep)):
+        return as_dict(x)
     if hasattr(x, "model_dump"):
         return x.model_dump()
     if hasattr(x, "dict"):
@@ -86,7 +91,7 @@ with st.sidebar:
     if gen_all:
         profile = build_profile_from_answers(name=name, answers=answers)
         courses = recommend_courses(profile, use_builtin_fallback=use_fallback)
-        plan = build_learning_plan(profile, courses)
+        plan = build_learning_plan(profile, courses, fit_to_budget=True)
         weekly_plan = build_weekly_plan(
             plan,
             weekly_time_hours=getattr(profile, "weekly_time_hours", 6),
@@ -112,7 +117,9 @@ with tab_plan:
         st.progress(st.session_state["progress"] / 100)
 
         wp = st.session_state["weekly_plan"]
-        if isinstance(wp, list):
+        if isinstance(wp, WeeklyPlan):
+            st.dataframe(list_of_dicts(wp.to_steps()), use_container_width=True)
+        elif isinstance(wp, list):
             st.dataframe(list_of_dicts(wp), use_container_width=True)
         else:
             st.code(json.dumps(to_dict(wp), ensure_ascii=False, indent=2), language="json")
@@ -1,33 +1,75 @@
 """Personal learning assistant package."""
 
-from .models import ConversationMessage, Course, LearningPlan, LearningPlanStep, UserProfile
+from .models import (
+    ConversationMessage,
+    Course,
+    FrozenPlanStep,
+    LearningPlan,
+    LearningPlanStep,
+    UserProfile,
+    WeeklyPlan,
+    WeeklyPlanStep,
+)
 from .planner import build_learning_plan, build_weekly_plan
+from .optimizer import select_courses_within_budget
+from .plan_cache import PlanCache, plan_cache_key
 from .recommender import recommend_courses
-from .motivation import build_motivation_message
+from .motivation import TemplateHistory, build_motivation_message, build_motivation_messages_batch
 from .logger import ConversationLogger
+from .async_logger import BackgroundConversationLogger
+from .log_segments import SegmentedConversationLogger
+from .conversation_store import PartitionedConversationStore
+from .sqlite_store import SQLiteConversationStore
+from .fulltext import FullTextIndex
 
 from .intake import (IntakeQuestion, build_profile_from_answers, build_profile_from_payload, intake_questions,)
 from .search import build_search_query, filter_searched_courses
 from .schemas import CurrentLevel, LearningProfilePayload, TimeCommitment
+from .importer import import_profiles, iter_profiles
+from .profile_store import FileProfileStore, ProfileChange, SQLiteProfileStore, open_profile_store
+from .validation import PayloadValidationError, compile_validator, parse_payload, parse_payloads
 
 __all__ = [
+    "BackgroundConversationLogger",
     "ConversationLogger",
     "ConversationMessage",
     "Course",
+    "FileProfileStore",
+    "FrozenPlanStep",
+    "FullTextIndex",
     "LearningPlan",
     "LearningPlanStep",
+    "PartitionedConversationStore",
+    "SQLiteConversationStore",
+    "SQLiteProfileStore",
+    "SegmentedConversationLogger",
     "UserProfile",
+    "WeeklyPlan",
+    "WeeklyPlanStep",
     "IntakeQuestion",
     "CurrentLevel",
     "LearningProfilePayload",
+    "PayloadValidationError",
+    "PlanCache",
+    "ProfileChange",
     "TimeCommitment",
     "build_profile_from_answers",
     "build_profile_from_payload",
     "build_learning_plan",
     "build_weekly_plan",
     "build_motivation_message",
+    "build_motivation_messages_batch",
+    "TemplateHistory",
     "build_search_query",
+    "compile_validator",
     "filter_searched_courses",
+    "import_profiles",
     "intake_questions",
+    "iter_profiles",
+    "open_profile_store",
+    "parse_payload",
+    "parse_payloads",
+    "plan_cache_key",
     "recommend_courses",
+    "select_courses_within_budget",
 ]
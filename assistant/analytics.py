@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import gzip
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+from .log_segments import MANIFEST_NAME
+from .logger import decode_record
+
+
+def empty_aggregates() -> Dict[str, Any]:
+    return {"total": 0, "messages_per_day": {}, "roles": {}, "sessions": {}}
+
+
+def fold_record(aggregates: Dict[str, Any], record: Dict[str, Any]) -> None:
+    """Count one decoded log record into an aggregates dict."""
+
+    per_day: Dict[str, int] = aggregates["messages_per_day"]
+    roles: Dict[str, int] = aggregates["roles"]
+    day = record["timestamp"][:10]
+    per_day[day] = per_day.get(day, 0) + 1
+    roles[record["role"]] = roles.get(record["role"], 0) + 1
+    session_id = record.get("session_id")
+    if session_id is not None:
+        sessions: Dict[str, int] = aggregates["sessions"]
+        sessions[session_id] = sessions.get(session_id, 0) + 1
+    aggregates["total"] += 1
+
+
+def merge_aggregates(into: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    into["total"] += other["total"]
+    for key in ("messages_per_day", "roles", "sessions"):
+        target: Dict[str, int] = into[key]
+        for name, count in other[key].items():
+            target[name] = target.get(name, 0) + count
+    return into
+
+
+def compacted_aggregates_path(log_path: str | Path) -> Path:
+    """Where compaction keeps the aggregates of records it removed from a log."""
+
+    path = Path(log_path)
+    return path / "compacted.json" if path.is_dir() else path.with_name(path.name + ".compacted.json")
+
+
+def load_compacted_aggregates(log_path: str | Path) -> Dict[str, Any]:
+    path = compacted_aggregates_path(log_path)
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"generation": 0, "aggregates": empty_aggregates()}
+
+
+def reader_cursors_path(log_path: str | Path) -> Path:
+    """Where readers record how far they have counted, so compaction can carry their position."""
+
+    path = Path(log_path)
+    return path / "cursors.json" if path.is_dir() else path.with_name(path.name + ".cursors.json")
+
+
+def load_reader_cursors(log_path: str | Path) -> Dict[str, Dict[str, Any]]:
+    path = reader_cursors_path(log_path)
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {}
+
+
+def save_reader_cursors(log_path: str | Path, cursors: Dict[str, Dict[str, Any]]) -> None:
+    target = reader_cursors_path(log_path)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(json.dumps(cursors, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, target)
+
+
+_CHECKPOINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    messages INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# SQLite's default limit on bound parameters is 999 in older builds.
+_IN_CHUNK = 500
+# Pending per-session deltas are written to the sessions table once this many have collected.
+_SESSION_FLUSH = 50_000
+
+
+def _bump(histogram: Dict[str, int], length: int, amount: int) -> None:
+    key = str(length)
+    count = histogram.get(key, 0) + amount
+    if count:
+        histogram[key] = count
+    else:
+        histogram.pop(key, None)
+
+
+def _histogram_stats(histogram: Dict[str, int]) -> Dict[str, Any]:
+    """Session count, mean, median and max of the lengths described by a {length: sessions} histogram."""
+
+    counts = sorted((int(length), n) for length, n in histogram.items() if n > 0)
+    sessions = sum(n for _, n in counts)
+    if not sessions:
+        return {"sessions": 0, "mean": 0.0, "median": 0, "max": 0}
+    lower: Optional[int] = None
+    upper = 0
+    seen = 0
+    for length, n in counts:
+        seen += n
+        if lower is None and seen > (sessions - 1) // 2:
+            lower = length
+        if seen > sessions // 2:
+            upper = length
+            break
+    assert lower is not None
+    return {
+        "sessions": sessions,
+        "mean": sum(length * n for length, n in counts) / sessions,
+        "median": lower if sessions % 2 else (lower + upper) / 2,
+        "max": counts[-1][0],
+    }
+
+
+class ConversationAnalytics:
+    """Incremental message statistics over a conversation log.
+
+    Works on a JSONL file (ConversationLogger) or a segment directory
+    (SegmentedConversationLogger). The checkpoint is a small SQLite file: one row stores how far
+    the log has been read (byte offset, or finished segments plus the offset into the active
+    one) with the per-day and per-role counts and a histogram of session lengths, and a
+    ``sessions`` table keeps each session's message count. ``update()`` only parses records
+    appended since the previous run and writes just the sessions they touched, in the same
+    transaction as the new position. Records removed by ``assistant.compaction`` stay in the
+    report through the aggregates it leaves next to the log.
+
+    Each update also leaves a cursor (its position) in ``<log>.cursors.json``. Compaction
+    translates that position into the rewritten log and notes which of the removed records had
+    already been counted, so the next update carries its aggregates across instead of
+    recounting. If the cursor does not match (say the update raced the compaction), the
+    remaining records are recounted once. Lines that cannot be decoded are skipped and counted.
+    """
+
+    def __init__(self, log_path: str | Path, checkpoint_path: str | Path | None = None) -> None:
+        self.log_path = Path(log_path)
+        if checkpoint_path is None:
+            checkpoint_path = (
+                self.log_path / "analytics.db"
+                if self.log_path.is_dir()
+                else self.log_path.with_name(self.log_path.name + ".analytics.db")
+            )
+        self.checkpoint_path = Path(checkpoint_path)
+        self._conn = sqlite3.connect(str(self.checkpoint_path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_CHECKPOINT_SCHEMA)
+        self._state = self._load_checkpoint()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ConversationAnalytics":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        row = self._conn.execute("SELECT data FROM state WHERE id = 0").fetchone()
+        return json.loads(row[0]) if row is not None else self._fresh_state()
+
+    @staticmethod
+    def _fresh_state() -> Dict[str, Any]:
+        aggregates = empty_aggregates()
+        aggregates["session_lengths"] = {}
+        return {
+            "version": 2,
+            "file": {"offset": 0, "inode": None},
+            "segments": {"done": [], "partial": {}},
+            "compaction_generation": 0,
+            "bad_records": 0,
+            "aggregates": aggregates,
+        }
+
+    def _reset(self) -> None:
+        self._state = self._fresh_state()
+        self._conn.execute("DELETE FROM sessions")
+
+    def _save_checkpoint(self) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO state (id, data) VALUES (0, ?)", (json.dumps(self._state, ensure_ascii=False),)
+        )
+
+    @property
+    def _cursor_name(self) -> str:
+        return str(self.checkpoint_path.resolve())
+
+    def _save_cursor(self) -> None:
+        cursors = load_reader_cursors(self.log_path)
+        if (self.log_path / MANIFEST_NAME).exists():
+            cursor: Dict[str, Any] = {"done": list(self._state["segments"]["done"])}
+        else:
+            cursor = {"offset": self._state["file"]["offset"], "inode": self._state["file"]["inode"]}
+        cursor.update(generation=self._state["compaction_generation"], removed=empty_aggregates())
+        cursors[self._cursor_name] = cursor
+        save_reader_cursors(self.log_path, cursors)
+
+    def _carry_over(self, generation: int) -> bool:
+        """Adopt the position compaction translated for this reader; False when it cannot be used."""
+
+        cursor = load_reader_cursors(self.log_path).get(self._cursor_name)
+        if cursor is None or cursor.get("generation") != generation:
+            return False
+        if "done" in cursor:
+            if cursor["done"] != self._state["segments"]["done"]:
+                return False
+        else:
+            position = self._state["file"]
+            translated_from = (cursor.get("from_offset"), cursor.get("from_inode"))
+            if translated_from != (position["offset"], position["inode"]):
+                return False
+            position["offset"], position["inode"] = cursor["offset"], cursor["inode"]
+        self._subtract(cursor["removed"])
+        return True
+
+    def _subtract(self, removed: Dict[str, Any]) -> None:
+        """Take records that compaction removed, and that were already counted, out of the aggregates."""
+
+        aggregates = self._state["aggregates"]
+        aggregates["total"] -= removed["total"]
+        for key in ("messages_per_day", "roles"):
+            for name, count in removed[key].items():
+                left = aggregates[key].get(name, 0) - count
+                if left > 0:
+                    aggregates[key][name] = left
+                else:
+                    aggregates[key].pop(name, None)
+        self._flush_sessions()
+        lengths: Dict[str, int] = aggregates["session_lengths"]
+        existing = self._session_counts(list(removed["sessions"]))
+        updates = []
+        for session_id, count in removed["sessions"].items():
+            old = existing.get(session_id, 0)
+            if not old:
+                continue
+            _bump(lengths, old, -1)
+            if old > count:
+                _bump(lengths, old - count, 1)
+            updates.append((old - count, session_id))
+        self._conn.executemany("UPDATE sessions SET messages = ? WHERE session_id = ?", updates)
+        self._conn.execute("DELETE FROM sessions WHERE messages <= 0")
+
+    def _session_counts(self, session_ids: List[str]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for i in range(0, len(session_ids), _IN_CHUNK):
+            chunk = session_ids[i : i + _IN_CHUNK]
+            query = f"SELECT session_id, messages FROM sessions WHERE session_id IN ({','.join('?' * len(chunk))})"
+            counts.update(self._conn.execute(query, chunk))
+        return counts
+
+    def _flush_sessions(self) -> None:
+        """Add the pending per-session counts to the sessions table and the length histogram."""
+
+        pending: Dict[str, int] = self._state["aggregates"]["sessions"]
+        if not pending:
+            return
+        lengths: Dict[str, int] = self._state["aggregates"]["session_lengths"]
+        existing = self._session_counts(list(pending))
+        rows = []
+        for session_id, added in pending.items():
+            old = existing.get(session_id, 0)
+            if old:
+                _bump(lengths, old, -1)
+            _bump(lengths, old + added, 1)
+            rows.append((session_id, old + added))
+        self._conn.executemany(
+            "INSERT INTO sessions (session_id, messages) VALUES (?, ?) "
+            "ON CONFLICT (session_id) DO UPDATE SET messages = excluded.messages",
+            rows,
+        )
+        pending.clear()
+
+    # ---------------- Updating ----------------
+
+    def update(self) -> int:
+        """Fold newly appended records into the aggregates, save the checkpoint and return the count."""
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            generation = load_compacted_aggregates(self.log_path)["generation"]
+            if self._state.get("version") != 2:
+                self._reset()
+            if self._state["compaction_generation"] != generation:
+                if not self._carry_over(generation):
+                    self._reset()  # records were rewritten or removed; recount
+                self._state["compaction_generation"] = generation
+            if (self.log_path / MANIFEST_NAME).exists():
+                processed = self._update_segments()
+            elif self.log_path.is_file():
+                processed = self._update_file()
+            else:
+                processed = 0
+            self._flush_sessions()
+            self._save_checkpoint()
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            self._state = self._load_checkpoint()
+            raise
+        self._conn.execute("COMMIT")
+        self._save_cursor()
+        return processed
+
+    def _update_file(self) -> int:
+        stat = self.log_path.stat()
+        position = self._state["file"]
+        if position["inode"] not in (None, stat.st_ino) or stat.st_size < position["offset"]:
+            # The log was replaced or truncated underneath us; recount from scratch.
+            generation = self._state["compaction_generation"]
+            self._reset()
+            self._state["compaction_generation"] = generation
+            position = self._state["file"]
+        position["inode"] = stat.st_ino
+        with self.log_path.open("rb") as fh:
+            fh.seek(position["offset"])
+            processed, consumed = self._consume(fh)
+        position["offset"] += consumed
+        return processed
+
+    def _update_segments(self) -> int:
+        manifest = json.loads((self.log_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        progress = self._state["segments"]
+        done = set(progress["done"])
+        partial: Dict[str, int] = progress["partial"]
+        entries = [(seg, True) for seg in manifest.get("segments", [])]
+        if manifest.get("active"):
+            entries.append((manifest["active"], False))
+
+        processed = 0
+        for seg, closed in entries:
+            name = seg["name"]
+            base = name[: -len(".gz")] if name.endswith(".gz") else name
+            if base in done:
+                continue
+            path = self.log_path / name
+            if not path.exists() and (self.log_path / (name + ".gz")).exists():
+                path = self.log_path / (name + ".gz")  # compressed since the manifest was read
+            if not path.exists():
+                continue
+            opener = gzip.open if path.suffix == ".gz" else open
+            with opener(path, "rb") as fh:
+                fh.seek(partial.get(base, 0))
+                count, consumed = self._consume(fh)
+            processed += count
+            if closed:
+                done.add(base)
+                partial.pop(base, None)
+            else:
+                partial[base] = partial.get(base, 0) + consumed
+        progress["done"] = sorted(done)
+        return processed
+
+    def _consume(self, fh: BinaryIO) -> Tuple[int, int]:
+        aggregates = self._state["aggregates"]
+        processed = 0
+        consumed = 0
+        for line in fh:
+            if not line.endswith(b"\n"):
+                break  # partial record still being written; pick it up next run
+            consumed += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = decode_record(line)
+                if not isinstance(record["timestamp"], str) or not isinstance(record["role"], str):
+                    raise TypeError("timestamp and role must be strings")
+            except (ValueError, KeyError, TypeError):  # torn or corrupt record; skip it like log_tools
+                self._state["bad_records"] = self._state.get("bad_records", 0) + 1
+                continue
+            fold_record(aggregates, record)
+            processed += 1
+            if len(aggregates["sessions"]) >= _SESSION_FLUSH:
+                self._flush_sessions()
+        return processed, consumed
+
+    # ---------------- Reporting ----------------
+
+    def report(self) -> Dict[str, Any]:
+        """Return messages per day, role ratios and session-length statistics as a plain dict."""
+
+        removed = load_compacted_aggregates(self.log_path)["aggregates"]
+        aggregates = merge_aggregates(copy.deepcopy(self._state["aggregates"]), removed)
+        # Sessions that lost records to compaction: move them to their combined length.
+        lengths: Dict[str, int] = aggregates["session_lengths"]
+        existing = self._session_counts(list(removed["sessions"]))
+        for session_id, count in removed["sessions"].items():
+            old = existing.get(session_id, 0)
+            if old:
+                _bump(lengths, old, -1)
+            _bump(lengths, old + count, 1)
+        total = aggregates["total"]
+        return {
+            "total_messages": total,
+            "messages_per_day": dict(sorted(aggregates["messages_per_day"].items())),
+            "role_counts": dict(aggregates["roles"]),
+            "role_ratios": {role: count / total for role, count in aggregates["roles"].items()} if total else {},
+            "session_length": _histogram_stats(lengths),
+            "bad_records": self._state.get("bad_records", 0),
+        }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m assistant.analytics", description="Update and print conversation analytics.")
+    parser.add_argument("log_path", help="JSONL log file or segmented log directory")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: next to the log)")
+    args = parser.parse_args(argv)
+
+    with ConversationAnalytics(args.log_path, args.checkpoint) as analytics:
+        analytics.update()
+        print(json.dumps(analytics.report(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import math
+import re
+from functools import lru_cache
+from typing import Dict, Optional
+
+# Free-text intake answers ("10h", "5-7 hours a week", "two months", "newbie") turned into the
+# numbers and level names UserProfile expects. Patterns and tables are built once at import.
+
+_WORD_NUMBERS: Dict[str, float] = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19, "twenty": 20,
+    "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "half": 0.5, "couple": 2, "few": 3,
+    "several": 4, "dozen": 12, "half a": 0.5, "half an": 0.5,
+}
+_TENS = ("twenty", "thirty", "forty", "fifty")
+_UNITS = ("one", "two", "three", "four", "five", "six", "seven", "eight", "nine")
+
+# Hours per unit of time for weekly study time, and weeks per unit for plan length.
+# Months count as four weeks, as in the intake guidance ("8 for two months").
+_HOUR_UNITS: Dict[str, float] = {
+    "h": 1, "hr": 1, "hrs": 1, "hour": 1, "hours": 1,
+    "m": 1 / 60, "min": 1 / 60, "mins": 1 / 60, "minute": 1 / 60, "minutes": 1 / 60,
+}
+_PER_WEEK: Dict[str, float] = {
+    "day": 7, "daily": 7, "night": 7, "evening": 7, "weekday": 5, "weekdays": 5, "weekend": 2,
+    "weekends": 2, "week": 1, "wk": 1, "weekly": 1, "month": 1 / 4, "monthly": 1 / 4,
+}
+_WEEK_UNITS: Dict[str, float] = {
+    "d": 1 / 7, "day": 1 / 7, "days": 1 / 7, "w": 1, "wk": 1, "wks": 1, "week": 1, "weeks": 1,
+    "mo": 4, "mos": 4, "month": 4, "months": 4, "y": 52, "yr": 52, "yrs": 52, "year": 52, "years": 52,
+    "quarter": 13, "quarters": 13, "semester": 16, "semesters": 16,
+}
+
+_LEVEL_SYNONYMS: Dict[str, str] = {
+    "beginner": "beginner", "novice": "beginner", "newbie": "beginner", "new": "beginner",
+    "starter": "beginner", "basic": "beginner", "entry": "beginner", "entry level": "beginner",
+    "just starting": "beginner", "no experience": "beginner", "zero": "beginner",
+    "junior": "beginner", "introductory": "beginner", "intro": "beginner", "total beginner": "beginner",
+    "complete beginner": "beginner", "absolute beginner": "beginner",
+    "intermediate": "intermediate", "mid": "intermediate", "middle": "intermediate",
+    "medium": "intermediate", "moderate": "intermediate", "some experience": "intermediate",
+    "familiar": "intermediate", "comfortable": "intermediate", "decent": "intermediate",
+    "improver": "intermediate",
+    "advanced": "advanced", "expert": "advanced", "pro": "advanced", "professional": "advanced",
+    "senior": "advanced", "experienced": "advanced", "proficient": "advanced", "master": "advanced",
+}
+
+# Placeholders that exports and forms use for a missing answer; they name no level.
+_BLANK_ANSWERS = frozenset(("none", "null", "nan", "n/a", "na", "-"))
+
+
+def _alternation(words) -> str:
+    return "|".join(sorted((re.escape(w) for w in words), key=len, reverse=True))
+
+
+_WORD = (
+    rf"(?:{_alternation(_TENS)})[\s-]+(?:{_alternation(_UNITS)})"
+    rf"|(?:an?\s+)?(?:{_alternation(_WORD_NUMBERS)})(?:\s+and\s+a\s+half)?"
+)
+# "1,000" groups thousands; "1,5" is a decimal comma.
+_DIGITS = r"\d{1,3}(?:,\d{3})+(?!\d)(?:\.\d+)?|\d+(?:[.,]\d+)?"
+_NUMBER = rf"(?:{_DIGITS}|{_WORD})"
+_AMOUNT_RE = re.compile(
+    rf"(?<![\w.])(?:between\s+(?P<from>{_NUMBER})\s+and\s+(?P<to>{_NUMBER})"
+    rf"|(?P<lo>{_NUMBER})(?:\s*(?:-|–|—|to|or)\s*(?P<hi>{_NUMBER}))?)"
+    r"(?:\s+of)?\s*(?P<unit>[a-z]+)?(?:\s*(?:/|per|a|an|each|every|on)\s*(?P<per>[a-z]+)|\s+(?P<freq>daily|weekly))?"
+)
+_NUMERIC_RE = re.compile(_DIGITS)
+_THOUSANDS_RE = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?")
+_LEVEL_RE = re.compile(rf"\b(?:{_alternation(_LEVEL_SYNONYMS)})\b")
+
+
+def _number(token: str) -> float:
+    token = token.strip()
+    if _THOUSANDS_RE.fullmatch(token):
+        return float(token.replace(",", ""))
+    if _NUMERIC_RE.fullmatch(token):
+        return float(token.replace(",", "."))
+    if token in _WORD_NUMBERS:
+        return _WORD_NUMBERS[token]
+    value = 0.0
+    if token.endswith("and a half"):
+        value = 0.5
+        token = token[: -len("and a half")].strip()
+    words = re.split(r"[\s-]+", token)
+    if len(words) > 1 and words[0] in ("a", "an"):
+        words = words[1:]  # "a couple", "a dozen"
+    return value + sum(_WORD_NUMBERS[w] for w in words)
+
+
+def _amount(
+    text: str, units: Dict[str, float], default_unit: float, per: Optional[Dict[str, float]]
+) -> Optional[float]:
+    """First number (or range) in text with a known or no unit, scaled to the target unit."""
+
+    for match in _AMOUNT_RE.finditer(text):
+        lo_text, hi_text = (match["from"], match["to"]) if match["from"] else (match["lo"], match["hi"])
+        unit = match["unit"]
+        if unit is None and lo_text in ("a", "an"):
+            continue  # the article, not "an hour"
+        if unit is not None and unit not in units:
+            if per is None or unit not in per:
+                continue  # "2 courses", "step 3"
+            per_unit, unit_scale = unit, default_unit  # "10 weekly"
+        else:
+            per_unit, unit_scale = match["per"] or match["freq"], units[unit] if unit else default_unit
+        lo = _number(lo_text)
+        value = (lo + _number(hi_text)) / 2 if hi_text else lo
+        value *= unit_scale
+        if per is not None and per_unit is not None:
+            value *= per.get(per_unit, 1)
+        return value
+    return None
+
+
+@lru_cache(maxsize=65536)
+def _parse_hours(text: str) -> Optional[int]:
+    value = _amount(text, _HOUR_UNITS, 1, _PER_WEEK)
+    return None if value is None or value <= 0 else max(1, int(value + 0.5))
+
+
+@lru_cache(maxsize=65536)
+def _parse_weeks(text: str) -> Optional[int]:
+    value = _amount(text, _WEEK_UNITS, 1, None)
+    return None if value is None or value <= 0 else max(1, math.ceil(value - 1e-9))
+
+
+def parse_hours(answer: Optional[str]) -> Optional[int]:
+    """Weekly study hours from a free-text answer, or None when there is no usable number.
+
+    Accepts units ("10h", "90 minutes"), rates ("1 hour a day" -> 7), ranges ("5-7" -> 6) and
+    number words ("ten", "a couple of hours"). Results are rounded to whole hours.
+    """
+
+    if not answer:
+        return None
+    if answer.isdigit():
+        return int(answer)
+    return _parse_hours(answer.strip().lower())
+
+
+def parse_weeks(answer: Optional[str]) -> Optional[int]:
+    """Plan length in weeks from a free-text answer ("8", "2 months" -> 8, "six weeks", "1 year")."""
+
+    if not answer:
+        return None
+    if answer.isdigit():
+        return int(answer)
+    return _parse_weeks(answer.strip().lower())
+
+
+@lru_cache(maxsize=4096)
+def _parse_level(text: str) -> Optional[str]:
+    match = _LEVEL_RE.search(text)
+    return _LEVEL_SYNONYMS[match.group()] if match else None
+
+
+def parse_level(answer: Optional[str]) -> Optional[str]:
+    """Canonical level ("beginner", "intermediate", "advanced") for an answer such as "newbie".
+
+    Answers that name no known level are returned stripped but otherwise unchanged, and blank
+    answers (including placeholders such as "None" or "n/a") give None.
+    """
+
+    text = (answer or "").strip()
+    if not text or text.lower() in _BLANK_ANSWERS:
+        return None
+    return _parse_level(text.lower()) or text
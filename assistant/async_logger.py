@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .batch import chunked
+from .logger import ConversationLogger
+from .models import ConversationMessage
+
+QUEUE_FULL_POLICIES = ("block", "drop_oldest", "spill")
+
+_STOP = object()
+
+
+class BackgroundConversationLogger:
+    """Conversation logger whose disk writes happen on a dedicated writer thread.
+
+    ``append`` only enqueues the message; the writer drains the bounded queue in batches into a
+    buffered ConversationLogger. When the queue is full, ``on_full`` decides what happens:
+    "block" waits for room, "drop_oldest" discards the oldest queued message, and "spill" writes
+    the message synchronously to a sidecar log (``<log>.spill.jsonl`` by default). Call
+    ``close()`` (or use a ``with`` block) to drain the queue on shutdown. If ``close(timeout)``
+    gives up waiting, the writer stops writing once its current batch is done and counts
+    whatever is still queued as dropped.
+
+    Messages left in the sidecar by an earlier run are replayed into the main log when the
+    logger starts, after any already there, and the sidecar is then removed. A crash during the
+    replay can write some of them twice.
+    """
+
+    def __init__(
+        self,
+        log_path: str | Path = "conversation_log.jsonl",
+        *,
+        max_queue: int = 10_000,
+        batch_size: int = 512,
+        on_full: str = "block",
+        spill_path: str | Path | None = None,
+        fsync: str = "none",
+    ) -> None:
+        if on_full not in QUEUE_FULL_POLICIES:
+            raise ValueError(f"on_full must be one of {QUEUE_FULL_POLICIES}, got {on_full!r}")
+        self.on_full = on_full
+        self.batch_size = batch_size
+        self._logger = ConversationLogger(log_path, buffered=True, flush_interval=None, fsync=fsync)
+        self.log_path = self._logger.log_path
+        self.spill_path = Path(spill_path or self.log_path.with_name(self.log_path.stem + ".spill.jsonl"))
+        self._counts = {"enqueued": 0, "written": 0, "dropped": 0, "spilled": 0, "replayed": 0, "errors": 0}
+        self._replay_spill()
+        self._spill: Optional[ConversationLogger] = None
+        if on_full == "spill":
+            self._spill = ConversationLogger(self.spill_path, fsync=fsync)
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._counts_lock = threading.Lock()
+        # Held while checking _closed and enqueueing, so nothing can be queued behind _STOP.
+        self._state_lock = threading.Lock()
+        self._closed = False
+        # Held by the writer around each batch; close() takes it to stop a writer it stopped waiting for.
+        self._write_lock = threading.Lock()
+        self._abandoned = False
+        self.last_error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._run, name="conversation-log-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, message: ConversationMessage) -> None:
+        with self._state_lock:
+            if self._closed:
+                raise RuntimeError("BackgroundConversationLogger is closed")
+            self._enqueue(message)
+
+    def _enqueue(self, message: ConversationMessage) -> None:
+        if self.on_full == "block":
+            self._queue.put(message)
+            self._count("enqueued")
+            return
+        try:
+            self._queue.put_nowait(message)
+            self._count("enqueued")
+            return
+        except queue.Full:
+            pass
+        if self.on_full == "spill":
+            assert self._spill is not None
+            self._spill.append(message)
+            self._count("spilled")
+            return
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                self._queue.task_done()
+                self._count("dropped")
+            try:
+                self._queue.put_nowait(message)
+            except queue.Full:
+                continue
+            self._count("enqueued")
+            return
+
+    def extend(self, messages: Iterable[ConversationMessage]) -> None:
+        for msg in messages:
+            self.append(msg)
+
+    def flush(self) -> None:
+        """Block until every queued message has been written and flushed."""
+
+        self._queue.join()
+        self._logger.flush()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting messages, drain the queue and close the log file.
+
+        When the writer is still busy after ``timeout`` seconds, it is told to stop; messages it
+        has not written by then are counted as dropped instead of landing in the closed log.
+        """
+
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._writer.join(timeout)
+        # Set before taking the lock: the writer may re-take it between batches ahead of us.
+        self._abandoned = self._writer.is_alive()
+        with self._write_lock:
+            buffered = self._logger.buffered_records
+            self._logger.close()
+            self._count("written", buffered)
+
+    def __enter__(self) -> "BackgroundConversationLogger":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters plus the current queue depth."""
+
+        with self._counts_lock:
+            counts = dict(self._counts)
+        counts["queue_depth"] = self._queue.qsize()
+        return counts
+
+    def load(self) -> List[ConversationMessage]:
+        """Return the messages in the main log (messages spilled by this run are in the sidecar file)."""
+
+        self.flush()
+        return self._logger.load()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._counts_lock:
+            self._counts[key] += amount
+
+    def _replay_spill(self) -> None:
+        if not self.spill_path.exists():
+            return
+        spill = ConversationLogger(self.spill_path)
+        for batch in chunked(spill.iter_messages(), self.batch_size):
+            self._logger.extend(batch)
+            self._counts["replayed"] += len(batch)
+        self._logger.flush()
+        self.spill_path.unlink()
+
+    def _run(self) -> None:
+        stopping = False
+        while True:
+            try:
+                # After _STOP, keep draining whatever is still queued instead of leaving it unacked.
+                item = self._queue.get_nowait() if stopping else self._queue.get()
+            except queue.Empty:
+                return
+            batch: List[ConversationMessage] = []
+            taken = 0
+            while True:
+                taken += 1
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)  # type: ignore[arg-type]
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                with self._write_lock:
+                    if self._abandoned:
+                        self._count("dropped", len(batch))
+                    else:
+                        self._write_batch(batch, flush=stopping or self._queue.empty())
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: List[ConversationMessage], *, flush: bool) -> None:
+        # Earlier batches may still sit in the logger's buffer; they are written (or fail) with this one.
+        unwritten = self._logger.buffered_records + len(batch)
+        try:
+            if batch:
+                self._logger.extend(batch)
+            if flush:
+                self._logger.flush()
+        except Exception as exc:  # keep draining so producers never deadlock on a dead writer
+            self.last_error = exc
+            failed = self._logger.discard_buffer()
+            self._count("errors", failed)
+            self._count("written", unwritten - failed)
+        else:
+            self._count("written", unwritten - self._logger.buffered_records)
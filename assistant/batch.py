@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from .codec import as_dict
+from .intake import build_profile_from_answers
+from .motivation import build_motivation_message
+from .plan_cache import PlanCache
+from .planner import build_weekly_plan
+from .recommender import recommend_courses
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def read_records(path: str | Path) -> Iterator[Dict[str, Any]]:
+    """Stream rows from a CSV file (by header) or a JSON Lines file, one dict per record."""
+
+    path = Path(path)
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(fh)
+            return
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_records(path: str | Path, start: int = 0) -> Iterator[Tuple[int, Union[Dict[str, Any], ValueError]]]:
+    """Like read_records, but yield (end offset, record) pairs, resuming at byte offset ``start``.
+
+    The end offset points just past the record, so saving it and passing it back as ``start``
+    continues with the next record. A row that cannot be parsed (invalid JSON, a JSON value that
+    is not an object, a CSV row with the wrong number of columns) is yielded as a ValueError in
+    place of the record, so the caller can report it and carry on.
+    """
+
+    path = Path(path)
+    with path.open("rb") as fh:
+        if path.suffix.lower() == ".csv":
+            yield from _iter_csv(fh, start)
+            return
+        fh.seek(start)
+        offset = start
+        for line in fh:
+            offset += len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:  # JSONDecodeError and invalid UTF-8
+                yield offset, ValueError(f"invalid JSON: {exc}")
+                continue
+            yield offset, record if isinstance(record, dict) else ValueError("expected a JSON object")
+
+
+def _iter_csv(fh: BinaryIO, start: int) -> Iterator[Tuple[int, Union[Dict[str, Any], ValueError]]]:
+    offset = 0
+
+    def lines() -> Iterator[str]:
+        nonlocal offset
+        for raw in fh:
+            offset += len(raw)
+            yield raw.decode("utf-8-sig" if offset == len(raw) else "utf-8")
+
+    # csv.reader pulls one line at a time, so after each row ``offset`` is exactly its end.
+    reader = csv.reader(lines())
+    header = next(reader, None)
+    if header is None:
+        return
+    if start > offset:
+        fh.seek(start)
+        offset = start
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != len(header):
+            yield offset, ValueError(f"expected {len(header)} columns, got {len(row)}")
+        else:
+            yield offset, dict(zip(header, row))
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def ordered_map(
+    fn: Callable[[T], R], items: Iterable[T], *, workers: Optional[int] = None, window: Optional[int] = None
+) -> Iterator[R]:
+    """Apply fn across a process pool and yield results in input order.
+
+    At most ``window`` items are in flight, so the input is consumed lazily and memory stays
+    bounded. ``workers=1`` runs inline, which is handy for debugging.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(fn, items)
+        return
+
+    window = window or workers * 2
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+@dataclass
+class Checkpoint:
+    """Resumable progress marker: records consumed from the input and bytes committed to the output.
+
+    ``input_offset`` is the byte offset just past the last consumed record, when the reader
+    tracks one, so a resumed run can seek there instead of re-reading the skipped rows.
+    """
+
+    path: Path
+    records: int = 0
+    output_bytes: int = 0
+    input_offset: int = 0
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Checkpoint":
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        return cls(
+            path,
+            records=payload["records"],
+            output_bytes=payload["output_bytes"],
+            input_offset=payload.get("input_offset", 0),
+        )
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        payload = {
+            "records": self.records,
+            "output_bytes": self.output_bytes,
+            "input_offset": self.input_offset,
+        }
+        tmp.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def _answers_from_record(record: Dict[str, Any]) -> Dict[str, str]:
+    answers: Dict[str, str] = {}
+    for key, value in record.items():
+        if value is None:
+            answers[key] = ""
+        elif isinstance(value, (list, tuple)):
+            answers[key] = (";" if key == "phased_focus" else ", ").join(str(v) for v in value)
+        else:
+            answers[key] = str(value)
+    return answers
+
+
+# One cache per process: pool workers each keep their own, and learners with the same courses,
+# phases and budget share one set of plan steps.
+_PLAN_CACHE = PlanCache(max_entries=4096)
+
+
+def run_pipeline(record: Dict[str, Any], *, use_builtin_fallback: bool = True) -> Dict[str, Any]:
+    """Run intake → recommendations → plan → weekly plan → motivation for one learner."""
+
+    answers = _answers_from_record(record)
+    profile = build_profile_from_answers(name=answers.get("name") or "Learner", answers=answers)
+    courses = recommend_courses(profile, use_builtin_fallback=use_builtin_fallback)
+    steps, notes = _PLAN_CACHE.shared_plan(profile, courses, fit_to_budget=True)
+    weekly_plan = build_weekly_plan(
+        steps,
+        weekly_time_hours=profile.weekly_time_hours,
+        timeframe_weeks=profile.timeframe_weeks,
+    )
+    return {
+        "profile": as_dict(profile),
+        "courses": [as_dict(c) for c in courses],
+        "plan": {
+            "goal": profile.learning_goal,
+            "steps": [as_dict(step) for step in steps],
+            "notes": list(notes),
+        },
+        "weekly_plan": [as_dict(step) for step in weekly_plan.to_steps()],
+        "motivation": build_motivation_message(profile),
+    }
+
+
+def _run_chunk(chunk: List[Tuple[int, Union[Dict[str, Any], ValueError]]]) -> List[str]:
+    lines: List[str] = []
+    for index, record in chunk:
+        try:
+            if isinstance(record, ValueError):
+                raise record  # a row iter_records could not parse
+            result = {"index": index, **run_pipeline(record)}
+        except Exception as exc:  # one bad row must not sink the whole batch
+            result = {"index": index, "error": f"{type(exc).__name__}: {exc}"}
+        lines.append(json.dumps(result, ensure_ascii=False) + "\n")
+    return lines
+
+
+def run_batch(
+    input_path: str | Path,
+    output_path: str | Path,
+    *,
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+    checkpoint_path: str | Path | None = None,
+    overwrite: bool = False,
+) -> int:
+    """Run the full pipeline for every learner in input_path and stream JSONL results in input order.
+
+    Progress is checkpointed after each chunk; rerunning with the same paths seeks straight to
+    the input offset after the last committed chunk (any partially written output is truncated
+    first). Rows that cannot be parsed get an ``error`` result like rows whose pipeline fails.
+    Without a checkpoint to resume from, a non-empty output file is only replaced when
+    overwrite=True; otherwise FileExistsError is raised. Returns the number of records
+    processed in this run.
+    """
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = Path(checkpoint_path or output_path.with_name(output_path.name + ".ckpt"))
+    if not overwrite and not checkpoint_path.exists() and output_path.exists() and output_path.stat().st_size:
+        raise FileExistsError(
+            f"{output_path} already holds results and there is no checkpoint to resume from; "
+            "pass overwrite=True (--overwrite) to replace it"
+        )
+    checkpoint = Checkpoint.load(checkpoint_path)
+
+    source = iter_records(input_path, checkpoint.input_offset)
+    # Chunk end offsets stay in this process; ordered_map returns results in the same order.
+    chunk_ends: Deque[int] = deque()
+    first_index = checkpoint.records
+
+    def tasks() -> Iterator[List[Tuple[int, Union[Dict[str, Any], ValueError]]]]:
+        for chunk in chunked(enumerate(source, start=first_index), chunk_size):
+            chunk_ends.append(chunk[-1][1][0])
+            yield [(index, record) for index, (_, record) in chunk]
+
+    processed = 0
+    with output_path.open("ab") as out:
+        out.truncate(checkpoint.output_bytes)
+        out.seek(checkpoint.output_bytes)
+        for lines in ordered_map(_run_chunk, tasks(), workers=workers):
+            out.write("".join(lines).encode("utf-8"))
+            out.flush()
+            processed += len(lines)
+            checkpoint.records += len(lines)
+            checkpoint.input_offset = chunk_ends.popleft()
+            checkpoint.output_bytes = out.tell()
+            checkpoint.save()
+    return processed
@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import json
+import struct
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, Union
+
+from .models import Course, FrozenPlanStep, LearningPlan, LearningPlanStep, UserProfile
+
+SCHEMA_VERSION = 2
+# Version 2 added UserProfile.learner_id; version 1 records still decode.
+SUPPORTED_VERSIONS = (1, 2)
+
+Model = Union[UserProfile, Course, LearningPlan, LearningPlanStep]
+
+_MAGIC = b"LA"
+_HEADER = struct.Struct("<2sBB")
+_U32 = struct.Struct("<I")
+_PROFILE_FIXED_V1 = struct.Struct("<?i?iIIII")
+_PROFILE_FIXED = struct.Struct("<?i?iIIII?")
+_STEP_FIXED = struct.Struct("<?iI")
+_PLAN_FIXED = struct.Struct("<II")
+
+_TAG_PROFILE = 1
+_TAG_COURSE = 2
+_TAG_STEP = 3
+_TAG_PLAN = 4
+
+
+class CodecError(ValueError):
+    """Raised when encoded data is malformed or from an unsupported schema version."""
+
+
+# ---------------- Plain dicts / JSON ----------------
+
+
+def _step_dict(step: Union[LearningPlanStep, FrozenPlanStep]) -> Dict[str, Any]:
+    return {
+        "title": step.title,
+        "description": step.description,
+        "resources": list(step.resources),
+        "est_time_hours": step.est_time_hours,
+    }
+
+
+def _step_from_dict(data: Dict[str, Any]) -> LearningPlanStep:
+    return LearningPlanStep(
+        title=data["title"],
+        description=data["description"],
+        resources=list(data.get("resources") or []),
+        est_time_hours=data.get("est_time_hours"),
+    )
+
+
+def as_dict(obj: Union[Model, FrozenPlanStep]) -> Dict[str, Any]:
+    """Return the model's fields as plain JSON-compatible values, without a version header."""
+
+    if isinstance(obj, UserProfile):
+        return {
+            "name": obj.name,
+            "learning_goal": obj.learning_goal,
+            "interested_topics": list(obj.interested_topics),
+            "current_level": obj.current_level,
+            "provider_requirements": list(obj.provider_requirements),
+            "weekly_time_hours": obj.weekly_time_hours,
+            "timeframe_weeks": obj.timeframe_weeks,
+            "phased_focus": list(obj.phased_focus),
+            "special_requirements": list(obj.special_requirements),
+            "learner_id": obj.learner_id,
+        }
+    if isinstance(obj, Course):
+        return {
+            "title": obj.title,
+            "provider": obj.provider,
+            "url": obj.url,
+            "topics": list(obj.topics),
+            "level": obj.level,
+            "summary": obj.summary,
+            "est_hours": obj.est_hours,
+        }
+    if isinstance(obj, (LearningPlanStep, FrozenPlanStep)):
+        return _step_dict(obj)
+    if isinstance(obj, LearningPlan):
+        return {"goal": obj.goal, "steps": [_step_dict(s) for s in obj.steps], "notes": list(obj.notes)}
+    raise TypeError(f"Unsupported type for codec: {type(obj).__name__}")
+
+
+def _profile_from_dict(data: Dict[str, Any]) -> UserProfile:
+    return UserProfile(
+        name=data["name"],
+        learning_goal=data["learning_goal"],
+        interested_topics=list(data.get("interested_topics") or []),
+        current_level=data["current_level"],
+        provider_requirements=list(data.get("provider_requirements") or []),
+        weekly_time_hours=data.get("weekly_time_hours"),
+        timeframe_weeks=data.get("timeframe_weeks"),
+        phased_focus=list(data.get("phased_focus") or []),
+        special_requirements=list(data.get("special_requirements") or []),
+        learner_id=data.get("learner_id"),
+    )
+
+
+def _course_from_dict(data: Dict[str, Any]) -> Course:
+    return Course(
+        title=data["title"],
+        provider=data["provider"],
+        url=data["url"],
+        topics=list(data.get("topics") or []),
+        level=data["level"],
+        summary=data["summary"],
+        est_hours=data.get("est_hours"),
+    )
+
+
+def _plan_from_dict(data: Dict[str, Any]) -> LearningPlan:
+    return LearningPlan(
+        goal=data["goal"],
+        steps=[_step_from_dict(s) for s in data.get("steps") or []],
+        notes=list(data.get("notes") or []),
+    )
+
+
+_TYPE_NAMES: Dict[Type[Any], str] = {
+    UserProfile: "UserProfile",
+    Course: "Course",
+    LearningPlanStep: "LearningPlanStep",
+    LearningPlan: "LearningPlan",
+}
+
+_FROM_DICT: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "UserProfile": _profile_from_dict,
+    "Course": _course_from_dict,
+    "LearningPlanStep": _step_from_dict,
+    "LearningPlan": _plan_from_dict,
+}
+
+
+def to_json_dict(obj: Model) -> Dict[str, Any]:
+    """Return a versioned dict (``_v`` schema version, ``_t`` type name) for json.dumps."""
+
+    type_name = _TYPE_NAMES.get(type(obj))
+    if type_name is None:
+        raise TypeError(f"Unsupported type for codec: {type(obj).__name__}")
+    data = as_dict(obj)
+    data["_v"] = SCHEMA_VERSION
+    data["_t"] = type_name
+    return data
+
+
+def from_json_dict(data: Dict[str, Any]) -> Model:
+    """Rebuild a model from a dict produced by to_json_dict."""
+
+    version = data.get("_v")
+    if version not in SUPPORTED_VERSIONS:
+        raise CodecError(f"Unsupported schema version: {version!r}")
+    decoder = _FROM_DICT.get(data.get("_t", ""))
+    if decoder is None:
+        raise CodecError(f"Unknown type tag: {data.get('_t')!r}")
+    return decoder(data)
+
+
+def dumps_json(obj: Model) -> str:
+    return json.dumps(to_json_dict(obj), ensure_ascii=False, separators=(",", ":"))
+
+
+def loads_json(text: Union[str, bytes]) -> Model:
+    return from_json_dict(json.loads(text))
+
+
+# ---------------- Binary ----------------
+#
+# Record layout (little-endian):
+#   header    "LA", schema version (u8), type tag (u8)
+#   fixed     type-specific optional ints and list counts
+#   strings   count (u32), then each string's length in code points (u32 each)
+#   blob      all strings concatenated, UTF-8 encoded once
+#
+# Keeping every string in one blob means a record costs a single encode/decode call instead of
+# one per field; the length table splits the decoded text back into fields.
+
+
+@lru_cache(maxsize=256)
+def _lengths_struct(count: int) -> struct.Struct:
+    return struct.Struct(f"<{count}I")
+
+
+@lru_cache(maxsize=64)
+def _steps_struct(count: int) -> struct.Struct:
+    return struct.Struct("<" + "?iI" * count)
+
+
+def _opt(value: Optional[int]) -> Tuple[bool, int]:
+    return value is not None, value or 0
+
+
+def _pack(tag: int, fixed: bytes, strings: List[str]) -> bytes:
+    count = len(strings)
+    return b"".join(
+        (
+            _HEADER.pack(_MAGIC, SCHEMA_VERSION, tag),
+            fixed,
+            _U32.pack(count),
+            _lengths_struct(count).pack(*map(len, strings)),
+            "".join(strings).encode("utf-8"),
+        )
+    )
+
+
+def encode(obj: Model) -> bytes:
+    """Encode a model into the compact binary format described above.
+
+    Raises CodecError when a value does not fit its field, e.g. an hour count outside int32, or
+    a string holds a lone surrogate that UTF-8 cannot represent.
+    """
+
+    try:
+        return _encode(obj)
+    except (struct.error, UnicodeEncodeError) as exc:
+        raise CodecError(f"Cannot encode {type(obj).__name__}: {exc}") from exc
+
+
+def _encode(obj: Model) -> bytes:
+    if isinstance(obj, UserProfile):
+        fixed = _PROFILE_FIXED.pack(
+            *_opt(obj.weekly_time_hours),
+            *_opt(obj.timeframe_weeks),
+            len(obj.interested_topics),
+            len(obj.provider_requirements),
+            len(obj.phased_focus),
+            len(obj.special_requirements),
+            obj.learner_id is not None,
+        )
+        strings = [obj.name, obj.learning_goal, obj.current_level]
+        strings += obj.interested_topics
+        strings += obj.provider_requirements
+        strings += obj.phased_focus
+        strings += obj.special_requirements
+        if obj.learner_id is not None:
+            strings.append(obj.learner_id)
+        return _pack(_TAG_PROFILE, fixed, strings)
+    if isinstance(obj, Course):
+        fixed = _STEP_FIXED.pack(*_opt(obj.est_hours), len(obj.topics))
+        strings = [obj.title, obj.provider, obj.url, obj.level, obj.summary]
+        strings += obj.topics
+        return _pack(_TAG_COURSE, fixed, strings)
+    if isinstance(obj, LearningPlanStep):
+        fixed = _STEP_FIXED.pack(*_opt(obj.est_time_hours), len(obj.resources))
+        return _pack(_TAG_STEP, fixed, [obj.title, obj.description, *obj.resources])
+    if isinstance(obj, LearningPlan):
+        step_fields: List[Any] = []
+        strings = [obj.goal]
+        for step in obj.steps:
+            step_fields += (*_opt(step.est_time_hours), len(step.resources))
+            strings += (step.title, step.description)
+            strings += step.resources
+        strings += obj.notes
+        fixed = _PLAN_FIXED.pack(len(obj.steps), len(obj.notes)) + _steps_struct(len(obj.steps)).pack(*step_fields)
+        return _pack(_TAG_PLAN, fixed, strings)
+    raise TypeError(f"Unsupported type for codec: {type(obj).__name__}")
+
+
+def _read_strings(data: bytes, pos: int, end: int, expected: int) -> List[str]:
+    (count,) = _U32.unpack_from(data, pos)
+    if count != expected:
+        raise CodecError(f"Record has {count} strings, expected {expected}")
+    pos += 4
+    lengths = _lengths_struct(count).unpack_from(data, pos)
+    text = data[pos + 4 * count : end].decode("utf-8")
+    strings: List[str] = []
+    start = 0
+    for size in lengths:
+        strings.append(text[start : start + size])
+        start += size
+    if start != len(text):
+        raise CodecError("String table does not match record contents")
+    return strings
+
+
+def _decode_record(data: bytes, start: int, end: int) -> Model:
+    tag, version, pos = _read_header(data, start)
+    try:
+        if tag == _TAG_PROFILE:
+            if version == 1:
+                fields = _PROFILE_FIXED_V1.unpack_from(data, pos) + (False,)
+                pos += _PROFILE_FIXED_V1.size
+            else:
+                fields = _PROFILE_FIXED.unpack_from(data, pos)
+                pos += _PROFILE_FIXED.size
+            has_weekly, weekly, has_weeks, weeks, n_topics, n_providers, n_phases, n_special, has_learner = fields
+            counts = n_topics + n_providers + n_phases + n_special
+            s = _read_strings(data, pos, end, 3 + counts + bool(has_learner))
+            a = 3 + n_topics
+            b = a + n_providers
+            c = b + n_phases
+            d = c + n_special
+            return UserProfile(
+                name=s[0],
+                learning_goal=s[1],
+                interested_topics=s[3:a],
+                current_level=s[2],
+                provider_requirements=s[a:b],
+                weekly_time_hours=weekly if has_weekly else None,
+                timeframe_weeks=weeks if has_weeks else None,
+                phased_focus=s[b:c],
+                special_requirements=s[c:d],
+                learner_id=s[d] if has_learner else None,
+            )
+        if tag == _TAG_COURSE:
+            has_hours, hours, n_topics = _STEP_FIXED.unpack_from(data, pos)
+            s = _read_strings(data, pos + _STEP_FIXED.size, end, 5 + n_topics)
+            return Course(
+                title=s[0],
+                provider=s[1],
+                url=s[2],
+                topics=s[5:],
+                level=s[3],
+                summary=s[4],
+                est_hours=hours if has_hours else None,
+            )
+        if tag == _TAG_STEP:
+            has_hours, hours, n_resources = _STEP_FIXED.unpack_from(data, pos)
+            s = _read_strings(data, pos + _STEP_FIXED.size, end, 2 + n_resources)
+            return LearningPlanStep(
+                title=s[0], description=s[1], resources=s[2:], est_time_hours=hours if has_hours else None
+            )
+        if tag == _TAG_PLAN:
+            n_steps, n_notes = _PLAN_FIXED.unpack_from(data, pos)
+            pos += _PLAN_FIXED.size
+            steps_struct = _steps_struct(n_steps)
+            step_fields = steps_struct.unpack_from(data, pos)
+            n_strings = 1 + 2 * n_steps + sum(step_fields[2::3]) + n_notes
+            s = _read_strings(data, pos + steps_struct.size, end, n_strings)
+            steps: List[LearningPlanStep] = []
+            i = 1
+            for k in range(0, 3 * n_steps, 3):
+                has_hours, hours, n_resources = step_fields[k : k + 3]
+                j = i + 2 + n_resources
+                steps.append(
+                    LearningPlanStep(
+                        title=s[i],
+                        description=s[i + 1],
+                        resources=s[i + 2 : j],
+                        est_time_hours=hours if has_hours else None,
+                    )
+                )
+                i = j
+            return LearningPlan(goal=s[0], steps=steps, notes=s[i : i + n_notes])
+    except (struct.error, IndexError, UnicodeDecodeError) as exc:
+        raise CodecError("Truncated or corrupt record") from exc
+    raise CodecError(f"Unknown type tag: {tag}")
+
+
+def _read_header(data: bytes, pos: int) -> Tuple[int, int, int]:
+    try:
+        magic, version, tag = _HEADER.unpack_from(data, pos)
+    except struct.error as exc:
+        raise CodecError("Truncated header") from exc
+    if magic != _MAGIC:
+        raise CodecError("Not an assistant codec record")
+    if version not in SUPPORTED_VERSIONS:
+        raise CodecError(f"Unsupported schema version: {version}")
+    return tag, version, pos + _HEADER.size
+
+
+def decode(data: bytes) -> Model:
+    """Decode a single record produced by encode."""
+
+    return _decode_record(data, 0, len(data))
+
+
+def encode_many(objs: Iterable[Model]) -> bytes:
+    """Encode a sequence of models as back-to-back length-prefixed records."""
+
+    out: List[bytes] = []
+    for obj in objs:
+        record = encode(obj)
+        out.append(_U32.pack(len(record)))
+        out.append(record)
+    return b"".join(out)
+
+
+def iter_decode_many(data: bytes) -> Iterator[Model]:
+    """Yield the models stored in a buffer produced by encode_many."""
+
+    pos = 0
+    end = len(data)
+    while pos < end:
+        if pos + 4 > end:
+            raise CodecError("Truncated record length")
+        (size,) = _U32.unpack_from(data, pos)
+        pos += 4
+        if pos + size > end:
+            raise CodecError("Truncated record")
+        yield _decode_record(data, pos, pos + size)
+        pos += size
+
+
+def decode_many(data: bytes) -> List[Model]:
+    return list(iter_decode_many(data))
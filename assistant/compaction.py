@@ -0,0 +1,445 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+from .analytics import (
+    compacted_aggregates_path,
+    empty_aggregates,
+    fold_record,
+    load_compacted_aggregates,
+    load_reader_cursors,
+    merge_aggregates,
+    save_reader_cursors,
+)
+from .log_segments import SegmentedConversationLogger, SegmentInfo
+from .logger import ConversationLogger, _naive_utc, decode_record, encode_record, writers_lock_path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_PII_FIELDS = ("learner_id",)
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"(?<![\w-])\+?\d(?:[ .()-]?\d){8,14}(?![\w-])")
+
+
+@dataclass
+class RetentionPolicy:
+    """What compaction does to old records.
+
+    Records older than ``max_age_days`` are dropped (and counted into the kept aggregates).
+    Records older than ``scrub_after_days`` lose ``pii_fields``; with ``redact_content`` email
+    addresses and phone numbers in the message text are masked as well.
+    """
+
+    max_age_days: Optional[float] = None
+    scrub_after_days: Optional[float] = None
+    pii_fields: Tuple[str, ...] = DEFAULT_PII_FIELDS
+    redact_content: bool = False
+
+    def cutoffs(self, now: Optional[datetime] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+        now = _naive_utc(now) if now is not None else datetime.utcnow()
+        expire = now - timedelta(days=self.max_age_days) if self.max_age_days is not None else None
+        scrub = now - timedelta(days=self.scrub_after_days) if self.scrub_after_days is not None else None
+        return expire, scrub
+
+
+@dataclass
+class CompactionResult:
+    """Counts from one compaction run."""
+
+    path: str
+    records: int = 0
+    kept: int = 0
+    removed: int = 0
+    scrubbed: int = 0
+    bad_records: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    rewritten: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.removed or self.scrubbed)
+
+
+class _Throttle:
+    """Sleep as needed to keep the average read rate at or below bytes_per_second."""
+
+    def __init__(self, bytes_per_second: Optional[float]) -> None:
+        self.rate = bytes_per_second
+        self.started = time.monotonic()
+        self.done = 0
+
+    def __call__(self, size: int) -> None:
+        if not self.rate:
+            return
+        self.done += size
+        ahead = self.done / self.rate - (time.monotonic() - self.started)
+        if ahead > 0.05:
+            time.sleep(ahead)
+
+
+class _Compactor:
+    def __init__(self, policy: RetentionPolicy, now: Optional[datetime], result: CompactionResult) -> None:
+        self.policy = policy
+        self.expire_before, self.scrub_before = policy.cutoffs(now)
+        self.result = result
+        self.removed = empty_aggregates()
+        # Reader cursor offsets to translate: old offset -> (new offset, records removed before it).
+        self.marks: Dict[int, Optional[Tuple[int, Dict[str, Any]]]] = {}
+        self.read_pos = 0
+        self.write_pos = 0
+
+    def _mark(self) -> None:
+        if self.read_pos in self.marks and self.marks[self.read_pos] is None:
+            self.marks[self.read_pos] = (self.write_pos, copy.deepcopy(self.removed))
+
+    def process(self, line: bytes) -> Tuple[Optional[bytes], Optional[datetime]]:
+        """Return the line to keep (possibly rewritten) and the record's time, or None to drop it."""
+
+        if not line.strip():
+            return None, None
+        try:
+            record = decode_record(line)
+            ts = datetime.fromisoformat(record["timestamp"])
+        except (ValueError, KeyError, TypeError):
+            self.result.bad_records += 1
+            return line, None  # leave damaged records for log_tools to report
+        self.result.records += 1
+        age_ts = _naive_utc(ts)
+        if self.expire_before is not None and age_ts < self.expire_before:
+            fold_record(self.removed, record)
+            self.result.removed += 1
+            return None, None
+        self.result.kept += 1
+        if self.scrub_before is not None and age_ts < self.scrub_before and self._scrub(record):
+            self.result.scrubbed += 1
+            record_format = "jsonl" if line.lstrip()[:1] == b"{" else "framed"
+            return encode_record(record, record_format), ts
+        return line, ts
+
+    def _scrub(self, record: Dict[str, Any]) -> bool:
+        changed = False
+        for name in self.policy.pii_fields:
+            if name in record:
+                del record[name]
+                changed = True
+        if self.policy.redact_content:
+            content = _PHONE_RE.sub("[phone]", _EMAIL_RE.sub("[email]", record["content"]))
+            if content != record["content"]:
+                record["content"] = content
+                changed = True
+        return changed
+
+    def copy(
+        self,
+        src: BinaryIO,
+        dst: BinaryIO,
+        *,
+        limit: Optional[int] = None,
+        throttle: Optional[_Throttle] = None,
+    ) -> Tuple[int, bytes]:
+        """Copy complete lines from src to dst; return bytes consumed and any unterminated tail.
+
+        Stops after the line that reaches ``limit`` bytes so a busy writer cannot keep it going.
+        """
+
+        consumed = 0
+        for line in src:
+            self._mark()
+            if not line.endswith(b"\n"):
+                return consumed, line
+            consumed += len(line)
+            self.read_pos += len(line)
+            out, _ = self.process(line)
+            if out is not None:
+                dst.write(out)
+                self.write_pos += len(out)
+            if throttle is not None:
+                throttle(len(line))
+            if limit is not None and consumed >= limit:
+                break
+        self._mark()
+        return consumed, b""
+
+
+def _record_removed(log_path: Path, removed: Dict[str, Any]) -> int:
+    """Add removed records to the kept aggregates; returns the new compaction generation."""
+
+    state = load_compacted_aggregates(log_path)
+    state["generation"] += 1
+    merge_aggregates(state["aggregates"], removed)
+    target = compacted_aggregates_path(log_path)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, target)
+    return state["generation"]
+
+
+def _carry_file_cursors(
+    path: Path, cursors: Dict[str, Dict[str, Any]], compactor: "_Compactor", inode: int, generation: int
+) -> None:
+    """Move reader cursors into the rewritten log; cursors that could not be translated are dropped."""
+
+    for name, cursor in list(cursors.items()):
+        mark = compactor.marks.get(cursor.get("offset", -1)) if "offset" in cursor else None
+        if mark is None:
+            del cursors[name]
+            continue
+        new_offset, removed_before = mark
+        cursor.setdefault("from_offset", cursor["offset"])
+        cursor.setdefault("from_inode", cursor["inode"])
+        cursor.update(offset=new_offset, inode=inode, generation=generation)
+        merge_aggregates(cursor["removed"], removed_before)
+    save_reader_cursors(path, cursors)
+
+
+def _exclude_writers(path: Path) -> Optional[BinaryIO]:
+    """Lock out writers that cannot follow a compaction, or refuse if one is running."""
+
+    if fcntl is None:
+        return None
+    lock = writers_lock_path(path).open("ab")
+    try:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        raise RuntimeError(
+            f"{path} is open in a logger without compaction_safe=True; its appends would be lost. "
+            "Close it or reopen it with compaction_safe=True before compacting."
+        ) from None
+    return lock
+
+
+def compact_log(
+    path: str | Path,
+    policy: RetentionPolicy,
+    *,
+    now: Optional[datetime] = None,
+    bytes_per_second: Optional[float] = None,
+    offline: bool = False,
+) -> CompactionResult:
+    """Apply a retention policy to a ConversationLogger file in one streaming pass.
+
+    The log is copied record by record into a temporary file, reading at most
+    ``bytes_per_second``. Then, holding an exclusive lock on the log, the records appended in
+    the meantime are copied too and the temporary file replaces the log atomically. Writers
+    opened with ``compaction_safe=True`` wait for that lock and then switch to the new file.
+    RuntimeError is raised while any other logger has the log open for writing (they would keep
+    appending to the replaced file), and on platforms without ``fcntl`` unless ``offline=True``
+    promises that nothing is writing to the log at all.
+    The sparse offset index is rebuilt and the aggregates of removed records are added to
+    ``<log>.compacted.json`` so analytics totals survive. Reader cursors in
+    ``<log>.cursors.json`` are moved to the matching offsets of the new file, each with the
+    aggregates of the removed records it had already passed.
+    """
+
+    path = Path(path)
+    result = CompactionResult(path=str(path))
+    if fcntl is None and not offline:
+        raise RuntimeError("Compacting a live log needs fcntl locks; stop all writers and pass offline=True")
+    if not path.exists():
+        return result
+    writers = _exclude_writers(path)
+    try:
+        return _compact_log(path, policy, now, bytes_per_second, result)
+    finally:
+        if writers is not None:
+            writers.close()
+
+
+def _compact_log(
+    path: Path,
+    policy: RetentionPolicy,
+    now: Optional[datetime],
+    bytes_per_second: Optional[float],
+    result: CompactionResult,
+) -> CompactionResult:
+    compactor = _Compactor(policy, now, result)
+    tmp = path.with_name(path.name + ".compact.tmp")
+    src = path.open("rb")
+    cursors = load_reader_cursors(path)
+    inode = os.fstat(src.fileno()).st_ino
+    for cursor in cursors.values():
+        if cursor.get("inode") == inode and "offset" in cursor:
+            compactor.marks[cursor["offset"]] = None
+    try:
+        with tmp.open("wb") as dst:
+            snapshot = os.fstat(src.fileno()).st_size
+            consumed, _ = compactor.copy(src, dst, limit=snapshot, throttle=_Throttle(bytes_per_second))
+            if fcntl is not None:
+                fcntl.flock(src.fileno(), fcntl.LOCK_EX)
+            src.seek(consumed)
+            more, tail = compactor.copy(src, dst)
+            result.bytes_before = consumed + more + len(tail)
+            if result.changed:
+                dst.write(tail)  # an in-flight or torn record is carried over untouched
+                dst.flush()
+                os.fsync(dst.fileno())
+                result.bytes_after = dst.tell()
+        if not result.changed:
+            tmp.unlink()
+            result.bytes_after = result.bytes_before
+            return result
+        if fcntl is None:
+            src.close()  # offline: Windows cannot replace an open file, and nothing is appending
+        os.replace(tmp, path)
+    finally:
+        # Closing src releases the lock; waiting writers then see the new inode and reopen.
+        src.close()
+
+    generation = _record_removed(path, compactor.removed)
+    _carry_file_cursors(path, cursors, compactor, os.stat(path).st_ino, generation)
+    result.rewritten.append(path.name)
+    index_path = path.with_name(path.name + ".idx")
+    if index_path.exists():
+        every = json.loads(index_path.read_text(encoding="utf-8")).get("every", 1000)
+        index_path.unlink()
+        ConversationLogger(path, index_every=every).refresh_index()
+    return result
+
+
+def compact_segments(
+    logger: SegmentedConversationLogger,
+    policy: RetentionPolicy,
+    *,
+    now: Optional[datetime] = None,
+    bytes_per_second: Optional[float] = None,
+) -> CompactionResult:
+    """Apply a retention policy to the closed segments of a segmented log.
+
+    Pass the logger that owns the directory (it may keep appending to its active segment
+    meanwhile) so manifest updates go through it. Each affected segment is rewritten to a
+    temporary file and swapped in; a segment left empty is deleted and kept in the manifest
+    with zero records. Segments still waiting for compression are skipped until the next run.
+    Reader cursors in ``cursors.json`` are charged with the removed records of the segments
+    they had already counted.
+    """
+
+    result = CompactionResult(path=str(logger.log_dir))
+    compactor = _Compactor(policy, now, result)
+    cutoffs = [c for c in (compactor.expire_before, compactor.scrub_before) if c is not None]
+    if not cutoffs:
+        return result
+    oldest_allowed = max(cutoffs)
+    throttle = _Throttle(bytes_per_second)
+    removed = empty_aggregates()
+    removed_by_segment: Dict[str, Dict[str, Any]] = {}
+
+    for seg in logger.closed_segments():
+        if seg.records == 0 or seg.start is None:
+            continue
+        if logger.compress and not seg.compressed:
+            continue
+        if _naive_utc(datetime.fromisoformat(seg.start)) >= oldest_allowed:
+            continue
+        path = logger.log_dir / seg.name
+        tmp = path.with_name(path.name + ".compact.tmp")
+        opener = gzip.open if seg.compressed else open
+        changed_before = (result.removed, result.scrubbed)
+        compactor.removed = empty_aggregates()
+        info = SegmentInfo(name=seg.name, compressed=seg.compressed)
+        start: Optional[datetime] = None
+        end: Optional[datetime] = None
+        with opener(path, "rb") as src, opener(tmp, "wb") as dst:
+            for line in src:
+                result.bytes_before += len(line)
+                throttle(len(line))
+                out, ts = compactor.process(line)
+                if out is None:
+                    continue
+                dst.write(out)
+                info.bytes += len(out)
+                if ts is not None:
+                    info.records += 1
+                    start = ts if start is None or ts < start else start
+                    end = ts if end is None or ts > end else end
+        if (result.removed, result.scrubbed) == changed_before:
+            tmp.unlink()
+            result.bytes_after += info.bytes
+            continue
+        result.bytes_after += info.bytes
+        result.rewritten.append(seg.name)
+        merge_aggregates(removed, compactor.removed)
+        removed_by_segment[seg.name[: -len(".gz")] if seg.compressed else seg.name] = compactor.removed
+        if info.records == 0:
+            logger.replace_segment(SegmentInfo(name=seg.name, compressed=seg.compressed))
+            path.unlink()
+            tmp.unlink()
+            continue
+        info.start = start.isoformat() if start else None
+        info.end = end.isoformat() if end else None
+        # Both files were closed when the with block ended, so the swap also works on Windows.
+        os.replace(tmp, path)
+        logger.replace_segment(info)
+
+    if result.changed:
+        generation = _record_removed(logger.log_dir, removed)
+        _carry_segment_cursors(logger.log_dir, removed_by_segment, generation)
+    return result
+
+
+def _carry_segment_cursors(
+    log_dir: Path, removed_by_segment: Dict[str, Dict[str, Any]], generation: int
+) -> None:
+    """Charge each reader cursor with the removed records of the segments it had finished."""
+
+    cursors = load_reader_cursors(log_dir)
+    for name, cursor in list(cursors.items()):
+        if "done" not in cursor:
+            del cursors[name]
+            continue
+        for base in set(cursor["done"]).intersection(removed_by_segment):
+            merge_aggregates(cursor["removed"], removed_by_segment[base])
+        cursor["generation"] = generation
+    save_reader_cursors(log_dir, cursors)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m assistant.compaction", description="Apply a retention policy to a conversation log."
+    )
+    parser.add_argument("log_path", help="ConversationLogger file or segmented log directory")
+    parser.add_argument("--max-age-days", type=float, help="drop records older than this")
+    parser.add_argument("--scrub-after-days", type=float, help="strip PII from records older than this")
+    parser.add_argument("--pii-field", action="append", dest="pii_fields", help="record field to strip (repeatable)")
+    parser.add_argument("--redact-content", action="store_true", help="also mask emails and phone numbers")
+    parser.add_argument("--bytes-per-second", type=float, help="read throttle")
+    parser.add_argument(
+        "--offline", action="store_true", help="no process is writing the log (required without fcntl, e.g. Windows)"
+    )
+    args = parser.parse_args(argv)
+
+    policy = RetentionPolicy(
+        max_age_days=args.max_age_days,
+        scrub_after_days=args.scrub_after_days,
+        pii_fields=tuple(args.pii_fields) if args.pii_fields else DEFAULT_PII_FIELDS,
+        redact_content=args.redact_content,
+    )
+    path = Path(args.log_path)
+    if path.is_dir():
+        # Only safe while no other process is writing to this directory.
+        with SegmentedConversationLogger(path, compress=False) as logger:
+            result = compact_segments(logger, policy, bytes_per_second=args.bytes_per_second)
+    else:
+        result = compact_log(path, policy, bytes_per_second=args.bytes_per_second, offline=args.offline)
+    print(json.dumps(asdict(result)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
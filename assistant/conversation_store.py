@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .logger import decode_line, encode_message
+from .models import ConversationMessage
+
+MESSAGES_NAME = "messages.jsonl"
+INDEX_NAME = "sessions.idx"
+
+
+class _PartitionIndex:
+    """In-memory copy of a partition's session index, extended as the index file grows."""
+
+    __slots__ = ("size", "sessions")
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.sessions: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+
+
+class PartitionedConversationStore:
+    """Conversation store sharded into directories by a hash of the session ID.
+
+    Each partition (``<root>/ab/cd/``) holds an append-only ``messages.jsonl`` plus an
+    append-only ``sessions.idx`` of ``session<TAB>offset<TAB>length`` lines. Fetching a
+    conversation reads one partition index (cached and refreshed incrementally) and then seeks
+    straight to that session's records, so the cost tracks the session, not the whole store.
+    Designed for a single writer process; readers may run concurrently. Index lines that cannot
+    be parsed are skipped and counted in ``bad_index_lines`` instead of failing every read.
+    """
+
+    def __init__(self, root: str | Path = "conversations", *, max_cached_partitions: int = 1024) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_cached_partitions = max_cached_partitions
+        self._indexes: "OrderedDict[Path, _PartitionIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bad_index_lines = 0
+
+    def partition_dir(self, session_id: str) -> Path:
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / digest[2:4]
+
+    def append(self, message: ConversationMessage) -> None:
+        self.extend([message])
+
+    def extend(self, messages: Iterable[ConversationMessage]) -> None:
+        """Append messages, writing each touched partition's records and index entries once."""
+
+        batches: Dict[Path, List[ConversationMessage]] = defaultdict(list)
+        for message in messages:
+            if not message.session_id:
+                raise ValueError("PartitionedConversationStore requires messages with a session_id")
+            if "\t" in message.session_id or "\n" in message.session_id:
+                raise ValueError(f"session_id may not contain tabs or newlines: {message.session_id!r}")
+            batches[self.partition_dir(message.session_id)].append(message)
+
+        with self._lock:
+            for part, batch in batches.items():
+                part.mkdir(parents=True, exist_ok=True)
+                records = [encode_message(m) for m in batch]
+                entries: List[str] = []
+                with (part / MESSAGES_NAME).open("ab") as fh:
+                    offset = fh.seek(0, 2)
+                    for message, record in zip(batch, records):
+                        entries.append(f"{message.session_id}\t{offset}\t{len(record)}\n")
+                        offset += len(record)
+                    fh.write(b"".join(records))
+                # Records go first, so an index entry never points past the end of the data.
+                with (part / INDEX_NAME).open("ab") as fh:
+                    fh.write("".join(entries).encode("utf-8"))
+
+    def iter_session(self, session_id: str) -> Iterator[ConversationMessage]:
+        part = self.partition_dir(session_id)
+        locations = list(self._partition_index(part).sessions.get(session_id, ()))
+        if not locations:
+            return
+        with (part / MESSAGES_NAME).open("rb") as fh:
+            for offset, length in locations:
+                fh.seek(offset)
+                yield decode_line(fh.read(length))
+
+    def load_session(self, session_id: str) -> List[ConversationMessage]:
+        """Return one conversation's messages in append order."""
+
+        return list(self.iter_session(session_id))
+
+    def session_ids(self) -> Iterator[str]:
+        """Yield every session ID in the store (walks all partition indexes)."""
+
+        for index_path in sorted(self.root.glob(f"*/*/{INDEX_NAME}")):
+            yield from list(self._partition_index(index_path.parent).sessions)
+
+    def _partition_index(self, part: Path) -> _PartitionIndex:
+        with self._lock:
+            index = self._indexes.get(part)
+            if index is None:
+                index = _PartitionIndex()
+                self._indexes[part] = index
+                if len(self._indexes) > self.max_cached_partitions:
+                    self._indexes.popitem(last=False)
+            else:
+                self._indexes.move_to_end(part)
+            index_path = part / INDEX_NAME
+            if index_path.exists() and index_path.stat().st_size > index.size:
+                with index_path.open("rb") as fh:
+                    fh.seek(index.size)
+                    for line in fh:
+                        if not line.endswith(b"\n"):
+                            break
+                        index.size += len(line)
+                        try:
+                            session_id, offset, length = line.decode("utf-8").rstrip("\n").split("\t")
+                            location = (int(offset), int(length))
+                        except ValueError:  # includes UnicodeDecodeError
+                            self.bad_index_lines += 1
+                            continue
+                        index.sessions[session_id].append(location)
+            return index
@@ -0,0 +1,528 @@
+from __future__ import annotations
+
+import calendar
+import json
+import os
+import re
+import struct
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from .logger import decode_line
+from .models import ConversationMessage
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+_SEGMENT_MAGIC = b"FTS1"
+_SEGMENT_HEADER = struct.Struct("<4sII")  # magic, doc count, term count
+
+STATE_NAME = "index.json"
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens (letters and digits, any script)."""
+
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _epoch(ts: datetime) -> int:
+    # Naive timestamps are UTC throughout the logger (datetime.utcnow).
+    return calendar.timegm(ts.utctimetuple())
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _encode_segment(offsets: List[int], times: List[int], postings: Dict[str, List[int]]) -> bytes:
+    """Serialize one segment: doc table, term dictionary, then delta-encoded postings, zlib-compressed."""
+
+    out = bytearray(_SEGMENT_HEADER.pack(_SEGMENT_MAGIC, len(offsets), len(postings)))
+    previous = 0
+    for offset in offsets:
+        _write_varint(out, offset - previous)
+        previous = offset
+    previous = 0
+    for ts in times:
+        _write_varint(out, _zigzag(ts - previous))
+        previous = ts
+
+    blob = bytearray()
+    for term in sorted(postings):
+        docs = postings[term]
+        encoded = bytearray()
+        previous = 0
+        for doc in docs:
+            _write_varint(encoded, doc - previous)
+            previous = doc
+        raw = term.encode("utf-8")
+        _write_varint(out, len(raw))
+        out += raw
+        _write_varint(out, len(docs))
+        _write_varint(out, len(encoded))
+        blob += encoded
+    out += blob
+    return zlib.compress(bytes(out), 6)
+
+
+class _Segment:
+    """A decoded segment: doc table and term dictionary in memory, postings decoded per query."""
+
+    __slots__ = ("offsets", "times", "terms", "_data")
+
+    def __init__(self, payload: bytes) -> None:
+        data = zlib.decompress(payload)
+        magic, doc_count, term_count = _SEGMENT_HEADER.unpack_from(data)
+        if magic != _SEGMENT_MAGIC:
+            raise ValueError("Not a full-text index segment")
+        pos = _SEGMENT_HEADER.size
+        self.offsets: List[int] = []
+        value = 0
+        for _ in range(doc_count):
+            delta, pos = _read_varint(data, pos)
+            value += delta
+            self.offsets.append(value)
+        self.times: List[int] = []
+        value = 0
+        for _ in range(doc_count):
+            delta, pos = _read_varint(data, pos)
+            value += _unzigzag(delta)
+            self.times.append(value)
+
+        entries: List[Tuple[str, int, int]] = []
+        for _ in range(term_count):
+            length, pos = _read_varint(data, pos)
+            term = data[pos : pos + length].decode("utf-8")
+            pos += length
+            df, pos = _read_varint(data, pos)
+            size, pos = _read_varint(data, pos)
+            entries.append((term, df, size))
+        self.terms: Dict[str, Tuple[int, int, int]] = {}
+        for term, df, size in entries:
+            self.terms[term] = (pos, size, df)
+            pos += size
+        self._data = data
+
+    def postings(self, term: str) -> Set[int]:
+        entry = self.terms.get(term)
+        if entry is None:
+            return set()
+        pos, _, df = entry
+        docs: Set[int] = set()
+        doc = 0
+        for _ in range(df):
+            delta, pos = _read_varint(self._data, pos)
+            doc += delta
+            docs.add(doc)
+        return docs
+
+    def all_postings(self) -> Dict[str, List[int]]:
+        return {term: sorted(self.postings(term)) for term in self.terms}
+
+    def df(self, term: str) -> int:
+        return self.terms.get(term, (0, 0, 0))[2]
+
+
+class _Delta:
+    """Records read since the last written segment, indexed in memory only."""
+
+    __slots__ = ("offsets", "times", "terms", "bad_records")
+
+    def __init__(self) -> None:
+        self.offsets: List[int] = []
+        self.times: List[int] = []
+        self.terms: Dict[str, List[int]] = {}
+        self.bad_records = 0
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def add(self, offset: int, message: ConversationMessage) -> None:
+        doc = len(self.offsets)
+        self.offsets.append(offset)
+        self.times.append(_epoch(message.timestamp))
+        for term in set(tokenize(message.content)):
+            self.terms.setdefault(term, []).append(doc)
+
+    def postings(self, term: str) -> Set[int]:
+        return set(self.terms.get(term, ()))
+
+    def df(self, term: str) -> int:
+        return len(self.terms.get(term, ()))
+
+
+@dataclass
+class SegmentMeta:
+    """State entry for one index segment; min/max time let range queries skip it."""
+
+    name: str
+    docs: int
+    min_time: int
+    max_time: int
+
+
+def parse_query(query: str) -> Tuple[List[List[List[str]]], List[List[str]]]:
+    """Parse a boolean query into (required clauses, excluded terms).
+
+    Words are ANDed; ``OR`` between two words makes them alternatives; ``-word`` or
+    ``NOT word`` excludes. A word that tokenizes into several tokens (``scikit-learn``) requires
+    all of them. Each clause is a list of alternatives, each alternative a list of tokens.
+    """
+
+    required: List[List[List[str]]] = []
+    excluded: List[List[str]] = []
+    negate = False
+    join_or = False
+    for word in query.split():
+        if word == "OR":
+            join_or = bool(required)
+            continue
+        if word == "NOT":
+            negate = True
+            continue
+        if word.startswith("-") and len(word) > 1:
+            negate, word = True, word[1:]
+        tokens = tokenize(word)
+        if not tokens:
+            negate = join_or = False
+            continue
+        if negate:
+            excluded.append(tokens)
+        elif join_or:
+            required[-1].append(tokens)
+        else:
+            required.append([tokens])
+        negate = join_or = False
+    return required, excluded
+
+
+class FullTextIndex:
+    """Inverted index over the content of a JSONL conversation log.
+
+    ``update()`` tokenizes the records appended since the last run and writes them as a new
+    immutable segment: a doc table (byte offset and time of each message) plus a term dictionary
+    with delta-varint posting lists, zlib-compressed. ``index.json`` records the log position and
+    each segment's time range. ``search()`` evaluates the query against the postings and reads
+    only the matching records, seeking to their offsets.
+
+    ``refresh()`` (run by ``search``) indexes new records in memory only; they are written as a
+    segment by the next ``update()``, or once ``max_segment_docs`` of them are pending. When there
+    are more than ``max_segments`` segments, runs of adjacent small ones are merged, never into a
+    segment above ``max_segment_docs``.
+    """
+
+    def __init__(
+        self,
+        log_path: str | Path,
+        index_dir: str | Path | None = None,
+        *,
+        max_segment_docs: int = 100_000,
+        max_segments: int = 16,
+    ) -> None:
+        self.log_path = Path(log_path)
+        self.index_dir = Path(index_dir) if index_dir is not None else self.log_path.with_name(self.log_path.name + ".fts")
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segment_docs = max_segment_docs
+        self.max_segments = max_segments
+        self._state = self._load_state()
+        self._cache: Dict[str, _Segment] = {}
+        self._delta = _Delta()
+        self._delta_end = self._state["offset"]
+
+    @property
+    def segments(self) -> List[SegmentMeta]:
+        return [SegmentMeta(**seg) for seg in self._state["segments"]]
+
+    @property
+    def bad_records(self) -> int:
+        """Undecodable log lines skipped so far."""
+
+        return self._state.get("bad_records", 0) + self._delta.bad_records
+
+    def __len__(self) -> int:
+        return sum(seg["docs"] for seg in self._state["segments"]) + len(self._delta)
+
+    # ---------------- Indexing ----------------
+
+    def update(self) -> int:
+        """Index records appended to the log and write them as a segment; return how many were added."""
+
+        pending = len(self._delta)
+        added = self.refresh()
+        self._flush()
+        return pending + added
+
+    def refresh(self) -> int:
+        """Index records appended since the last refresh in memory and return how many were read.
+
+        Nothing is written unless ``max_segment_docs`` records are pending or the log was replaced
+        (for example by compaction), in which case the stale segments are dropped.
+        """
+
+        if not self.log_path.exists():
+            return 0
+        stat = self.log_path.stat()
+        if self._state["inode"] not in (None, stat.st_ino) or stat.st_size < self._delta_end:
+            self._reset()  # log replaced or truncated; rebuild from the start
+        self._state["inode"] = stat.st_ino
+
+        added = 0
+        offset = self._delta_end
+        with self.log_path.open("rb") as fh:
+            fh.seek(offset)
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break  # partial trailing record; index it once it is complete
+                if line.strip():
+                    try:
+                        message = decode_line(line)
+                    except (ValueError, KeyError, TypeError):
+                        self._delta.bad_records += 1
+                    else:
+                        self._delta.add(offset, message)
+                        added += 1
+                offset += len(line)
+                self._delta_end = offset
+                if len(self._delta) >= self.max_segment_docs:
+                    self._flush()
+        return added
+
+    def merge(self) -> None:
+        """Merge adjacent segments into as few as fit within ``max_segment_docs``."""
+
+        while self._merge_once():
+            pass
+
+    def _flush(self) -> None:
+        delta = self._delta
+        if self._delta_end == self._state["offset"] and not delta.bad_records:
+            return
+        self._add_segment(delta.offsets, delta.times, delta.terms)
+        self._state["offset"] = self._delta_end
+        self._state["bad_records"] = self._state.get("bad_records", 0) + delta.bad_records
+        self._delta = _Delta()
+        while len(self._state["segments"]) > self.max_segments and self._merge_once():
+            pass
+        self._save_state()
+
+    def _merge_once(self) -> bool:
+        """Merge the longest run of adjacent segments whose total fits ``max_segment_docs``.
+
+        Only neighbours are merged so doc offsets stay in log order; ties go to the smallest run,
+        which keeps large segments from being rewritten over and over.
+        """
+
+        docs = [seg["docs"] for seg in self._state["segments"]]
+        best: Optional[Tuple[int, int, int]] = None
+        for i in range(len(docs)):
+            total, j = docs[i], i + 1
+            while j < len(docs) and total + docs[j] <= self.max_segment_docs:
+                total += docs[j]
+                j += 1
+            if j - i >= 2 and (best is None or (j - i, -total) > (best[1] - best[0], -best[2])):
+                best = (i, j, total)
+        if best is None:
+            return False
+
+        i, j, _ = best
+        merged = self._state["segments"][i:j]
+        offsets: List[int] = []
+        times: List[int] = []
+        postings: Dict[str, List[int]] = {}
+        for seg in merged:
+            segment = self._segment(seg["name"])
+            base = len(offsets)
+            offsets.extend(segment.offsets)
+            times.extend(segment.times)
+            for term, term_docs in segment.all_postings().items():
+                postings.setdefault(term, []).extend(base + doc for doc in term_docs)
+        self._state["segments"][i:j] = [self._write_segment(offsets, times, postings)]
+        self._save_state()
+        for seg in merged:
+            (self.index_dir / seg["name"]).unlink(missing_ok=True)
+            self._cache.pop(seg["name"], None)
+        return True
+
+    def _add_segment(self, offsets: List[int], times: List[int], postings: Dict[str, List[int]]) -> None:
+        if offsets:
+            self._state["segments"].append(self._write_segment(offsets, times, postings))
+
+    def _write_segment(self, offsets: List[int], times: List[int], postings: Dict[str, List[int]]) -> Dict[str, Any]:
+        self._state["next_segment"] += 1
+        name = f"segment-{self._state['next_segment']:06d}.fts"
+        tmp = self.index_dir / (name + ".tmp")
+        tmp.write_bytes(_encode_segment(offsets, times, postings))
+        os.replace(tmp, self.index_dir / name)
+        return asdict(SegmentMeta(name, len(offsets), min(times), max(times)))
+
+    def _reset(self) -> None:
+        segments = self._state["segments"]
+        next_segment = self._state["next_segment"]
+        self._state = self._fresh_state()
+        self._state["next_segment"] = next_segment
+        self._save_state()
+        for seg in segments:
+            (self.index_dir / seg["name"]).unlink(missing_ok=True)
+        self._cache.clear()
+        self._delta = _Delta()
+        self._delta_end = 0
+
+    @staticmethod
+    def _fresh_state() -> Dict[str, Any]:
+        return {"version": 1, "offset": 0, "inode": None, "next_segment": 0, "segments": [], "bad_records": 0}
+
+    def _load_state(self) -> Dict[str, Any]:
+        path = self.index_dir / STATE_NAME
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return self._fresh_state()
+
+    def _save_state(self) -> None:
+        path = self.index_dir / STATE_NAME
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(self._state), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _segment(self, name: str) -> _Segment:
+        segment = self._cache.get(name)
+        if segment is None:
+            segment = _Segment((self.index_dir / name).read_bytes())
+            self._cache[name] = segment
+        return segment
+
+    # ---------------- Querying ----------------
+
+    def search(
+        self,
+        query: str,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        refresh: bool = True,
+    ) -> List[ConversationMessage]:
+        """Return messages matching the boolean query within [start, end], in log order.
+
+        See ``parse_query`` for the syntax, e.g. ``pandas error``, ``numpy OR pandas -install``.
+        """
+
+        if refresh:
+            self.refresh()
+        return list(self.iter_search(query, start=start, end=end, limit=limit))
+
+    def iter_search(
+        self,
+        query: str,
+        *,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[ConversationMessage]:
+        required, excluded = parse_query(query)
+        if not required and not excluded:
+            return
+        fh = self._open_log()
+        if fh is None:
+            return
+        with fh:
+            low = _epoch(start) if start is not None else None
+            high = _epoch(end) if end is not None else None
+            offsets: List[int] = []
+            for meta in self.segments:
+                if (low is not None and meta.max_time < low) or (high is not None and meta.min_time > high):
+                    continue
+                offsets.extend(self._match_segment(self._segment(meta.name), required, excluded, low, high))
+            if self._delta:
+                offsets.extend(self._match_segment(self._delta, required, excluded, low, high))
+
+            found = 0
+            for offset in offsets:
+                fh.seek(offset)
+                message = decode_line(fh.readline())
+                # The doc table keeps whole seconds; apply the exact bounds here.
+                if (start is not None and message.timestamp < start) or (end is not None and message.timestamp > end):
+                    continue
+                yield message
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+    def _open_log(self) -> Optional[BinaryIO]:
+        """Open the log, re-indexing first if it is no longer the file the offsets point into."""
+
+        while True:
+            try:
+                fh = self.log_path.open("rb")
+            except FileNotFoundError:
+                return None
+            inode = self._state["inode"]
+            if inode is None or os.fstat(fh.fileno()).st_ino == inode:
+                return fh
+            # Replaced since the index was built (e.g. by compaction): the stored offsets are stale.
+            fh.close()
+            self.refresh()
+
+    @staticmethod
+    def _match_segment(
+        segment: _Segment | _Delta,
+        required: List[List[List[str]]],
+        excluded: List[List[str]],
+        low: Optional[int],
+        high: Optional[int],
+    ) -> List[int]:
+        def all_of(tokens: List[str]) -> Set[int]:
+            docs = segment.postings(tokens[0])
+            for token in tokens[1:]:
+                if not docs:
+                    break
+                docs &= segment.postings(token)
+            return docs
+
+        matched: Optional[Set[int]] = None
+        # Evaluate the rarest clauses first so intersections shrink quickly.
+        clauses = sorted(
+            required, key=lambda alts: sum(segment.df(t) for alt in alts for t in alt[:1])
+        )
+        for alternatives in clauses:
+            docs: Set[int] = set()
+            for tokens in alternatives:
+                docs |= all_of(tokens)
+            matched = docs if matched is None else matched & docs
+            if not matched:
+                return []
+        if matched is None:
+            matched = set(range(len(segment.offsets)))
+        for tokens in excluded:
+            matched -= all_of(tokens)
+
+        times = segment.times
+        return [
+            segment.offsets[doc]
+            for doc in sorted(matched)
+            if (low is None or times[doc] >= low) and (high is None or times[doc] <= high)
+        ]
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple, Union
+
+from .batch import chunked
+from .intake import build_profile_from_answers
+from .models import UserProfile
+from .profile_store import open_profile_store
+
+# Normalized source column -> intake answer key (see intake_questions), plus learner_id and the
+# first_name/last_name pair that is joined into ``name`` when there is no name column.
+DEFAULT_COLUMN_MAP: Dict[str, str] = {
+    "learner_id": "learner_id",
+    "employee_id": "learner_id",
+    "employee_number": "learner_id",
+    "user_id": "learner_id",
+    "id": "learner_id",
+    "name": "name",
+    "full_name": "name",
+    "display_name": "name",
+    "employee_name": "name",
+    "first_name": "first_name",
+    "given_name": "first_name",
+    "last_name": "last_name",
+    "surname": "last_name",
+    "family_name": "last_name",
+    "learning_goal": "learning_goal",
+    "learning_goals": "learning_goal",
+    "goal": "learning_goal",
+    "interested_topics": "interested_topics",
+    "learning_topics": "interested_topics",
+    "topics": "interested_topics",
+    "skills": "interested_topics",
+    "current_level": "current_level",
+    "level": "current_level",
+    "skill_level": "current_level",
+    "experience_level": "current_level",
+    "provider_requirements": "provider_requirements",
+    "preferred_providers": "provider_requirements",
+    "providers": "provider_requirements",
+    "weekly_time_hours": "weekly_time_hours",
+    "hours_per_week": "weekly_time_hours",
+    "weekly_hours": "weekly_time_hours",
+    "timeframe_weeks": "timeframe_weeks",
+    "weeks": "timeframe_weeks",
+    "phased_focus": "phased_focus",
+    "phases": "phased_focus",
+    "special_requirements": "special_requirements",
+    "requirements": "special_requirements",
+}
+
+_NUMERIC_KEYS = ("weekly_time_hours", "timeframe_weeks")
+_HEADER_RE = re.compile(r"[^0-9a-z]+")
+_UNRESOLVED = object()
+
+
+class ProfileSink(Protocol):
+    """Anything that stores profiles in batches (e.g. a profile store), keeping one per learner_id."""
+
+    def put_many(self, profiles: Sequence[UserProfile]) -> Any: ...
+
+
+@dataclass(frozen=True)
+class RowError:
+    """A source row that could not be imported; ``row`` is 1-based, not counting a CSV header."""
+
+    row: int
+    message: str
+    learner_id: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    """Counts from one import; ``errors`` keeps only the first ``max_errors`` row errors.
+
+    ``duplicates`` counts imported rows that replaced a profile stored under the same learner_id,
+    whether from earlier in the source or from a previous import.
+    """
+
+    rows: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+
+def normalize_column(name: str) -> str:
+    """'Employee ID' -> 'employee_id'."""
+
+    return _HEADER_RE.sub("_", name.strip().lower()).strip("_")
+
+
+class _ColumnMapper:
+    """Resolves each source column to an intake key once and reuses the result for every row."""
+
+    def __init__(self, columns: Optional[Dict[str, str]]) -> None:
+        self._map = dict(DEFAULT_COLUMN_MAP)
+        self._map.update({normalize_column(k): v for k, v in (columns or {}).items()})
+        self._resolved: Dict[Any, Any] = {}
+
+    def answers(self, record: Dict[Any, Any]) -> Dict[str, str]:
+        answers: Dict[str, str] = {}
+        resolved = self._resolved
+        for column, value in record.items():
+            key = resolved.get(column, _UNRESOLVED)
+            if key is _UNRESOLVED:
+                key = resolved[column] = self._map.get(normalize_column(str(column)))
+            if key is None or value is None or key in answers:
+                continue  # unmapped column, or an earlier alias already supplied this key
+            if isinstance(value, (list, tuple)):
+                text = (";" if key == "phased_focus" else ", ").join(str(v) for v in value)
+            else:
+                text = str(value).strip()
+            if text:
+                answers[key] = text
+        return answers
+
+
+def _iter_source(path: Path) -> Iterator[Tuple[int, Union[Dict[Any, Any], RowError]]]:
+    with path.open("r", encoding="utf-8-sig", newline="") as fh:
+        if path.suffix.lower() == ".csv":
+            reader = csv.DictReader(fh)
+            for row, record in enumerate(reader, start=1):
+                if None in record or None in record.values():
+                    yield row, RowError(row, f"expected {len(reader.fieldnames or ())} columns")
+                else:
+                    yield row, record
+            return
+        row = 0
+        for line in fh:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield row, RowError(row, f"invalid JSON: {exc}")
+                continue
+            yield row, record if isinstance(record, dict) else RowError(row, "expected a JSON object")
+
+
+def _to_profile(row: int, answers: Dict[str, str]) -> Union[UserProfile, RowError]:
+    learner_id = answers.get("learner_id")
+    if not learner_id:
+        return RowError(row, "missing learner_id")
+    if "name" not in answers:
+        full_name = " ".join(answers[k] for k in ("first_name", "last_name") if k in answers)
+        if not full_name:
+            return RowError(row, "missing name", learner_id)
+        answers["name"] = full_name
+    profile = build_profile_from_answers(answers["name"], answers)
+    for key in _NUMERIC_KEYS:
+        if key in answers and getattr(profile, key) is None:
+            return RowError(row, f"could not parse {key} {answers[key]!r}", learner_id)
+    profile.learner_id = learner_id
+    return profile
+
+
+def iter_profiles(
+    source: str | Path,
+    *,
+    columns: Optional[Dict[str, str]] = None,
+    report: Optional[ImportReport] = None,
+    on_error: Optional[Callable[[RowError], None]] = None,
+) -> Iterator[UserProfile]:
+    """Lazily build a UserProfile for each row of a CSV (by header) or JSON Lines export.
+
+    Column names are normalized ("Employee ID" -> ``employee_id``) and mapped to intake keys with
+    DEFAULT_COLUMN_MAP, overridden by ``columns``; unmapped columns are ignored. Rows that cannot
+    be imported go to ``on_error``. Rows repeating a learner_id are yielded too; nothing is
+    remembered per learner, so memory stays flat for large exports.
+    """
+
+    report = report if report is not None else ImportReport()
+    mapper = _ColumnMapper(columns)
+    for row, record in _iter_source(Path(source)):
+        report.rows += 1
+        result = record if isinstance(record, RowError) else _to_profile(row, mapper.answers(record))
+        if isinstance(result, RowError):
+            report.failed += 1
+            if on_error is not None:
+                on_error(result)
+            continue
+        yield result
+
+
+def import_profiles(
+    source: str | Path,
+    sink: ProfileSink,
+    *,
+    columns: Optional[Dict[str, str]] = None,
+    batch_size: int = 1_000,
+    on_error: Optional[Callable[[RowError], None]] = None,
+    max_errors: int = 100,
+) -> ImportReport:
+    """Stream profiles from source into ``sink.put_many`` in batches of ``batch_size``.
+
+    Only one batch of profiles is held at a time. Repeated learner_ids are resolved by the
+    sink's upsert on learner_id (the last row wins) rather than tracked here; for sinks with
+    ``len()`` they are counted as ``duplicates``. Row errors are passed to ``on_error`` when
+    given; the first ``max_errors`` are also kept on the returned report.
+    """
+
+    report = ImportReport()
+    before = len(sink) if hasattr(sink, "__len__") else None
+
+    def record_error(error: RowError) -> None:
+        if len(report.errors) < max_errors:
+            report.errors.append(error)
+        if on_error is not None:
+            on_error(error)
+
+    profiles = iter_profiles(source, columns=columns, report=report, on_error=record_error)
+    for batch in chunked(profiles, batch_size):
+        sink.put_many(batch)
+        report.imported += len(batch)
+    if before is not None:
+        report.duplicates = report.imported - (len(sink) - before)  # type: ignore[arg-type]
+    return report
+
+
+def _mapping(item: str) -> Tuple[str, str]:
+    column, sep, key = item.rpartition("=")
+    if not sep or not column or not key:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=KEY, got {item!r}")
+    return column, key
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m assistant.importer", description="Import learner profiles from a CSV or JSONL export."
+    )
+    parser.add_argument("source", help="CSV (with header) or JSON Lines export")
+    parser.add_argument("store", help="profile store: SQLite (.db/.sqlite) or append-only JSONL file")
+    parser.add_argument(
+        "--map", action="append", type=_mapping, default=[], metavar="COLUMN=KEY", help="extra column mapping"
+    )
+    parser.add_argument("--errors", help="write rejected rows as JSON Lines to this file")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args(argv)
+
+    columns = dict(args.map)
+    errors_fh = open(args.errors, "w", encoding="utf-8") if args.errors else None
+    on_error = (lambda e: errors_fh.write(json.dumps(asdict(e), ensure_ascii=False) + "\n")) if errors_fh else None
+    try:
+        with open_profile_store(args.store) as store:
+            report = import_profiles(
+                args.source,
+                store,
+                columns=columns,
+                batch_size=args.batch_size,
+                on_error=on_error,
+                max_errors=0,
+            )
+    finally:
+        if errors_fh is not None:
+            errors_fh.close()
+    print(json.dumps({k: v for k, v in asdict(report).items() if k != "errors"}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Iterable, List, Sequence
 
+from .answers import parse_hours, parse_level, parse_weeks
 from .models import UserProfile
 from .schemas import LearningProfilePayload
 
@@ -67,7 +68,11 @@ def intake_questions() -> Sequence[IntakeQuestion]:
 
 
 def build_profile_from_answers(name: str, answers: Dict[str, str]) -> UserProfile:
-    """Create a user profile from intake answers collected interactively."""
+    """Create a user profile from intake answers collected interactively.
+
+    Free-text time answers ("10h", "2 months", "5-7") and level synonyms ("newbie") are
+    normalized with the parsers in ``assistant.answers``.
+    """
 
     topics_raw = answers.get("interested_topics", "")
     topics = [t.strip() for t in topics_raw.split(",") if t.strip()] or ["python"]
@@ -75,8 +80,6 @@ def build_profile_from_answers(name: str, answers: Dict[str, str]) -> UserProfil
     providers_raw = answers.get("provider_requirements", "") or "DataCamp"
     providers = [p.strip() for p in providers_raw.split(",") if p.strip()]
 
-    weekly_time = answers.get("weekly_time_hours", "").strip()
-    timeframe_weeks = answers.get("timeframe_weeks", "").strip()
     phases_raw = answers.get("phased_focus", "")
     phases = [p.strip() for p in phases_raw.split(";") if p.strip()]
 
@@ -84,10 +87,10 @@ def build_profile_from_answers(name: str, answers: Dict[str, str]) -> UserProfil
         name=(answers.get("name") or name).strip() or "Learner",
         learning_goal=answers.get("learning_goal", "").strip() or "Grow data skills",
         interested_topics=topics,
-        current_level=answers.get("current_level", "").strip() or "beginner",
+        current_level=parse_level(answers.get("current_level")) or "beginner",
         provider_requirements=providers,
-        weekly_time_hours=int(weekly_time) if weekly_time.isdigit() else None,
-        timeframe_weeks=int(timeframe_weeks) if timeframe_weeks.isdigit() else None,
+        weekly_time_hours=parse_hours(answers.get("weekly_time_hours")),
+        timeframe_weeks=parse_weeks(answers.get("timeframe_weeks")),
         phased_focus=phases,
         special_requirements=[s.strip() for s in answers.get("special_requirements", "").split(",") if s.strip()],
     )
@@ -101,7 +104,7 @@ def build_profile_from_payload(payload: LearningProfilePayload) -> UserProfile:
         name=payload.name or "Learner",
         learning_goal=learning_goal,
         interested_topics=payload.learning_topics or ["python"],
-        current_level=payload.current_level.overall or "beginner",
+        current_level=parse_level(payload.current_level.overall) or "beginner",
         provider_requirements=payload.preferred_providers or ["DataCamp"],
         weekly_time_hours=payload.time_commitment.hours_per_week,
         timeframe_weeks=payload.time_commitment.timeframe_weeks,
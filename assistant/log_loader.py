@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import mmap
+import os
+from dataclasses import dataclass, field
+from functools import reduce
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from .batch import ordered_map
+from .logger import decode_line
+from .models import ConversationMessage
+
+T = TypeVar("T")
+
+Mapper = Callable[[List[ConversationMessage]], T]
+
+_EMPTY = object()
+
+
+@dataclass
+class LoadReport:
+    """Lines read by a parallel load, with the ones that could not be decoded."""
+
+    records: int = 0
+    bad_records: int = 0
+    bad_offsets: List[int] = field(default_factory=list)
+    max_offsets: int = 100
+
+    def add(self, records: int, bad_records: int, bad_offsets: List[int]) -> None:
+        self.records += records
+        self.bad_records += bad_records
+        room = self.max_offsets - len(self.bad_offsets)
+        if room > 0:
+            self.bad_offsets.extend(bad_offsets[:room])
+
+
+def split_ranges(path: str | Path, chunk_bytes: int = 32 * 1024 * 1024) -> List[Tuple[int, int]]:
+    """Split a JSONL file into [start, end) byte ranges that begin and end on line boundaries."""
+
+    size = os.path.getsize(path)
+    ranges: List[Tuple[int, int]] = []
+    start = 0
+    with open(path, "rb") as fh:
+        while start < size:
+            target = start + chunk_bytes
+            if target >= size:
+                end = size
+            else:
+                fh.seek(target)
+                fh.readline()  # finish the line that straddles the target
+                end = fh.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _iter_lines(path: str, start: int, end: int, use_mmap: bool) -> Iterator[Tuple[int, bytes]]:
+    """Yield (offset, line) for the complete lines in [start, end); an unterminated last line is skipped."""
+
+    with open(path, "rb") as fh:
+        if use_mmap:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Slice one line at a time rather than copying the whole range out of the map.
+                pos = start
+                while pos < end:
+                    newline = mm.find(b"\n", pos, end)
+                    if newline < 0:
+                        return  # torn or in-flight last record
+                    yield pos, mm[pos : newline + 1]
+                    pos = newline + 1
+            return
+        fh.seek(start)
+        pos = start
+        while pos < end:
+            line = fh.readline(end - pos)
+            if not line.endswith(b"\n"):
+                return
+            yield pos, line
+            pos += len(line)
+
+
+def _parse_range(task: Tuple[str, int, int, bool, Optional[Mapper]]) -> Tuple[object, int, int, List[int]]:
+    """Decode one range into (batch or mapper result, records, bad lines, first bad offsets)."""
+
+    path, start, end, use_mmap, mapper = task
+    messages: List[ConversationMessage] = []
+    bad_records = 0
+    bad_offsets: List[int] = []
+    for offset, line in _iter_lines(path, start, end, use_mmap):
+        if not line.strip():
+            continue
+        try:
+            messages.append(decode_line(line))
+        except (ValueError, KeyError, TypeError):  # torn or corrupt record; skip it like log_tools
+            bad_records += 1
+            if len(bad_offsets) < 100:
+                bad_offsets.append(offset)
+    result = mapper(messages) if mapper is not None else messages
+    return result, len(messages), bad_records, bad_offsets
+
+
+def _results(
+    path: str | Path,
+    chunk_bytes: int,
+    use_mmap: bool,
+    mapper: Optional[Mapper],
+    workers: Optional[int],
+    report: Optional[LoadReport],
+) -> Iterator[object]:
+    tasks = _tasks(path, chunk_bytes, use_mmap, mapper)
+    for result, records, bad_records, bad_offsets in ordered_map(_parse_range, tasks, workers=workers):
+        if report is not None:
+            report.add(records, bad_records, bad_offsets)
+        yield result
+
+
+def _tasks(
+    path: str | Path, chunk_bytes: int, use_mmap: bool, mapper: Optional[Mapper]
+) -> Iterator[Tuple[str, int, int, bool, Optional[Mapper]]]:
+    for start, end in split_ranges(path, chunk_bytes):
+        yield str(path), start, end, use_mmap, mapper
+
+
+def iter_message_batches(
+    path: str | Path,
+    *,
+    workers: Optional[int] = None,
+    chunk_bytes: int = 32 * 1024 * 1024,
+    use_mmap: bool = False,
+    report: Optional[LoadReport] = None,
+) -> Iterator[List[ConversationMessage]]:
+    """Parse a large JSONL log in a process pool, yielding one batch of messages per chunk in file order.
+
+    Lines that cannot be decoded are skipped; pass a LoadReport to count them and collect their
+    byte offsets.
+    """
+
+    if not Path(path).exists():
+        return
+    for batch in _results(path, chunk_bytes, use_mmap, None, workers, report):
+        yield batch  # type: ignore[misc]
+
+
+def map_reduce_log(
+    path: str | Path,
+    mapper: Mapper,
+    reducer: Optional[Callable[[T, T], T]] = None,
+    *,
+    workers: Optional[int] = None,
+    chunk_bytes: int = 32 * 1024 * 1024,
+    use_mmap: bool = False,
+    report: Optional[LoadReport] = None,
+) -> object:
+    """Run mapper over each chunk inside the workers and combine the results.
+
+    Only the mapper's summaries cross process boundaries, not the messages. ``mapper`` must be
+    picklable (a module-level function). With a reducer, results are folded in file order as
+    they arrive; without one they are returned as a list in file order. Undecodable lines are
+    skipped and, given a LoadReport, counted there.
+    """
+
+    if not Path(path).exists():
+        return [] if reducer is None else None
+    results = _results(path, chunk_bytes, use_mmap, mapper, workers, report)
+    if reducer is None:
+        return list(results)
+    first = next(results, _EMPTY)
+    if first is _EMPTY:
+        return None
+    return reduce(reducer, results, first)  # type: ignore[arg-type]
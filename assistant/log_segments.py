@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from .logger import encode_message, record_to_message
+from .models import ConversationMessage
+
+MANIFEST_NAME = "manifest.json"
+
+
+@dataclass
+class SegmentInfo:
+    """Manifest entry for one log segment."""
+
+    name: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+    records: int = 0
+    bytes: int = 0
+    compressed: bool = False
+
+    def overlaps(self, start: Optional[datetime], end: Optional[datetime]) -> bool:
+        if self.records == 0 or self.start is None or self.end is None:
+            return False
+        if start is not None and datetime.fromisoformat(self.end) < start:
+            return False
+        if end is not None and datetime.fromisoformat(self.start) > end:
+            return False
+        return True
+
+
+class SegmentedConversationLogger:
+    """JSONL conversation log split into rotating segments inside a directory.
+
+    The active segment rotates once it reaches ``max_segment_bytes`` or is older than
+    ``max_segment_age`` seconds. Closed segments are gzip-compressed on a background thread.
+    ``manifest.json`` records each segment's time range and record count, so time-window reads
+    only open the segments that overlap the window. On open, a record torn by a crash at the end
+    of the active segment is truncated away so new records start on a fresh line.
+    """
+
+    def __init__(
+        self,
+        log_dir: str | Path = "conversation_logs",
+        *,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_age: Optional[float] = 24 * 3600,
+        compress: bool = True,
+    ) -> None:
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-segment-gzip")
+        self._pending: List[Future] = []
+        self._fh: Optional[BinaryIO] = None
+        self._closed = False
+
+        self._segments: List[SegmentInfo] = []
+        self._active: Optional[SegmentInfo] = None
+        self._active_opened = time.time()
+        self._load_manifest()
+        self._save_manifest()  # persist the rescanned active segment and any crash cleanup
+        if self.compress:
+            for seg in self._segments:
+                if not seg.compressed:
+                    self._pending.append(self._compressor.submit(self._compress_segment, seg))
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.log_dir / MANIFEST_NAME
+
+    # ---------------- Writing ----------------
+
+    def append(self, message: ConversationMessage) -> None:
+        self.extend([message])
+
+    def extend(self, messages: Iterable[ConversationMessage]) -> None:
+        messages = list(messages)
+        if not messages:
+            return
+        data = b"".join(encode_message(m) for m in messages)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SegmentedConversationLogger is closed")
+            if self._should_rotate():
+                self._rotate()
+            active = self._ensure_active()
+            if self._fh is None:
+                self._fh = (self.log_dir / active.name).open("ab")
+            self._fh.write(data)
+            self._fh.flush()
+            active.records += len(messages)
+            active.bytes += len(data)
+            first = min(m.timestamp for m in messages).isoformat()
+            last = max(m.timestamp for m in messages).isoformat()
+            if active.start is None or datetime.fromisoformat(first) < datetime.fromisoformat(active.start):
+                active.start = first
+            if active.end is None or datetime.fromisoformat(last) > datetime.fromisoformat(active.end):
+                active.end = last
+
+    def rotate(self) -> None:
+        """Close the active segment now (it is compressed in the background)."""
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SegmentedConversationLogger is closed")
+            if self._active is not None and self._active.records:
+                self._rotate()
+
+    def close(self) -> None:
+        """Close the active file, persist the manifest and wait for pending compression."""
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self._save_manifest()
+        self._compressor.shutdown(wait=True)
+
+    def __enter__(self) -> "SegmentedConversationLogger":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def wait_for_compression(self) -> None:
+        for future in list(self._pending):
+            future.result()
+
+    def _should_rotate(self) -> bool:
+        active = self._active
+        if active is None or not active.records:
+            return False
+        if active.bytes >= self.max_segment_bytes:
+            return True
+        return self.max_segment_age is not None and time.time() - self._active_opened >= self.max_segment_age
+
+    def _ensure_active(self) -> SegmentInfo:
+        if self._active is None:
+            number = len(self._segments) + 1
+            if self._segments:
+                number = int(self._segments[-1].name.split("-")[1].split(".")[0]) + 1
+            self._active = SegmentInfo(name=f"segment-{number:06d}.jsonl")
+            self._active_opened = time.time()
+            self._save_manifest()
+        return self._active
+
+    def _rotate(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        closed = self._active
+        assert closed is not None
+        self._segments.append(closed)
+        self._active = None
+        self._save_manifest()
+        if self.compress:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(self._compressor.submit(self._compress_segment, closed))
+
+    def _compress_segment(self, seg: SegmentInfo) -> None:
+        source = self.log_dir / seg.name
+        target = self.log_dir / (seg.name + ".gz")
+        tmp = self.log_dir / (seg.name + ".gz.tmp")
+        if not source.exists():
+            return
+        with source.open("rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp, target)
+        with self._lock:
+            seg.name = target.name
+            seg.compressed = True
+            self._save_manifest()
+        source.unlink()
+
+    # ---------------- Manifest ----------------
+
+    def _load_manifest(self) -> None:
+        if not self.manifest_path.exists():
+            return
+        payload = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        self._segments = [SegmentInfo(**s) for s in payload.get("segments", [])]
+        for seg in self._segments:
+            # A crash mid-compression can leave both the plain and the .gz file behind; keep the
+            # one the manifest trusts and let the other be rebuilt or dropped.
+            if seg.compressed:
+                leftover = self.log_dir / seg.name[: -len(".gz")]
+                if leftover.exists():
+                    leftover.unlink()
+            elif (self.log_dir / (seg.name + ".gz")).exists():
+                if (self.log_dir / seg.name).exists():
+                    (self.log_dir / (seg.name + ".gz")).unlink()
+                else:
+                    seg.name += ".gz"
+                    seg.compressed = True
+        active = payload.get("active")
+        if active:
+            self._active = self._scan_segment(active["name"])
+            self._active_opened = active.get("opened_at", time.time())
+
+    def _save_manifest(self) -> None:
+        payload = {
+            "version": 1,
+            "segments": [asdict(s) for s in self._segments],
+            "active": (
+                {**asdict(self._active), "opened_at": self._active_opened} if self._active is not None else None
+            ),
+        }
+        tmp = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def _scan_segment(self, name: str) -> SegmentInfo:
+        """Rebuild stats for the active segment, which may have grown past the last manifest save.
+
+        An unterminated last line (a record torn by a crash) is truncated, as in
+        ConversationLogger.recover, so the next append does not continue the partial line.
+        """
+
+        info = SegmentInfo(name=name)
+        path = self.log_dir / name
+        if not path.exists():
+            return info
+        start: Optional[datetime] = None
+        end: Optional[datetime] = None
+        with path.open("r+b") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    fh.truncate(info.bytes)
+                    break
+                info.bytes += len(line)
+                try:
+                    ts = datetime.fromisoformat(json.loads(line)["timestamp"])
+                except (ValueError, KeyError):
+                    continue  # blank or corrupt line
+                info.records += 1
+                start = ts if start is None or ts < start else start
+                end = ts if end is None or ts > end else end
+        info.start = start.isoformat() if start else None
+        info.end = end.isoformat() if end else None
+        return info
+
+    # ---------------- Reading ----------------
+
+    def segments(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[SegmentInfo]:
+        """Return manifest entries (oldest first) whose time range overlaps [start, end]."""
+
+        with self._lock:
+            candidates = list(self._segments)
+            if self._active is not None:
+                candidates.append(self._active)
+            return [SegmentInfo(**asdict(s)) for s in candidates if s.overlaps(start, end)]
+
+    def iter_messages(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> Iterator[ConversationMessage]:
+        """Stream messages with start <= timestamp <= end, opening only overlapping segments."""
+
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+        for seg in self.segments(start, end):
+            with self._open_segment(seg) as fh:
+                for line in fh:
+                    if not line.endswith(b"\n"):
+                        break  # torn or in-flight last record
+                    if not line.strip():
+                        continue
+                    message = record_to_message(json.loads(line))
+                    if start is not None and message.timestamp < start:
+                        continue
+                    if end is not None and message.timestamp > end:
+                        continue
+                    yield message
+
+    def _open_segment(self, seg: SegmentInfo) -> BinaryIO:
+        """Open a segment for reading, following it to its .gz file if it was compressed meanwhile."""
+
+        if not seg.compressed:
+            try:
+                return (self.log_dir / seg.name).open("rb")
+            except FileNotFoundError:
+                pass  # the compressor writes the .gz before unlinking the plain file
+            return gzip.open(self.log_dir / (seg.name + ".gz"), "rb")  # type: ignore[return-value]
+        return gzip.open(self.log_dir / seg.name, "rb")  # type: ignore[return-value]
+
+    def load(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> List[ConversationMessage]:
+        return list(self.iter_messages(start, end))
+
+    def closed_segments(self) -> List[SegmentInfo]:
+        """Return copies of the manifest entries for closed (no longer written) segments."""
+
+        with self._lock:
+            return [SegmentInfo(**asdict(s)) for s in self._segments]
+
+    def replace_segment(self, info: SegmentInfo) -> None:
+        """Update a closed segment's manifest entry after its file was rewritten, e.g. by compaction.
+
+        An entry with ``records == 0`` stays in the manifest (keeping segment numbering) but is
+        never opened by readers.
+        """
+
+        with self._lock:
+            for i, seg in enumerate(self._segments):
+                if seg.name == info.name:
+                    self._segments[i] = SegmentInfo(**asdict(info))
+                    self._save_manifest()
+                    return
+        raise KeyError(f"No closed segment named {info.name!r}")
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from .logger import decode_line, frame_payload
+
+
+@dataclass
+class LogReport:
+    """Result of scanning a conversation log for damaged records."""
+
+    path: str
+    bytes: int = 0
+    records: int = 0
+    bad_records: int = 0
+    bad_offsets: List[int] = field(default_factory=list)
+    unterminated_tail: bool = False
+    framed_records: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.bad_records == 0 and not self.unterminated_tail
+
+
+def _check_line(line: bytes, deep: bool) -> bool:
+    """Validate one line and return whether it was a framed record."""
+
+    if line.lstrip()[:1] == b"{":
+        decode_line(line)
+        return False
+    payload = frame_payload(line)
+    if deep:
+        decode_line(payload)
+    return True
+
+
+def verify_log(path: str | Path, *, max_offsets: int = 100, deep: bool = False) -> LogReport:
+    """Check that every line of a conversation log holds one whole record.
+
+    Framed records are checked by length and CRC32 only, which keeps the scan close to disk
+    speed; ``deep=True`` also parses their JSON. Plain JSONL lines carry no checksum and are
+    always parsed. Interleaved writes from concurrent appenders and torn records show up as
+    bad lines; their byte offsets are listed (up to max_offsets) so they can be inspected or cut out.
+    """
+
+    report = LogReport(path=str(path))
+    with Path(path).open("rb", buffering=1024 * 1024) as fh:
+        offset = 0
+        for line in fh:
+            start = offset
+            offset += len(line)
+            if not line.endswith(b"\n"):
+                report.unterminated_tail = True
+            if not line.strip():
+                continue
+            try:
+                report.framed_records += _check_line(line, deep)
+            except (ValueError, KeyError, TypeError):
+                report.bad_records += 1
+                if len(report.bad_offsets) < max_offsets:
+                    report.bad_offsets.append(start)
+            else:
+                report.records += 1
+        report.bytes = offset
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m assistant.log_tools", description="Conversation log tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    verify = commands.add_parser("verify", help="check log files for torn or interleaved records")
+    verify.add_argument("paths", nargs="+", help="JSONL or framed log files")
+    verify.add_argument("--deep", action="store_true", help="also parse the JSON of checksummed records")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for path in args.paths:
+        report = verify_log(path, deep=args.deep)
+        print(json.dumps(asdict(report)))
+        if not report.ok:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
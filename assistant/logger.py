@@ -1,48 +1,570 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
+import os
+import threading
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
 
 from .models import ConversationMessage
 
+try:  # advisory locks are POSIX-only; elsewhere concurrent mode relies on O_APPEND alone
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+FSYNC_POLICIES = ("none", "flush", "always")
+RECORD_FORMATS = ("jsonl", "framed")
+
+# Framed records are "<length> <crc32> <json>\n" with both header fields as 8 hex digits.
+_FRAME_HEADER_BYTES = 18
+
+# Largest write issued under a shared advisory lock in concurrent mode; shared holders append
+# in parallel, since on local POSIX filesystems a single O_APPEND write of this size lands as
+# one contiguous unit. Bigger records take the lock exclusively. Without fcntl (Windows) no lock
+# is taken, and records over this size from different writers can interleave.
+ATOMIC_APPEND_BYTES = 64 * 1024
+
+# Version 2 of the sparse ``.idx`` index records whether timestamps never go backwards.
+INDEX_VERSION = 2
+
+
+def message_to_record(message: ConversationMessage) -> Dict[str, Any]:
+    record = {
+        "role": message.role,
+        "content": message.content,
+        "timestamp": message.timestamp.isoformat(),
+    }
+    if message.session_id is not None:
+        record["session_id"] = message.session_id
+    if message.learner_id is not None:
+        record["learner_id"] = message.learner_id
+    return record
+
+
+def record_to_message(payload: Dict[str, Any]) -> ConversationMessage:
+    return ConversationMessage(
+        role=payload["role"],
+        content=payload["content"],
+        timestamp=datetime.fromisoformat(payload["timestamp"]),
+        session_id=payload.get("session_id"),
+        learner_id=payload.get("learner_id"),
+    )
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    """Naive UTC time for comparisons; naive timestamps (datetime.utcnow) are already UTC."""
+
+    return ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo is not None else ts
+
+
+class CorruptRecordError(ValueError):
+    """Raised when a framed record fails its length or checksum check."""
+
+
+def encode_message(message: ConversationMessage, record_format: str = "jsonl") -> bytes:
+    """Serialize a message as one log line, newline included.
+
+    "framed" prefixes the JSON with its byte length and CRC32 so torn or corrupted records
+    are detected without parsing them.
+    """
+
+    return encode_record(message_to_record(message), record_format)
+
+
+def encode_record(record: Dict[str, Any], record_format: str = "jsonl") -> bytes:
+    payload = json.dumps(record, ensure_ascii=False).encode("utf-8")
+    if record_format == "framed":
+        return b"%08x %08x " % (len(payload), zlib.crc32(payload)) + payload + b"\n"
+    return payload + b"\n"
+
+
+def frame_payload(line: bytes) -> bytes:
+    """Return the JSON payload of a framed line after checking its length and CRC32."""
+
+    body = line.rstrip(b"\r\n")
+    try:
+        length = int(body[0:8], 16)
+        crc = int(body[9:17], 16)
+    except ValueError:
+        raise CorruptRecordError("Malformed record frame header") from None
+    payload = body[_FRAME_HEADER_BYTES:]
+    if len(payload) != length or body[8:9] != b" " or body[17:18] != b" ":
+        raise CorruptRecordError(f"Record frame declares {length} bytes but holds {len(payload)}")
+    if zlib.crc32(payload) != crc:
+        raise CorruptRecordError("Record checksum mismatch")
+    return payload
+
+
+def decode_record(line: bytes) -> Dict[str, Any]:
+    """Parse one log line into its record dict; JSONL and framed lines are both accepted."""
+
+    if line.lstrip()[:1] == b"{":
+        return json.loads(line)
+    return json.loads(frame_payload(line))
+
+
+def decode_line(line: bytes) -> ConversationMessage:
+    return record_to_message(decode_record(line))
+
+
+def writers_lock_path(log_path: Path) -> Path:
+    """Lock file held by writers that cannot follow a compaction; see ``compaction_safe``."""
+
+    return log_path.with_name(log_path.name + ".writers")
+
+
+def _group_records(records: List[bytes], limit: int) -> Iterator[bytes]:
+    """Join consecutive records into chunks of at most limit bytes, never splitting a record."""
+
+    chunk: List[bytes] = []
+    size = 0
+    for record in records:
+        if chunk and size + len(record) > limit:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+        chunk.append(record)
+        size += len(record)
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
 
 class ConversationLogger:
-    """Simple JSONL logger for assistant conversations."""
+    """Simple JSONL logger for assistant conversations.
+
+    By default every append opens, writes and closes the log file. With ``buffered=True`` the
+    file handle stays open and serialized records collect in memory until ``buffer_bytes`` or
+    ``flush_interval`` seconds is reached (checked on each append) or ``flush()`` is called.
+    ``fsync`` sets durability: "none" leaves it to the OS, "flush" syncs after each flush, and
+    "always" flushes and syncs every record. Buffered loggers should be closed, ideally by using
+    them as a context manager.
 
-    def __init__(self, log_path: str | Path = "conversation_log.jsonl") -> None:
+    ``record_format="framed"`` writes each record with a length and CRC32 header. Before the
+    first write the logger checks the end of the file (not the whole file) for a record torn
+    by a crash, moves the damaged bytes to ``<log>.quarantine`` and truncates them, so new
+    records never land after a partial line. Readers accept either format.
+
+    ``compaction_safe=True`` lets ``assistant.compaction`` rewrite the file while this logger
+    keeps appending: each write holds a shared lock and reopens the file if it was swapped.
+    Other loggers hold a shared lock on ``<log>.writers`` from their first write until
+    ``close()``, and compaction refuses to run while any of them does.
+    """
+
+    def __init__(
+        self,
+        log_path: str | Path = "conversation_log.jsonl",
+        *,
+        buffered: bool = False,
+        buffer_bytes: int = 64 * 1024,
+        flush_interval: Optional[float] = 1.0,
+        fsync: str = "none",
+        index_every: int = 1000,
+        concurrent: bool = False,
+        max_record_bytes: Optional[int] = None,
+        record_format: str = "jsonl",
+        recover: Optional[bool] = None,
+        compaction_safe: bool = False,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        if record_format not in RECORD_FORMATS:
+            raise ValueError(f"record_format must be one of {RECORD_FORMATS}, got {record_format!r}")
         self.log_path = Path(log_path)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.buffered = buffered
+        self.buffer_bytes = buffer_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.concurrent = concurrent
+        self.max_record_bytes = max_record_bytes
+        self.record_format = record_format
+        self.compaction_safe = compaction_safe
+        # With several appenders an unterminated tail may be another process's in-flight write.
+        self._needs_recovery = (record_format == "framed" and not concurrent) if recover is None else recover
+        self._fh: Optional[BinaryIO] = None
+        self._fd: Optional[int] = None
+        self._writers_lock: Optional[BinaryIO] = None
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.index_every = index_every
+        self._index: Optional[Dict[str, Any]] = None
+        self._entry_times: List[datetime] = []
+        self._entry_records: List[int] = []
 
     def append(self, message: ConversationMessage) -> None:
-        record = {
-            "role": message.role,
-            "content": message.content,
-            "timestamp": message.timestamp.isoformat(),
-        }
-        with self.log_path.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._add([encode_message(message, self.record_format)])
+
+    def extend(self, messages: Iterable[ConversationMessage]) -> None:
+        records = [encode_message(msg, self.record_format) for msg in messages]
+        if records:
+            self._add(records)
+
+    def flush(self) -> None:
+        """Write any buffered records to disk, applying the fsync policy."""
+
+        with self._lock:
+            self._flush_locked()
+
+    @property
+    def buffered_records(self) -> int:
+        """Records accepted by append/extend but not yet written to the file."""
+
+        return len(self._pending)
+
+    def discard_buffer(self) -> int:
+        """Drop buffered records that could not be written; returns how many were dropped."""
+
+        with self._lock:
+            dropped = len(self._pending)
+            self._pending.clear()
+            self._pending_bytes = 0
+        return dropped
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            if self._writers_lock is not None:
+                self._writers_lock.close()
+                self._writers_lock = None
+
+    def __enter__(self) -> "ConversationLogger":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _add(self, records: List[bytes]) -> None:
+        if self.max_record_bytes is not None:
+            for record in records:
+                if len(record) > self.max_record_bytes:
+                    raise ValueError(
+                        f"Record of {len(record)} bytes exceeds max_record_bytes={self.max_record_bytes}"
+                    )
+        if not self.buffered:
+            with self._lock:
+                self._write(records)
+            return
+
+        with self._lock:
+            self._pending.extend(records)
+            self._pending_bytes += sum(len(r) for r in records)
+            if (
+                self.fsync == "always"
+                or self._pending_bytes >= self.buffer_bytes
+                or (
+                    self.flush_interval is not None
+                    and time.monotonic() - self._last_flush >= self.flush_interval
+                )
+            ):
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        self._write(self._pending)
+        self._pending.clear()
+        self._pending_bytes = 0
+
+    @property
+    def quarantine_path(self) -> Path:
+        return self.log_path.with_name(self.log_path.name + ".quarantine")
+
+    def recover(self, *, block_size: int = 64 * 1024) -> int:
+        """Cut a torn or corrupt tail off the log and return the number of bytes removed.
+
+        Only the end of the file is read: trailing records are checked backwards until one
+        decodes. The removed bytes are appended to ``quarantine_path`` for inspection.
+        """
+
+        with self._lock:
+            self._needs_recovery = False
+            return self._recover_locked(block_size)
+
+    def _recover_locked(self, block_size: int) -> int:
+        if not self.log_path.exists():
+            return 0
+        with self.log_path.open("r+b") as fh:
+            size = fh.seek(0, os.SEEK_END)
+            good_end = size
+            pos = size
+            data = b""
+            while pos > 0:
+                step = min(block_size, pos)
+                pos -= step
+                fh.seek(pos)
+                data = fh.read(step) + data
+                lines = data.split(b"\n")
+                # lines[-1] is whatever follows the last newline: empty or a torn record.
+                # lines[0] may be cut by the block boundary unless we reached the file start.
+                end = size - len(lines[-1])
+                valid = False
+                for line in reversed(lines[(1 if pos else 0) : -1]):
+                    if line.strip():
+                        try:
+                            decode_record(line)
+                        except (ValueError, KeyError, TypeError):
+                            pass
+                        else:
+                            valid = True
+                            break
+                    end -= len(line) + 1
+                if valid or pos == 0:
+                    good_end = end
+                    break
+            if good_end == size:
+                return 0
+            fh.seek(good_end)
+            damaged = fh.read()
+            with self.quarantine_path.open("ab") as out:
+                out.write(b"# offset=%d bytes=%d\n" % (good_end, len(damaged)) + damaged + b"\n")
+            fh.truncate(good_end)
+        return size - good_end
+
+    def _write(self, records: List[bytes]) -> None:
+        if not self.compaction_safe and self._writers_lock is None and fcntl is not None:
+            self._writers_lock = self.writers_lock_path.open("ab")
+            fcntl.flock(self._writers_lock.fileno(), fcntl.LOCK_SH)  # waits out a running compaction
+        if self._needs_recovery:
+            self._needs_recovery = False
+            self._recover_locked(64 * 1024)
+        if self.concurrent or self.compaction_safe:
+            self._append_fd(records)
+            return
+        data = b"".join(records)
+        if not self.buffered:
+            with self.log_path.open("ab") as fh:
+                fh.write(data)
+                if self.fsync != "none":
+                    fh.flush()
+                    os.fsync(fh.fileno())
+            return
+        if self._fh is None:
+            self._fh = self.log_path.open("ab")
+        self._fh.write(data)
+        self._fh.flush()
+        if self.fsync != "none":
+            os.fsync(self._fh.fileno())
+
+    def _append_fd(self, records: List[bytes]) -> None:
+        chunks = _group_records(records, ATOMIC_APPEND_BYTES) if self.concurrent else [b"".join(records)]
+        for chunk in chunks:
+            if fcntl is None:
+                _write_all(self._open_fd(), chunk)
+                continue
+            # Every writer locks, so an exclusive holder really excludes the small appends too.
+            exclusive = self.concurrent and len(chunk) > ATOMIC_APPEND_BYTES
+            fd = self._lock_current(fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                _write_all(fd, chunk)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        if self.fsync != "none" and self._fd is not None:
+            os.fsync(self._fd)
+
+    def _open_fd(self) -> int:
+        if self._fd is None:
+            self._fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _lock_current(self, mode: int) -> int:
+        """Lock the open descriptor, reopening first if a compaction swapped the file underneath it."""
+
+        while True:
+            fd = self._open_fd()
+            fcntl.flock(fd, mode)
+            try:
+                if os.stat(self.log_path).st_ino == os.fstat(fd).st_ino:
+                    return fd
+            except FileNotFoundError:
+                pass
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+            self._fd = None
+
+    @property
+    def writers_lock_path(self) -> Path:
+        return writers_lock_path(self.log_path)
+
+    @property
+    def index_path(self) -> Path:
+        return self.log_path.with_name(self.log_path.name + ".idx")
 
     def load(self) -> List[ConversationMessage]:
+        return list(self.iter_messages())
+
+    def iter_messages(self) -> Iterator[ConversationMessage]:
+        """Stream every message in the log without holding them all in memory."""
+
+        self.flush()
         if not self.log_path.exists():
+            return
+        with self.log_path.open("rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break  # torn or in-flight last record
+                if line.strip():
+                    yield decode_line(line)
+
+    def tail(self, n: int, *, block_size: int = 64 * 1024) -> List[ConversationMessage]:
+        """Return the last n messages, reading backwards from the end of the file."""
+
+        self.flush()
+        if n <= 0 or not self.log_path.exists():
+            return []
+        with self.log_path.open("rb") as fh:
+            pos = fh.seek(0, os.SEEK_END)
+            data = b""
+            lines: List[bytes] = []
+            while pos > 0:
+                step = min(block_size, pos)
+                pos -= step
+                fh.seek(pos)
+                data = fh.read(step) + data
+                # The last piece is an unterminated (in-flight) line; the first may be cut by the block.
+                lines = [line for line in data.split(b"\n")[(1 if pos else 0) : -1] if line.strip()]
+                if len(lines) >= n:
+                    break
+        return [decode_line(line) for line in lines[-n:]]
+
+    def since(self, timestamp: datetime) -> Iterator[ConversationMessage]:
+        """Stream messages with timestamp >= the given time, seeking via the sparse index.
+
+        The seek is only used while the log's timestamps are non-decreasing (the index records
+        this); once a record is older than the one before it, the whole log is scanned. Aware and
+        naive times are compared in UTC, naive ones being taken as UTC already.
+        """
+
+        timestamp = _naive_utc(timestamp)
+        index = self.refresh_index()
+        entries = index["entries"]
+        start = 0
+        if index["monotonic"]:
+            # Start at the last entry strictly older than timestamp; equal timestamps may precede
+            # an entry that matches exactly.
+            pos = bisect_left(self._entry_times, timestamp) - 1
+            start = entries[pos][1] if pos >= 0 else 0
+        for message in self._iter_from(start, index["offset"]):
+            if _naive_utc(message.timestamp) >= timestamp:
+                yield message
+
+    def page(self, offset: int, size: int) -> List[ConversationMessage]:
+        """Return up to size messages starting at record number offset (0-based)."""
+
+        if offset < 0 or size <= 0:
             return []
+        index = self.refresh_index()
+        entries = index["entries"]
+        pos = bisect_right(self._entry_records, offset) - 1
+        record, start = (entries[pos][0], entries[pos][1]) if pos >= 0 else (0, 0)
+        messages = self._iter_from(start, index["offset"], skip=offset - record)
+        return list(islice(messages, size))
+
+    def refresh_index(self) -> Dict[str, Any]:
+        """Bring the sparse offset index up to date with the log and return it.
+
+        The index remembers the log's inode, so one built before a compaction swapped the file
+        is discarded even when the new file has since grown past the indexed offset.
+        """
+
+        self.flush()
+        index = self._index
+        if index is None and self.index_path.exists():
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        try:
+            stat = self.log_path.stat()
+            size, inode = stat.st_size, stat.st_ino
+        except FileNotFoundError:
+            size, inode = 0, None
+        if (
+            index is None
+            or index.get("version") != INDEX_VERSION
+            or index.get("every") != self.index_every
+            or index.get("inode") != inode
+            or size < index["offset"]
+        ):
+            index = {
+                "version": INDEX_VERSION,
+                "every": self.index_every,
+                "inode": inode,
+                "records": 0,
+                "offset": 0,
+                "last": None,
+                "monotonic": True,
+                "entries": [],
+            }
+        if index is not self._index:
+            self._entry_times = []
+            self._entry_records = []
+        if size > index["offset"]:
+            self._scan_into_index(index)
+            tmp = self.index_path.with_name(self.index_path.name + ".tmp")
+            tmp.write_text(json.dumps(index), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        self._index = index
+        entries = index["entries"]
+        new_entries = entries[len(self._entry_times) :]
+        self._entry_times.extend(_naive_utc(datetime.fromisoformat(e[2])) for e in new_entries)
+        self._entry_records.extend(e[0] for e in entries[len(self._entry_records) :])
+        return index
+
+    def _scan_into_index(self, index: Dict[str, Any]) -> None:
+        records = index["records"]
+        offset = index["offset"]
+        last = _naive_utc(datetime.fromisoformat(index["last"])) if index["last"] else None
+        monotonic = index["monotonic"]
+        with self.log_path.open("rb") as fh:
+            fh.seek(offset)
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break  # partial trailing record; index it once it is complete
+                if line.strip():
+                    timestamp = _naive_utc(decode_line(line).timestamp)
+                    if records % self.index_every == 0:
+                        index["entries"].append([records, offset, timestamp.isoformat()])
+                    if monotonic and last is not None and timestamp < last:
+                        monotonic = False
+                    last = timestamp
+                    records += 1
+                offset += len(line)
+        index["records"] = records
+        index["offset"] = offset
+        index["last"] = last.isoformat() if last else None
+        index["monotonic"] = monotonic
 
-        messages: List[ConversationMessage] = []
-        with self.log_path.open("r", encoding="utf-8") as fh:
+    def _iter_from(self, start: int, end: int, *, skip: int = 0) -> Iterator[ConversationMessage]:
+        if start >= end:
+            return
+        with self.log_path.open("rb") as fh:
+            fh.seek(start)
+            pos = start
             for line in fh:
+                pos += len(line)
+                if pos > end:
+                    break
                 if not line.strip():
                     continue
-                payload = json.loads(line)
-                messages.append(
-                    ConversationMessage(
-                        role=payload["role"],
-                        content=payload["content"],
-                        timestamp=datetime.fromisoformat(payload["timestamp"]),
-                    )
-                )
-        return messages
-
-    def extend(self, messages: Iterable[ConversationMessage]) -> None:
-        for msg in messages:
-            self.append(msg)
+                if skip:
+                    skip -= 1
+                    continue
+                yield decode_line(line)
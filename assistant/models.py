@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence, Tuple, Union, overload
 
 
 @dataclass
@@ -18,6 +18,7 @@ class UserProfile:
     timeframe_weeks: Optional[int] = None
     phased_focus: List[str] = field(default_factory=list)
     special_requirements: List[str] = field(default_factory=list)
+    learner_id: Optional[str] = None
 
 
 @dataclass
@@ -43,6 +44,132 @@ class LearningPlanStep:
     est_time_hours: Optional[int] = None
 
 
+@dataclass(frozen=True)
+class FrozenPlanStep:
+    """Read-only copy of a LearningPlanStep (resources as a tuple), safe to share between plans."""
+
+    title: str
+    description: str
+    resources: Tuple[str, ...] = ()
+    est_time_hours: Optional[int] = None
+
+    @classmethod
+    def freeze(cls, step: Union[LearningPlanStep, "FrozenPlanStep"]) -> "FrozenPlanStep":
+        if isinstance(step, FrozenPlanStep):
+            return step
+        return cls(step.title, step.description, tuple(step.resources), step.est_time_hours)
+
+    def thaw(self) -> LearningPlanStep:
+        """A new, independent LearningPlanStep with the same content."""
+
+        return LearningPlanStep(self.title, self.description, list(self.resources), self.est_time_hours)
+
+
+@dataclass(frozen=True)
+class WeeklyPlanStep:
+    """One week of a weekly plan: a shared plan step plus the week index it is scheduled in."""
+
+    step: FrozenPlanStep
+    week: int
+    default_hours: Optional[int] = None
+
+    @property
+    def title(self) -> str:
+        return f"Week {self.week + 1}: {self.step.title}"
+
+    @property
+    def description(self) -> str:
+        return self.step.description
+
+    @property
+    def resources(self) -> Tuple[str, ...]:
+        return self.step.resources
+
+    @property
+    def est_time_hours(self) -> Optional[int]:
+        return self.step.est_time_hours or self.default_hours
+
+    def to_step(self) -> LearningPlanStep:
+        """Materialize this week as a standalone LearningPlanStep."""
+
+        return LearningPlanStep(
+            title=self.title,
+            description=self.description,
+            resources=list(self.resources),
+            est_time_hours=self.est_time_hours,
+        )
+
+
+class WeeklyPlan(Sequence[WeeklyPlanStep]):
+    """Immutable week-by-week schedule that cycles through a shared tuple of plan steps.
+
+    Only the unique steps are stored, frozen on construction so later edits to the source plan
+    do not show through; week entries are created on access, so memory grows with the number of
+    steps rather than the number of weeks. It is a read-only sequence: use ``to_steps()`` where
+    a mutable list of LearningPlanStep is needed. A zero or negative week count gives an empty
+    plan, as the list form did.
+    """
+
+    __slots__ = ("_steps", "_weeks", "_weekly_time_hours")
+
+    def __init__(
+        self,
+        steps: Sequence[Union[LearningPlanStep, FrozenPlanStep]],
+        weeks: int,
+        weekly_time_hours: Optional[int] = None,
+    ) -> None:
+        self._steps: Tuple[FrozenPlanStep, ...] = tuple(map(FrozenPlanStep.freeze, steps))
+        self._weeks = max(weeks, 0) if self._steps else 0
+        self._weekly_time_hours = weekly_time_hours
+
+    @property
+    def steps(self) -> Tuple[FrozenPlanStep, ...]:
+        return self._steps
+
+    @property
+    def weekly_time_hours(self) -> Optional[int]:
+        return self._weekly_time_hours
+
+    def __len__(self) -> int:
+        return self._weeks
+
+    @overload
+    def __getitem__(self, index: int) -> WeeklyPlanStep: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[WeeklyPlanStep]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[WeeklyPlanStep, List[WeeklyPlanStep]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._weeks))]
+        if index < 0:
+            index += self._weeks
+        if not 0 <= index < self._weeks:
+            raise IndexError("week index out of range")
+        return WeeklyPlanStep(self._steps[index % len(self._steps)], index, self._weekly_time_hours)
+
+    def __iter__(self) -> Iterator[WeeklyPlanStep]:
+        for week in range(self._weeks):
+            yield WeeklyPlanStep(self._steps[week % len(self._steps)], week, self._weekly_time_hours)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, WeeklyPlan):
+            return NotImplemented
+        return (self._steps, self._weeks, self._weekly_time_hours) == (
+            other._steps,
+            other._weeks,
+            other._weekly_time_hours,
+        )
+
+    def __repr__(self) -> str:
+        return f"WeeklyPlan(weeks={self._weeks}, unique_steps={len(self._steps)})"
+
+    def to_steps(self) -> List[LearningPlanStep]:
+        """Materialize every week as a LearningPlanStep (the pre-sharing list form)."""
+
+        return [week.to_step() for week in self]
+
+
 @dataclass
 class LearningPlan:
     """A structured plan with multiple steps."""
@@ -59,3 +186,5 @@ class ConversationMessage:
     role: str
     content: str
     timestamp: datetime = field(default_factory=datetime.utcnow)
+    session_id: Optional[str] = None
+    learner_id: Optional[str] = None
@@ -1,33 +1,327 @@
 from __future__ import annotations
 
-import random
-from typing import Optional
+import hashlib
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date
+from functools import lru_cache
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from .models import UserProfile
 
+# Template IDs are positions in TEMPLATES; append new templates at the end so stored IDs stay valid.
+OPENER_TEMPLATES = (
+    "Hey {name}, you’ve got this!",
+    "Keep it up, {name}!",
+    "Great work staying committed, {name}!",
+)
+ENCOURAGEMENT_TEMPLATES = (
+    "Every small session compounds into big gains.",
+    "Momentum beats perfection—show up for today’s session.",
+    "Remember why you started and celebrate each checkpoint.",
+)
+PROGRESS_TEMPLATE = "Nice! You’re {progress_percent}% into your plan already."
+LAST_ACTION_TEMPLATE = "Your last win: {last_action}. Let’s build on it."
+
+TEMPLATES = OPENER_TEMPLATES + ENCOURAGEMENT_TEMPLATES + (PROGRESS_TEMPLATE, LAST_ACTION_TEMPLATE)
+
+_SLOTS = ("name", "progress_percent", "last_action")
+_SLOT_RE = re.compile(r"\{(\w+)\}")
+
+Values = Tuple[str, str, str]
+
+
+class _Template:
+    """A template compiled to a %-format string plus a getter for its slot values."""
+
+    __slots__ = ("id", "text", "_fmt", "_get")
+
+    def __init__(self, template_id: int, text: str) -> None:
+        self.id = template_id
+        self.text = text
+        slots = [_SLOTS.index(name) for name in _SLOT_RE.findall(text)]
+        self._fmt = _SLOT_RE.sub("%s", text.replace("%", "%%"))
+        self._get = itemgetter(*slots) if slots else None
+
+    def render(self, values: Values) -> str:
+        if self._get is None:
+            return self.text
+        return self._fmt % self._get(values)
+
+
+_COMPILED = tuple(_Template(i, text) for i, text in enumerate(TEMPLATES))
+_OPENERS = _COMPILED[: len(OPENER_TEMPLATES)]
+_BASE = _COMPILED[len(OPENER_TEMPLATES) : len(OPENER_TEMPLATES) + len(ENCOURAGEMENT_TEMPLATES)]
+_PROGRESS = _COMPILED[TEMPLATES.index(PROGRESS_TEMPLATE)]
+_LAST_ACTION = _COMPILED[TEMPLATES.index(LAST_ACTION_TEMPLATE)]
+
+# Encouragement pools keyed by (has progress, has last action), built once.
+_POOLS: Dict[Tuple[bool, bool], Tuple[_Template, ...]] = {
+    (progress, last): _BASE + ((_PROGRESS,) if progress else ()) + ((_LAST_ACTION,) if last else ())
+    for progress in (False, True)
+    for last in (False, True)
+}
+
+# Every (opener, encouragement) combination of each pool pre-joined into one compiled template,
+# at index opener + len(openers) * encouragement, so a message is one lookup and one format.
+_PAIRS: Dict[Tuple[bool, bool], Tuple[_Template, ...]] = {
+    flags: tuple(_Template(-1, opener.text + " " + enc.text) for enc in pool for opener in _OPENERS)
+    for flags, pool in _POOLS.items()
+}
+
+
+@lru_cache(maxsize=None)
+def _allowed_pairs(
+    flags: Tuple[bool, bool], recent: int
+) -> Tuple[Tuple[_Template, ...], Tuple[Tuple[int, int], ...]]:
+    """Pairs (and their template IDs) avoiding the templates in the ``recent`` bitmask.
+
+    Openers and encouragements are filtered separately and a side falls back to its full list
+    when everything in it was used recently. With ``recent == 0`` this is ``_PAIRS[flags]``.
+    """
+
+    pool = _POOLS[flags]
+    pairs = _PAIRS[flags]
+    openers = [i for i, o in enumerate(_OPENERS) if not recent >> o.id & 1] or range(len(_OPENERS))
+    encouragements = [i for i, e in enumerate(pool) if not recent >> e.id & 1] or range(len(pool))
+    keep = [e * len(_OPENERS) + o for e in encouragements for o in openers]
+    ids = tuple((_OPENERS[i % len(_OPENERS)].id, pool[i // len(_OPENERS)].id) for i in keep)
+    return tuple(pairs[i] for i in keep), ids
+
+
+class TemplateHistory:
+    """Template IDs used in each learner's last few daily messages, kept in flat arrays.
+
+    Learners are hashed (CRC32 of ``learner_key``) onto ``slots`` rows of ``days`` entries, so
+    memory is fixed at ``slots * days`` entries (a bitmask of one byte while there are at most
+    eight templates, plus a 4-byte stamp) however many learners there are. Size ``slots`` to
+    about the number of learners; the arrays are only allocated once a message is recorded.
+    Each row is a ring indexed by the date. Every entry is stamped with a 16-bit learner tag and
+    the day it was written, and only entries whose stamp matches this learner and one of the
+    previous ``days - 1`` days exclude templates. A learner who skipped days is therefore not held back
+    by older picks, and a colliding learner's picks are ignored. A collision can still overwrite
+    a learner's entry, so in rare cases a learner may see a recent sentence again.
+    """
+
+    _HEADER = struct.Struct("<4sBBQ")
+    _MAGIC = b"MTH2"
+    _TYPECODE = next(c for c in "BHIQ" if array(c).itemsize * 8 >= len(TEMPLATES))
+
+    def __init__(self, slots: int = 1 << 16, *, days: int = 3) -> None:
+        if slots < 1 or days < 2:
+            raise ValueError("TemplateHistory needs slots >= 1 and days >= 2")
+        self.slots = slots
+        self.days = days
+        # Empty until the first message is recorded; see _allocate.
+        self._masks = array(self._TYPECODE)
+        # learner tag << 16 | day ordinal & 0xFFFF per entry; unused entries are 0 with an empty mask.
+        self._stamps = array("I")
+
+    def _allocate(self) -> None:
+        entries = self.slots * self.days
+        self._masks = array(self._TYPECODE, bytes(self._masks.itemsize * entries))
+        self._stamps = array("I", bytes(4 * entries))
+
+    def _locate(self, key: str) -> Tuple[int, int]:
+        data = key.encode("utf-8")
+        checksum = zlib.adler32(data)
+        return zlib.crc32(data) % self.slots * self.days, (checksum ^ checksum >> 16) & 0xFFFF
+
+    def _recent(self, row: int, tag: int, ordinal: int) -> int:
+        masks = self._masks
+        stamps = self._stamps
+        if not stamps:
+            return 0
+        recent = 0
+        for back in range(1, self.days):
+            past = ordinal - back
+            i = row + past % self.days
+            if stamps[i] == tag << 16 | past & 0xFFFF:
+                recent |= masks[i]
+        return recent
+
+    def recent(self, key: str, day: date) -> List[int]:
+        """Template IDs the learner's message on ``day`` will avoid."""
+
+        row, tag = self._locate(key)
+        recent = self._recent(row, tag, day.toordinal())
+        return [i for i in range(len(TEMPLATES)) if recent >> i & 1]
+
+    def _choose(self, key: str, day: date, flags: Tuple[bool, bool], seed: int) -> _Template:
+        row, tag = self._locate(key)
+        ordinal = day.toordinal()
+        pairs, ids = _allowed_pairs(flags, self._recent(row, tag, ordinal))
+        index = seed % len(pairs)
+        opener, encouragement = ids[index]
+        if not self._stamps:
+            self._allocate()
+        i = row + ordinal % self.days
+        self._masks[i] = 1 << opener | 1 << encouragement
+        self._stamps[i] = tag << 16 | ordinal & 0xFFFF
+        return pairs[index]
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        if not self._stamps:
+            self._allocate()
+        masks, stamps = self._masks, self._stamps
+        if sys.byteorder == "big":
+            masks, stamps = array(masks.typecode, masks), array(stamps.typecode, stamps)
+            masks.byteswap()
+            stamps.byteswap()
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as out:
+            out.write(self._HEADER.pack(self._MAGIC, self.days, masks.itemsize, self.slots))
+            masks.tofile(out)
+            stamps.tofile(out)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TemplateHistory":
+        with Path(path).open("rb") as src:
+            magic, days, itemsize, slots = cls._HEADER.unpack(src.read(cls._HEADER.size))
+            if magic != cls._MAGIC:
+                raise ValueError(f"{path} is not a template history file")
+            history = cls(slots, days=days)
+            if history._masks.itemsize != itemsize:
+                raise ValueError(f"{path} was written for a different number of templates")
+            history._masks.fromfile(src, slots * days)
+            history._stamps.fromfile(src, slots * days)
+        if sys.byteorder == "big":
+            history._masks.byteswap()
+            history._stamps.byteswap()
+        return history
+
+
+def _day_hasher(day: date) -> Any:
+    return hashlib.blake2b(day.isoformat().encode("ascii"), digest_size=8, person=b"motivation")
+
+
+def learner_key(profile: UserProfile) -> str:
+    """Stable identity used to seed a learner's daily message (learner_id, else name)."""
+
+    return profile.learner_id if profile.learner_id is not None else profile.name
+
+
+def message_seed(key: str, day: date) -> int:
+    """Deterministic 64-bit seed for one learner on one day."""
+
+    hasher = _day_hasher(day)
+    hasher.update(key.encode("utf-8"))
+    return int.from_bytes(hasher.digest(), "little")
+
+
+def choose_templates(seed: int, has_progress: bool, has_last_action: bool, recent: int = 0) -> Tuple[int, int]:
+    """Return the (opener, encouragement) template IDs picked by a seed.
+
+    ``recent`` is a bitmask of template IDs to avoid (bit i set excludes ``TEMPLATES[i]``).
+    """
+
+    _, ids = _allowed_pairs((has_progress, has_last_action), recent)
+    return ids[seed % len(ids)]
+
+
+def _compose(seed: int, name: str, progress_percent: Optional[int], last_action: Optional[str]) -> str:
+    pairs = _PAIRS[progress_percent is not None, bool(last_action)]
+    return pairs[seed % len(pairs)].render((name, str(progress_percent), last_action or ""))
+
+
+def _compose_avoiding(
+    history: TemplateHistory,
+    key: str,
+    day: date,
+    seed: int,
+    name: str,
+    progress_percent: Optional[int],
+    last_action: Optional[str],
+) -> str:
+    pair = history._choose(key, day, (progress_percent is not None, bool(last_action)), seed)
+    return pair.render((name, str(progress_percent), last_action or ""))
+
 
 def build_motivation_message(
-    profile: UserProfile, progress_percent: Optional[int] = None, last_action: str | None = None
+    profile: UserProfile,
+    progress_percent: Optional[int] = None,
+    last_action: str | None = None,
+    *,
+    on_date: Optional[date] = None,
+    history: Optional[TemplateHistory] = None,
 ) -> str:
-    """Return a supportive, personalized message."""
+    """Return a supportive, personalized message.
 
-    openers = [
-        f"Hey {profile.name}, you’ve got this!",
-        f"Keep it up, {profile.name}!",
-        f"Great work staying committed, {profile.name}!",
-    ]
+    The choice of sentences is derived from the learner and the day (``on_date``, default
+    today), so reruns on the same day give the same message and no global RNG is involved.
+    With a ``history``, sentences used in the learner's previous few messages are skipped and
+    today's pick is recorded.
+    """
 
-    encouragements = [
-        "Every small session compounds into big gains.",
-        "Momentum beats perfection—show up for today’s session.",
-        "Remember why you started and celebrate each checkpoint.",
-    ]
+    key = learner_key(profile)
+    day = on_date or date.today()
+    seed = message_seed(key, day)
+    if history is not None:
+        return _compose_avoiding(history, key, day, seed, profile.name, progress_percent, last_action)
+    return _compose(seed, profile.name, progress_percent, last_action)
 
-    if progress_percent is not None:
-        encouragements.append(f"Nice! You’re {progress_percent}% into your plan already.")
 
-    if last_action:
-        encouragements.append(f"Your last win: {last_action}. Let’s build on it.")
+def build_motivation_messages_batch(
+    profiles: Iterable[UserProfile],
+    *,
+    on_date: Optional[date] = None,
+    progress: Optional[Sequence[Optional[int]]] = None,
+    last_actions: Optional[Sequence[Optional[str]]] = None,
+    history: Optional[TemplateHistory] = None,
+) -> List[str]:
+    """Build one day's message for each profile, identical to calling build_motivation_message per profile.
 
-    return " ".join([random.choice(openers), random.choice(encouragements)])
+    ``progress`` and ``last_actions``, when given, are aligned with ``profiles``.
+    """
 
+    day = on_date or date.today()
+    day_hasher = _day_hasher(day)
+    from_bytes = int.from_bytes
+    messages: List[str] = []
+    append = messages.append
+    if history is not None:
+        for i, profile in enumerate(profiles):
+            key = learner_key(profile)
+            hasher = day_hasher.copy()
+            hasher.update(key.encode("utf-8"))
+            append(
+                _compose_avoiding(
+                    history,
+                    key,
+                    day,
+                    from_bytes(hasher.digest(), "little"),
+                    profile.name,
+                    progress[i] if progress is not None else None,
+                    last_actions[i] if last_actions is not None else None,
+                )
+            )
+        return messages
+    if progress is None and last_actions is None:
+        # Common case: only the name varies, so each pair is a single "%s" substitution.
+        pairs = [pair._fmt for pair in _PAIRS[False, False]]
+        count = len(pairs)
+        for profile in profiles:
+            hasher = day_hasher.copy()
+            hasher.update(learner_key(profile).encode("utf-8"))
+            append(pairs[from_bytes(hasher.digest(), "little") % count] % profile.name)
+        return messages
+    for i, profile in enumerate(profiles):
+        hasher = day_hasher.copy()
+        hasher.update(learner_key(profile).encode("utf-8"))
+        append(
+            _compose(
+                from_bytes(hasher.digest(), "little"),
+                profile.name,
+                progress[i] if progress is not None else None,
+                last_actions[i] if last_actions is not None else None,
+            )
+        )
+    return messages
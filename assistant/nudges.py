@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .batch import Checkpoint, chunked, iter_records, ordered_map, read_records
+from .logger import _write_all
+from .models import UserProfile
+from .motivation import build_motivation_messages_batch
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+DEFAULT_SOURCE_QUERY = "SELECT learner_id, name, progress_percent, last_action FROM learners ORDER BY rowid"
+
+_OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    learner_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    sent_at TEXT,
+    PRIMARY KEY (learner_id, day)
+);
+"""
+
+# Upsert keeps a resumed run idempotent: a chunk replayed after a crash overwrites its own rows.
+_OUTBOX_INSERT = (
+    "INSERT INTO outbox (learner_id, day, message, created_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (learner_id, day) DO UPDATE SET message = excluded.message"
+)
+
+
+@dataclass
+class NudgeReport:
+    """Counts from one nudge run (records skipped on resume are not included)."""
+
+    day: str
+    records: int = 0
+    written: int = 0
+    skipped: int = 0
+
+
+def _is_sqlite(path: Path) -> bool:
+    return path.suffix.lower() in SQLITE_SUFFIXES
+
+
+def iter_learners(
+    source: str | Path, *, query: str = DEFAULT_SOURCE_QUERY, fetch_size: int = 10_000
+) -> Iterator[Dict[str, Any]]:
+    """Stream learner rows (learner_id, name, progress_percent, last_action) from a file or SQLite.
+
+    Files are CSV or JSON Lines, read with ``batch.read_records``. For SQLite sources ``query``
+    must return those columns in a stable order, since resuming skips already processed rows.
+    """
+
+    source = Path(source)
+    if not _is_sqlite(source):
+        yield from read_records(source)
+        return
+    conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    try:
+        cursor = conn.execute(query)
+        columns = [c[0] for c in cursor.description]
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(columns, row))
+    finally:
+        conn.close()
+
+
+def _progress(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(float(value))
+
+
+def _nudge_chunk(task: Tuple[str, bool, List[Union[Dict[str, Any], ValueError]]]) -> Tuple[int, List[Any]]:
+    """Build messages for one chunk; returns (skipped, JSONL lines or outbox rows)."""
+
+    day_iso, as_jsonl, records = task
+    profiles: List[UserProfile] = []
+    progress: List[Optional[int]] = []
+    last_actions: List[Optional[str]] = []
+    skipped = 0
+    for record in records:
+        if isinstance(record, ValueError):
+            skipped += 1  # a row iter_records could not parse
+            continue
+        name = record.get("name")
+        learner_id = record.get("learner_id")
+        if not name or not learner_id:
+            skipped += 1
+            continue
+        try:
+            progress.append(_progress(record.get("progress_percent")))
+        except (TypeError, ValueError):
+            progress.append(None)
+        profiles.append(
+            UserProfile(
+                name=str(name), learning_goal="", interested_topics=[], current_level="", learner_id=str(learner_id)
+            )
+        )
+        last_actions.append(record.get("last_action") or None)
+
+    messages = build_motivation_messages_batch(
+        profiles, on_date=date.fromisoformat(day_iso), progress=progress, last_actions=last_actions
+    )
+    if as_jsonl:
+        return skipped, [_outbox_line(p.learner_id, day_iso, m) for p, m in zip(profiles, messages)]
+    return skipped, [(p.learner_id, day_iso, m) for p, m in zip(profiles, messages)]
+
+
+def _outbox_line(learner_id: Optional[str], day: str, message: str) -> str:
+    return json.dumps({"learner_id": learner_id, "day": day, "message": message}, ensure_ascii=False) + "\n"
+
+
+def _iter_source(
+    source: Path, query: str, checkpoint: Checkpoint
+) -> Iterator[Tuple[Optional[int], Union[Dict[str, Any], ValueError]]]:
+    """Yield (end offset, record) pairs after the checkpoint; SQLite rows have no offset."""
+
+    if not _is_sqlite(source):
+        yield from iter_records(source, checkpoint.input_offset)
+        return
+    for row in islice(iter_learners(source, query=query), checkpoint.records, None):
+        yield None, row
+
+
+def run_nudges(
+    source: str | Path,
+    outbox: str | Path,
+    *,
+    day: Optional[date] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 5_000,
+    checkpoint_path: str | Path | None = None,
+    query: str = DEFAULT_SOURCE_QUERY,
+) -> NudgeReport:
+    """Generate one day's motivation message for every learner in source and write them to outbox.
+
+    The outbox is a JSON Lines file, or an ``outbox`` table when its path ends in .db/.sqlite.
+    Chunks are generated across a process pool and written in input order, one write (or one
+    transaction) per chunk. The checkpoint (default ``<outbox>.<day>.ckpt``) is saved after
+    each chunk, so rerunning after a crash continues from the last committed chunk; file sources
+    resume at the checkpoint's byte offset, SQLite sources by skipping that many rows.
+
+    A JSONL outbox is shared across days and with ``append_outbox``, so it is only ever appended
+    to, each chunk in one ``O_APPEND`` write. Before writing, the checkpoint records the outbox
+    size; a resumed run looks for the uncommitted chunk's exact bytes past that point and only
+    writes it if they are not there.
+    """
+
+    day = day or date.today()
+    outbox = Path(outbox)
+    outbox.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = Path(checkpoint_path or outbox.with_name(f"{outbox.name}.{day.isoformat()}.ckpt"))
+    resuming = checkpoint_path.exists()
+    checkpoint = Checkpoint.load(checkpoint_path)
+    report = NudgeReport(day=day.isoformat())
+    as_jsonl = not _is_sqlite(outbox)
+
+    source_records = _iter_source(Path(source), query, checkpoint)
+    # Chunk end offsets stay in this process; ordered_map returns results in the same order.
+    chunk_ends: Deque[Optional[int]] = deque()
+
+    def tasks() -> Iterator[Tuple[str, bool, List[Union[Dict[str, Any], ValueError]]]]:
+        for chunk in chunked(source_records, chunk_size):
+            chunk_ends.append(chunk[-1][0])
+            yield report.day, as_jsonl, [record for _, record in chunk]
+
+    def commit(skipped: int, written: int) -> None:
+        _advance(report, checkpoint, skipped, written)
+        end = chunk_ends.popleft()
+        if end is not None:
+            checkpoint.input_offset = end
+        checkpoint.save()
+
+    results = ordered_map(_nudge_chunk, tasks(), workers=workers)
+
+    if as_jsonl:
+        fd = os.open(outbox, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            for skipped, lines in results:
+                data = "".join(lines).encode("utf-8")
+                if data and not (resuming and _written_since(outbox, checkpoint.output_bytes, data)):
+                    _end_torn_line(fd)
+                    checkpoint.output_bytes = os.fstat(fd).st_size
+                    checkpoint.save()
+                    _write_all(fd, data)
+                resuming = False
+                commit(skipped, len(lines))
+        finally:
+            os.close(fd)
+        return report
+
+    conn = sqlite3.connect(str(outbox), isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_OUTBOX_SCHEMA)
+        created_at = datetime.utcnow().isoformat()
+        for skipped, rows in results:
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(_OUTBOX_INSERT, [(*row, created_at) for row in rows])
+            commit(skipped, len(rows))
+    finally:
+        conn.close()
+    return report
+
+
+def _written_since(outbox: Path, offset: int, data: bytes) -> bool:
+    """Whether a chunk interrupted before its checkpoint already landed at or after offset."""
+
+    with outbox.open("rb") as fh:
+        fh.seek(offset)
+        return data in fh.read()
+
+
+def _end_torn_line(fd: int) -> None:
+    """Terminate a line torn by a crashed writer, so the next row does not run into it."""
+
+    size = os.fstat(fd).st_size
+    if size:
+        os.lseek(fd, size - 1, os.SEEK_SET)
+        if os.read(fd, 1) != b"\n":
+            _write_all(fd, b"\n")  # O_APPEND: still lands at the end
+
+
+def append_outbox(outbox: str | Path, rows: Sequence[Tuple[str, str, str]]) -> None:
+    """Append (learner_id, day, message) rows to a JSONL outbox or upsert them into an outbox table."""
+
+    outbox = Path(outbox)
+    if not rows:
+        return
+    outbox.parent.mkdir(parents=True, exist_ok=True)
+    if not _is_sqlite(outbox):
+        data = "".join(_outbox_line(learner_id, day, message) for learner_id, day, message in rows)
+        fd = os.open(outbox, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            _write_all(fd, data.encode("utf-8"))
+        finally:
+            os.close(fd)
+        return
+    conn = sqlite3.connect(str(outbox), isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_OUTBOX_SCHEMA)
+        created_at = datetime.utcnow().isoformat()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(_OUTBOX_INSERT, [(*row, created_at) for row in rows])
+    finally:
+        conn.close()
+
+
+def _advance(report: NudgeReport, checkpoint: Checkpoint, skipped: int, written: int) -> None:
+    report.records += skipped + written
+    report.skipped += skipped
+    report.written += written
+    checkpoint.records += skipped + written
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m assistant.nudges", description="Generate daily nudges into an outbox.")
+    parser.add_argument("source", help="learners as CSV, JSONL or SQLite (.db/.sqlite)")
+    parser.add_argument("outbox", help="outbox JSONL file or SQLite database")
+    parser.add_argument("--date", type=date.fromisoformat, help="day to generate for (default: today)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <outbox>.<day>.ckpt)")
+    parser.add_argument("--query", default=DEFAULT_SOURCE_QUERY, help="SQL for SQLite sources")
+    args = parser.parse_args(argv)
+
+    report = run_nudges(
+        args.source,
+        args.outbox,
+        day=args.date,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint,
+        query=args.query,
+    )
+    print(json.dumps(asdict(report)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
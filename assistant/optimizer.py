@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import heapq
+import re
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from .models import Course, UserProfile
+
+# Courses without an hour estimate still consume budget; assume a typical short course.
+DEFAULT_COURSE_HOURS = 10
+
+_TOPIC_WEIGHT = 1.0
+_GOAL_WEIGHT = 0.5
+_LEVEL_ORDER = {"beginner": 1, "intermediate": 2, "advanced": 3}
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = frozenset({"and", "the", "for", "with", "into", "land", "role", "build", "grow", "skills", "learn"})
+
+
+def hour_budget(profile: UserProfile) -> Optional[int]:
+    """Return the total study hours available, or None when the learner gave no limit."""
+
+    if not profile.weekly_time_hours or not profile.timeframe_weeks:
+        return None
+    return profile.weekly_time_hours * profile.timeframe_weeks
+
+
+def _goal_terms(goal: str) -> FrozenSet[str]:
+    return frozenset(w for w in _WORD_RE.findall(goal.lower()) if len(w) > 2 and w not in _STOPWORDS)
+
+
+def selection_inputs(profile: UserProfile) -> Optional[Tuple[int, List[str], List[str]]]:
+    """Return the budget, topics and goal terms that select_courses_within_budget reads, or None."""
+
+    budget = hour_budget(profile)
+    if budget is None:
+        return None
+    topics = sorted({t.lower() for t in profile.interested_topics})
+    return budget, topics, sorted(_goal_terms(profile.learning_goal))
+
+
+def select_courses_within_budget(
+    profile: UserProfile,
+    candidates: Sequence[Course],
+    *,
+    budget_hours: Optional[int] = None,
+) -> List[Course]:
+    """Pick and order the courses that best cover the learner's topics and goal within the hour budget.
+
+    Uses lazy greedy weighted set cover: each round takes the course with the best newly covered
+    weight per hour that still fits. Courses that add no coverage are never selected. Selected
+    courses are ordered by level (beginner first), then by pick order. A learner with no topics
+    and no usable goal words gets the candidates in their given order, as many as fit.
+    """
+
+    if budget_hours is None:
+        budget_hours = hour_budget(profile)
+    if budget_hours is None:
+        return list(candidates)
+
+    weights: Dict[str, float] = {t.lower(): _TOPIC_WEIGHT for t in profile.interested_topics}
+    goal_terms = [t for t in _goal_terms(profile.learning_goal) if t not in weights]
+    weights.update((t, _GOAL_WEIGHT) for t in goal_terms)
+    if not weights:
+        fitted: List[Course] = []
+        for course in candidates:
+            cost = course.est_hours if course.est_hours is not None else DEFAULT_COURSE_HOURS
+            if cost <= budget_hours:
+                fitted.append(course)
+                budget_hours -= cost
+        return fitted
+
+    coverage: List[Set[str]] = []
+    heap: List[Tuple[float, int, int]] = []
+    for idx, course in enumerate(candidates):
+        topics = {t.lower() for t in course.topics}
+        covered = topics.intersection(weights)
+        if goal_terms:
+            text = (course.title + " " + course.summary).lower()
+            for term in goal_terms:
+                if term in text:
+                    covered.add(term)
+        cost = course.est_hours if course.est_hours is not None else DEFAULT_COURSE_HOURS
+        coverage.append(covered)
+        if covered and cost <= budget_hours:
+            gain = sum(weights[t] for t in covered)
+            heap.append((-gain / max(cost, 1), cost, idx))
+    heapq.heapify(heap)
+
+    remaining = budget_hours
+    # Terms no candidate can cover would otherwise keep the loop draining the whole heap.
+    uncovered: Set[str] = set().union(*coverage) if coverage else set()
+    picked: List[int] = []
+    while heap and uncovered:
+        neg_ratio, cost, idx = heapq.heappop(heap)
+        if cost > remaining:
+            continue
+        gain = sum(weights[t] for t in coverage[idx].intersection(uncovered))
+        if not gain:
+            continue
+        ratio = gain / max(cost, 1)
+        # Gains only shrink as coverage grows, so a stale entry is re-queued with its fresh score.
+        if heap and -ratio > heap[0][0]:
+            heapq.heappush(heap, (-ratio, cost, idx))
+            continue
+        picked.append(idx)
+        remaining -= cost
+        uncovered.difference_update(coverage[idx])
+
+    rank = {idx: pos for pos, idx in enumerate(picked)}
+    picked.sort(key=lambda i: (_LEVEL_ORDER.get(candidates[i].level.lower(), 1), rank[i]))
+    return [candidates[i] for i in picked]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import Course, FrozenPlanStep, LearningPlan, UserProfile, WeeklyPlan
+from .optimizer import selection_inputs
+from .planner import _clarify_step, build_learning_plan, build_weekly_plan
+
+
+def plan_cache_key(
+    courses: Sequence[Course],
+    *,
+    phased_focus: Sequence[str] = (),
+    selection: Optional[Tuple[int, List[str], List[str]]] = None,
+) -> str:
+    """Return a stable content hash of everything that shapes a plan apart from the warm-up text.
+
+    Without fit_to_budget build_learning_plan reads only the courses and the phased focus. With
+    it, pass optimizer.selection_inputs(profile) as selection so the budget, topics and goal
+    terms that pick the courses are part of the key too.
+    """
+
+    payload = {
+        "courses": [[c.title, c.provider, c.url, c.est_hours] for c in courses],
+        "phased_focus": list(phased_focus),
+        "selection": list(selection) if selection is not None else None,
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass(frozen=True)
+class _PlanTemplate:
+    """Goal-independent part of a plan: every step after the warm-up plus the notes."""
+
+    steps: Tuple[FrozenPlanStep, ...]
+    notes: Tuple[str, ...]
+
+
+class PlanCache:
+    """Content-addressed cache of generated plans shared across learners.
+
+    Learners whose courses and phases match share one stored template of frozen steps.
+    shared_plan and weekly_plan hand out those same immutable steps, adding only the warm-up
+    step that quotes the learning goal; learning_plan returns editable LearningPlanStep copies
+    for callers that need to change the plan.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10_000) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._templates: "OrderedDict[str, _PlanTemplate]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def clear(self) -> None:
+        self._templates.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+    def _template(
+        self, profile: UserProfile, courses: Sequence[Course], fit_to_budget: bool
+    ) -> _PlanTemplate:
+        selection = selection_inputs(profile) if fit_to_budget else None
+        key = plan_cache_key(courses, phased_focus=profile.phased_focus, selection=selection)
+        template = self._templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self._templates.move_to_end(key)
+            return template
+
+        self.misses += 1
+        plan = build_learning_plan(profile, courses, fit_to_budget=fit_to_budget)
+        steps = tuple(FrozenPlanStep.freeze(step) for step in plan.steps[1:])
+        template = _PlanTemplate(steps=steps, notes=tuple(plan.notes))
+        self._templates[key] = template
+        if self.max_entries is not None and len(self._templates) > self.max_entries:
+            self._templates.popitem(last=False)
+        return template
+
+    def shared_plan(
+        self, profile: UserProfile, courses: Sequence[Course], *, fit_to_budget: bool = False
+    ) -> Tuple[Tuple[FrozenPlanStep, ...], Tuple[str, ...]]:
+        """Return the plan's steps and notes, sharing the cached frozen steps rather than copies."""
+
+        template = self._template(profile, courses, fit_to_budget)
+        warm_up = FrozenPlanStep.freeze(_clarify_step(profile.learning_goal))
+        return (warm_up, *template.steps), template.notes
+
+    def learning_plan(
+        self, profile: UserProfile, courses: Sequence[Course], *, fit_to_budget: bool = False
+    ) -> LearningPlan:
+        """Return the same plan as build_learning_plan(profile, courses), as editable copies."""
+
+        steps, notes = self.shared_plan(profile, courses, fit_to_budget=fit_to_budget)
+        thawed = [step.thaw() for step in steps]
+        return LearningPlan(goal=profile.learning_goal, steps=thawed, notes=list(notes))
+
+    def weekly_plan(
+        self, profile: UserProfile, courses: Sequence[Course], *, fit_to_budget: bool = False
+    ) -> WeeklyPlan:
+        """Return the weekly plan for the learner's cached plan and budget, sharing its steps."""
+
+        steps, _ = self.shared_plan(profile, courses, fit_to_budget=fit_to_budget)
+        return build_weekly_plan(
+            steps,
+            weekly_time_hours=profile.weekly_time_hours,
+            timeframe_weeks=profile.timeframe_weeks,
+        )
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from typing import List, Sequence
+from typing import List, Sequence, Union
 
-from .models import Course, LearningPlan, LearningPlanStep, UserProfile
+from .models import Course, FrozenPlanStep, LearningPlan, LearningPlanStep, UserProfile, WeeklyPlan
+from .optimizer import hour_budget, select_courses_within_budget
+
+_WARMUP_HOURS = 1
+_PROJECT_HOURS = 8
 
 
 def _step_from_course(course: Course, index: int) -> LearningPlanStep:
@@ -17,23 +21,52 @@ def _step_from_course(course: Course, index: int) -> LearningPlanStep:
     )
 
 
-def build_learning_plan(profile: UserProfile, courses: Sequence[Course]) -> LearningPlan:
-    """Compose a simple, ordered learning plan from recommended courses."""
+def _clarify_step(learning_goal: str) -> LearningPlanStep:
+    return LearningPlanStep(
+        title="Step 0: Clarify success",
+        description=(
+            f"Write a 2–3 sentence description of what success looks like for "
+            f"{learning_goal}. Keep it visible during study sessions."
+        ),
+        resources=[],
+        est_time_hours=_WARMUP_HOURS,
+    )
+
+
+def build_learning_plan(
+    profile: UserProfile, courses: Sequence[Course], *, fit_to_budget: bool = False
+) -> LearningPlan:
+    """Compose a simple, ordered learning plan from recommended courses.
+
+    With fit_to_budget=True the courses are treated as candidates: the subset and order that best
+    covers the learner's topics and goal within weekly_time_hours × timeframe_weeks is planned,
+    after reserving hours for the warm-up and the final project. A note says when courses were
+    left out, or when the budget is too small to fit any course at all.
+    """
+
+    budget_notes: List[str] = []
+    budget = hour_budget(profile) if fit_to_budget else None
+    if budget is not None:
+        overhead = _WARMUP_HOURS + _PROJECT_HOURS
+        candidates = len(courses)
+        if budget <= overhead:
+            courses = []
+            budget_notes.append(
+                f"Your {budget}-hour budget only covers the warm-up and final project ({overhead} hours), "
+                "so no courses were planned. Add weekly hours or weeks to make room for courses."
+            )
+        else:
+            courses = select_courses_within_budget(profile, courses, budget_hours=budget - overhead)
+            if len(courses) < candidates:
+                budget_notes.append(
+                    f"{candidates - len(courses)} of {candidates} suggested courses were left out "
+                    f"to fit your {budget}-hour budget."
+                )
 
     steps: List[LearningPlanStep] = []
 
     # Warm-up step
-    steps.append(
-        LearningPlanStep(
-            title="Step 0: Clarify success",
-            description=(
-                f"Write a 2–3 sentence description of what success looks like for "
-                f"{profile.learning_goal}. Keep it visible during study sessions."
-            ),
-            resources=[],
-            est_time_hours=1,
-        )
-    )
+    steps.append(_clarify_step(profile.learning_goal))
 
     for idx, course in enumerate(courses):
         steps.append(_step_from_course(course, idx))
@@ -46,7 +79,7 @@ def build_learning_plan(profile: UserProfile, courses: Sequence[Course]) -> Lear
                 "Share it with a peer or mentor for feedback."
             ),
             resources=["https://www.kaggle.com/datasets", "https://github.com/trending/python?since=monthly"],
-            est_time_hours=8,
+            est_time_hours=_PROJECT_HOURS,
         )
     )
 
@@ -60,39 +93,26 @@ def build_learning_plan(profile: UserProfile, courses: Sequence[Course]) -> Lear
         notes.append(
             f"Phased focus provided: {', '.join(profile.phased_focus)}. Align steps with these phases."
         )
+    notes.extend(budget_notes)
 
     return LearningPlan(goal=profile.learning_goal, steps=steps, notes=notes)
 
 
 def build_weekly_plan(
-    learning_plan: LearningPlan,
+    learning_plan: Union[LearningPlan, Sequence[FrozenPlanStep]],
     *,
     weekly_time_hours: int | None = None,
     timeframe_weeks: int | None = None,
-) -> List[LearningPlanStep]:
+) -> WeeklyPlan:
     """Break the learning plan into a weekly sequence of steps.
 
-    This is intentionally lightweight: it slices the step list across the requested timeframe,
-    repeating steps if needed and trimming when time runs short.
+    This is intentionally lightweight: it maps each week onto the step list, cycling through the
+    steps when the timeframe is longer than the plan. Returns a read-only WeeklyPlan sequence
+    (it used to be a list) whose weeks share the plan's steps and expose resources as tuples;
+    call ``to_steps()`` for the old list of LearningPlanStep. Shared frozen steps (as returned
+    by PlanCache.shared_plan) may be passed instead of a LearningPlan.
     """
 
-    if not learning_plan.steps:
-        return []
-
-    total_steps = len(learning_plan.steps)
-    weeks = timeframe_weeks or max(total_steps, 4)
-    weekly_steps: List[LearningPlanStep] = []
-
-    # Simple distribution: map each week to a step, cycling if timeframe exceeds steps.
-    for week in range(weeks):
-        step = learning_plan.steps[week % total_steps]
-        weekly_steps.append(
-            LearningPlanStep(
-                title=f"Week {week + 1}: {step.title}",
-                description=step.description,
-                resources=step.resources,
-                est_time_hours=step.est_time_hours or weekly_time_hours,
-            )
-        )
-
-    return weekly_steps
+    steps = learning_plan.steps if isinstance(learning_plan, LearningPlan) else learning_plan
+    weeks = timeframe_weeks or max(len(steps), 4)
+    return WeeklyPlan(steps, weeks, weekly_time_hours)
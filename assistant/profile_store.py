@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from .codec import decode, encode, from_json_dict, to_json_dict
+from .models import UserProfile
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    learner_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    level TEXT,
+    data BLOB
+);
+CREATE TABLE IF NOT EXISTS profile_topics (
+    topic TEXT NOT NULL,
+    learner_id TEXT NOT NULL,
+    PRIMARY KEY (topic, learner_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS profile_providers (
+    provider TEXT NOT NULL,
+    learner_id TEXT NOT NULL,
+    PRIMARY KEY (provider, learner_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS profiles_seq ON profiles (seq);
+CREATE INDEX IF NOT EXISTS profiles_level ON profiles (level) WHERE data IS NOT NULL;
+"""
+
+_UPSERT = (
+    "INSERT INTO profiles (learner_id, seq, level, data) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (learner_id) DO UPDATE SET seq = excluded.seq, level = excluded.level, data = excluded.data"
+)
+
+# SQLite's default limit on bound parameters is 999 in older builds.
+_IN_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class ProfileChange:
+    """One entry of a store's change feed; ``profile`` is None for a deletion."""
+
+    seq: int
+    learner_id: str
+    profile: Optional[UserProfile]
+
+    @property
+    def deleted(self) -> bool:
+        return self.profile is None
+
+
+def _key(value: str) -> str:
+    return value.strip().lower()
+
+
+def _index_keys(profile: UserProfile) -> Tuple[str, Set[str], Set[str]]:
+    """Normalized (level, topics, providers) a profile is indexed under."""
+
+    return (
+        _key(profile.current_level),
+        {_key(t) for t in profile.interested_topics if t.strip()},
+        {_key(p) for p in profile.provider_requirements if p.strip()},
+    )
+
+
+def _learner_id(profile: UserProfile) -> str:
+    if not profile.learner_id:
+        raise ValueError(f"Profile {profile.name!r} has no learner_id")
+    return profile.learner_id
+
+
+class SQLiteProfileStore:
+    """Profiles keyed by learner_id in SQLite, with indexes on level, topic and provider.
+
+    Profiles are stored in the codec's binary form. Every put or delete takes the next sequence
+    number; deletes leave a tombstone row so the change feed (``changes``) can report them. The
+    feed is compacted: a learner changed several times since ``since`` appears once, at their
+    latest sequence number.
+
+    The connection is shared by every thread using the store, so reads take the same lock as
+    writes; otherwise a read could run inside another thread's open transaction.
+    """
+
+    def __init__(self, db_path: str | Path = "profiles.sqlite3") -> None:
+        self.path = Path(db_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()  # writes call the locked reads below
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SQLiteProfileStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM profiles WHERE data IS NOT NULL").fetchone()[0]
+
+    def __contains__(self, learner_id: object) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM profiles WHERE learner_id = ? AND data IS NOT NULL", (learner_id,)
+            ).fetchone()
+        return row is not None
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM profiles").fetchone()[0]
+
+    # ---------------- Writes ----------------
+
+    def put(self, profile: UserProfile) -> int:
+        return self.put_many([profile])
+
+    def put_many(self, profiles: Iterable[UserProfile]) -> int:
+        """Insert or replace profiles in one transaction; returns the last sequence number used."""
+
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            seq = self.last_seq
+            rows, topics, providers = [], [], []
+            latest = {_learner_id(p): p for p in profiles}  # a repeated learner_id keeps its last profile
+            for learner_id, profile in latest.items():
+                level, topic_keys, provider_keys = _index_keys(profile)
+                seq += 1
+                rows.append((learner_id, seq, level, encode(profile)))
+                topics.extend((t, learner_id) for t in topic_keys)
+                providers.extend((p, learner_id) for p in provider_keys)
+            ids = [(row[0],) for row in rows]
+            self._conn.executemany("DELETE FROM profile_topics WHERE learner_id = ?", ids)
+            self._conn.executemany("DELETE FROM profile_providers WHERE learner_id = ?", ids)
+            self._conn.executemany(_UPSERT, rows)
+            self._conn.executemany("INSERT OR IGNORE INTO profile_topics VALUES (?, ?)", topics)
+            self._conn.executemany("INSERT OR IGNORE INTO profile_providers VALUES (?, ?)", providers)
+        return seq
+
+    def delete(self, learner_id: str) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            if learner_id not in self:
+                return False
+            self._conn.execute(
+                "UPDATE profiles SET seq = ?, level = NULL, data = NULL WHERE learner_id = ?",
+                (self.last_seq + 1, learner_id),
+            )
+            self._conn.execute("DELETE FROM profile_topics WHERE learner_id = ?", (learner_id,))
+            self._conn.execute("DELETE FROM profile_providers WHERE learner_id = ?", (learner_id,))
+        return True
+
+    # ---------------- Reads ----------------
+
+    def get(self, learner_id: str) -> Optional[UserProfile]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM profiles WHERE learner_id = ? AND data IS NOT NULL", (learner_id,)
+            ).fetchone()
+        return decode(row[0]) if row else None
+
+    def get_many(self, learner_ids: Iterable[str]) -> Dict[str, UserProfile]:
+        """Profiles for the given IDs that exist, keyed by learner_id."""
+
+        found: Dict[str, UserProfile] = {}
+        ids = list(dict.fromkeys(learner_ids))
+        for start in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[start : start + _IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            query = f"SELECT learner_id, data FROM profiles WHERE data IS NOT NULL AND learner_id IN ({marks})"
+            with self._lock:
+                rows = self._conn.execute(query, chunk).fetchall()
+            for learner_id, data in rows:
+                found[learner_id] = decode(data)
+        return found
+
+    def find(
+        self,
+        *,
+        level: Optional[str] = None,
+        topic: Optional[str] = None,
+        provider: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[UserProfile]:
+        """Profiles matching every given filter (case-insensitive), ordered by learner_id."""
+
+        clauses = ["data IS NOT NULL"]
+        params: List[Any] = []
+        if level is not None:
+            clauses.append("level = ?")
+            params.append(_key(level))
+        if topic is not None:
+            clauses.append("learner_id IN (SELECT learner_id FROM profile_topics WHERE topic = ?)")
+            params.append(_key(topic))
+        if provider is not None:
+            clauses.append("learner_id IN (SELECT learner_id FROM profile_providers WHERE provider = ?)")
+            params.append(_key(provider))
+        sql = f"SELECT data FROM profiles WHERE {' AND '.join(clauses)} ORDER BY learner_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [decode(data) for (data,) in rows]
+
+    def changes(self, since: int = 0, *, limit: Optional[int] = None) -> List[ProfileChange]:
+        """Changes with a sequence number above ``since``, oldest first."""
+
+        sql = "SELECT seq, learner_id, data FROM profiles WHERE seq > ? ORDER BY seq"
+        params: List[Any] = [since]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            ProfileChange(seq, learner_id, decode(data) if data is not None else None)
+            for seq, learner_id, data in rows
+        ]
+
+
+class FileProfileStore:
+    """Profiles in an append-only JSON Lines file, indexed in memory by offset.
+
+    Each put or delete appends one ``{"seq", "id", "profile"}`` line (``profile`` is null for a
+    delete). Opening the store scans the file once to rebuild the indexes: learner_id to the
+    offset of their latest line, plus level, topic and provider sets of learner IDs. Profiles
+    themselves stay on disk and are read back by offset, so memory holds only the indexes.
+    An unterminated last line (from a crash mid-write) is truncated on open. ``compact()``
+    rewrites the file without superseded lines.
+    """
+
+    # One line offset is remembered per this many sequence numbers to seek into the change feed.
+    _FEED_STRIDE = 1024
+
+    def __init__(self, path: str | Path = "profiles.jsonl", *, fsync: bool = False) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._fh = open(self.path, "a+b")
+        self._load()
+
+    def _reset(self) -> None:
+        self._offsets: Dict[str, Tuple[int, int]] = {}  # learner_id -> (offset, seq) of latest line
+        self._deleted: Set[str] = set()
+        self._levels: Dict[str, Set[str]] = defaultdict(set)
+        self._topics: Dict[str, Set[str]] = defaultdict(set)
+        self._providers: Dict[str, Set[str]] = defaultdict(set)
+        self._keys: Dict[str, Tuple[str, Set[str], Set[str]]] = {}
+        self._feed = array("Q")  # offsets of the first line with seq > i * _FEED_STRIDE
+        self._seq = 0
+
+    def _load(self) -> None:
+        self._reset()
+        self._fh.seek(0)
+        offset = 0
+        for line in self._fh:
+            if not line.endswith(b"\n"):
+                self._fh.truncate(offset)
+                break
+            entry = json.loads(line)
+            data = entry["profile"]
+            self._index(entry["seq"], entry["id"], offset, from_json_dict(data) if data is not None else None)
+            offset += len(line)
+        self._fh.seek(0, os.SEEK_END)
+
+    def _index(self, seq: int, learner_id: str, offset: int, profile: Optional[UserProfile]) -> None:
+        while len(self._feed) * self._FEED_STRIDE < seq:
+            self._feed.append(offset)
+        self._seq = seq
+        self._offsets[learner_id] = (offset, seq)
+        old = self._keys.pop(learner_id, None)
+        if old is not None:
+            level, topics, providers = old
+            self._levels[level].discard(learner_id)
+            for topic in topics:
+                self._topics[topic].discard(learner_id)
+            for provider in providers:
+                self._providers[provider].discard(learner_id)
+        if profile is None:
+            self._deleted.add(learner_id)
+            return
+        self._deleted.discard(learner_id)
+        keys = self._keys[learner_id] = _index_keys(profile)
+        level, topics, providers = keys
+        self._levels[level].add(learner_id)
+        for topic in topics:
+            self._topics[topic].add(learner_id)
+        for provider in providers:
+            self._providers[provider].add(learner_id)
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "FileProfileStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._offsets) - len(self._deleted)
+
+    def __contains__(self, learner_id: object) -> bool:
+        with self._lock:
+            return learner_id in self._offsets and learner_id not in self._deleted
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    # ---------------- Writes ----------------
+
+    def put(self, profile: UserProfile) -> int:
+        return self.put_many([profile])
+
+    def put_many(self, profiles: Iterable[UserProfile]) -> int:
+        """Append profiles with one write; returns the last sequence number used."""
+
+        with self._lock:
+            entries = [(_learner_id(p), p) for p in profiles]
+            self._append(entries)
+            return self._seq
+
+    def delete(self, learner_id: str) -> bool:
+        with self._lock:
+            if learner_id not in self:
+                return False
+            self._append([(learner_id, None)])
+            return True
+
+    def _append(self, entries: Sequence[Tuple[str, Optional[UserProfile]]]) -> None:
+        offset = self._fh.seek(0, os.SEEK_END)
+        lines: List[bytes] = []
+        seq = self._seq
+        for learner_id, profile in entries:
+            seq += 1
+            data = to_json_dict(profile) if profile is not None else None
+            entry = {"seq": seq, "id": learner_id, "profile": data}
+            lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+        self._fh.write(b"".join(lines))
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        seq = self._seq
+        for (learner_id, profile), line in zip(entries, lines):
+            seq += 1
+            self._index(seq, learner_id, offset, profile)
+            offset += len(line)
+
+    def compact(self) -> None:
+        """Rewrite the file keeping only each learner's latest line (tombstones included)."""
+
+        with self._lock:
+            latest = sorted((seq, offset) for offset, seq in self._offsets.values())
+            tmp = self.path.with_name(self.path.name + ".compact.tmp")
+            with open(tmp, "wb") as out:
+                for _, offset in latest:
+                    out.write(self._read_line(offset))
+                out.flush()
+                os.fsync(out.fileno())
+            self._fh.close()
+            os.replace(tmp, self.path)
+            self._fh = open(self.path, "a+b")
+            self._load()
+
+    # ---------------- Reads ----------------
+
+    def _read_line(self, offset: int) -> bytes:
+        # Called with self._lock held. Seeking the shared handle is safe: in append mode writes
+        # always go to the end, and _append seeks there first anyway. (os.pread is POSIX-only.)
+        self._fh.seek(offset)
+        return self._fh.readline()
+
+    def _read(self, learner_id: str) -> Optional[UserProfile]:
+        position = self._offsets.get(learner_id)
+        if position is None or learner_id in self._deleted:
+            return None
+        data = json.loads(self._read_line(position[0]))["profile"]
+        return from_json_dict(data)
+
+    def get(self, learner_id: str) -> Optional[UserProfile]:
+        with self._lock:
+            return self._read(learner_id)
+
+    def get_many(self, learner_ids: Iterable[str]) -> Dict[str, UserProfile]:
+        """Profiles for the given IDs that exist, keyed by learner_id (read in file order)."""
+
+        with self._lock:
+            wanted = [(self._offsets[i][0], i) for i in dict.fromkeys(learner_ids) if i in self]
+            return {learner_id: self._read(learner_id) for _, learner_id in sorted(wanted)}
+
+    def find(
+        self,
+        *,
+        level: Optional[str] = None,
+        topic: Optional[str] = None,
+        provider: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[UserProfile]:
+        """Profiles matching every given filter (case-insensitive), ordered by learner_id."""
+
+        with self._lock:
+            sets = []
+            if level is not None:
+                sets.append(self._levels.get(_key(level), set()))
+            if topic is not None:
+                sets.append(self._topics.get(_key(topic), set()))
+            if provider is not None:
+                sets.append(self._providers.get(_key(provider), set()))
+            if sets:
+                sets.sort(key=len)
+                ids = sets[0].intersection(*sets[1:])
+            else:
+                ids = set(self._offsets) - self._deleted
+            selected = sorted(ids)[:limit] if limit is not None else sorted(ids)
+            return [self._read(learner_id) for learner_id in selected]
+
+    def changes(self, since: int = 0, *, limit: Optional[int] = None) -> List[ProfileChange]:
+        """Changes with a sequence number above ``since``, oldest first, one per learner (their latest)."""
+
+        with self._lock:
+            stride = since // self._FEED_STRIDE
+            if stride >= len(self._feed):
+                return []
+            result: List[ProfileChange] = []
+            # Read through our own handle, not the path: after a compaction elsewhere the path
+            # names a different file, and the offsets in the index describe this one.
+            offsets = self._offsets
+            offset = self._fh.seek(self._feed[stride])
+            for line in self._fh:
+                position, offset = offset, offset + len(line)
+                if not line.endswith(b"\n"):
+                    break
+                entry = json.loads(line)
+                latest = offsets.get(entry["id"])
+                if entry["seq"] <= since or latest is None or latest[0] != position:
+                    continue  # before the window, superseded by a later line, or not indexed yet
+                data = entry["profile"]
+                result.append(
+                    ProfileChange(entry["seq"], entry["id"], from_json_dict(data) if data is not None else None)
+                )
+                if limit is not None and len(result) >= limit:
+                    break
+            self._fh.seek(0, os.SEEK_END)
+            return result
+
+
+ProfileStore = Union[SQLiteProfileStore, FileProfileStore]
+
+
+def open_profile_store(path: str | Path) -> ProfileStore:
+    """SQLiteProfileStore for .db/.sqlite/.sqlite3 paths, else an append-only FileProfileStore."""
+
+    path = Path(path)
+    if path.suffix.lower() in SQLITE_SUFFIXES:
+        return SQLiteProfileStore(path)
+    return FileProfileStore(path)
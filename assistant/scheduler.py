@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time as clock_time, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .batch import chunked, read_records
+from .models import UserProfile
+from .motivation import TemplateHistory, build_motivation_messages_batch
+from .nudges import append_outbox
+
+DEFAULT_NUDGE_HOUR = 8
+
+
+@dataclass(frozen=True)
+class DueNudge:
+    """A nudge whose deadline has passed, with the learner's local date at that deadline."""
+
+    learner_id: str
+    name: str
+    local_date: date
+    due: int
+
+
+class _Entry:
+    __slots__ = ("name", "tz", "hour", "minute", "due", "day")
+
+    def __init__(self, name: str, tz: str, hour: int, minute: int, due: int, day: date) -> None:
+        self.name = name
+        self.tz = tz
+        self.hour = hour
+        self.minute = minute
+        self.due = due
+        self.day = day  # local date of the deadline
+
+
+@lru_cache(maxsize=1024)
+def _zone(tz: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(
+            f"Unknown timezone {tz!r}: use an IANA name such as 'Europe/Berlin' "
+            "(on Windows, install the tzdata package: pip install tzdata)"
+        ) from exc
+
+
+@lru_cache(maxsize=65536)
+def _local_deadline(tz: str, day: date, hour: int, minute: int) -> int:
+    return int(datetime.combine(day, clock_time(hour, minute), tzinfo=_zone(tz)).timestamp())
+
+
+def _next_deadline(tz: str, hour: int, minute: int, after: float, today: date) -> Tuple[int, date]:
+    day = today
+    while True:
+        candidate = _local_deadline(tz, day, hour, minute)
+        if candidate > after:
+            return candidate, day
+        day += timedelta(days=1)
+
+
+def _local_date(tz: str, ts: float) -> date:
+    return datetime.fromtimestamp(ts, _zone(tz)).date()
+
+
+def next_deadline(tz: str, hour: int, minute: int, after: float) -> int:
+    """Return the first epoch second after ``after`` that is hour:minute local time in tz."""
+
+    return _next_deadline(tz, hour, minute, after, _local_date(tz, after))[0]
+
+
+class NudgeScheduler:
+    """Daily per-learner nudge deadlines held in a timer wheel of fixed-width time buckets.
+
+    Each learner has one pending deadline: the next hour:minute in their own timezone.
+    ``schedule`` drops the learner ID into the bucket for that deadline (O(1)); rescheduling
+    or cancelling leaves the old bucket entry behind and it is ignored when that bucket
+    expires. ``pop_due`` walks the buckets between the last expiry and now, so each bucket is
+    visited once, and schedules every returned learner for their next local day.
+
+    With a ``state_path``, ``commit()`` appends only the entries changed since the last commit
+    to ``<state>.journal``; every ``snapshot_every`` commits ``save()`` rewrites the snapshot
+    and empties the journal. Loading replays the journal over the snapshot.
+
+    Delivery through ``run_due`` is at-least-once: state is committed only after the handler has
+    written a pass's nudges, so a crash in between sends those nudges again on restart (an
+    SQLite outbox absorbs the repeats through its (learner_id, day) key; a JSONL one does not).
+    Timezones need the IANA database, which on Windows comes from the ``tzdata`` package.
+    """
+
+    def __init__(
+        self,
+        state_path: str | Path | None = None,
+        *,
+        bucket_seconds: int = 60,
+        stale_after: Optional[float] = 6 * 3600,
+        snapshot_every: int = 1000,
+    ) -> None:
+        self.state_path = Path(state_path) if state_path is not None else None
+        self.bucket_seconds = bucket_seconds
+        self.stale_after = stale_after
+        self.snapshot_every = snapshot_every
+        self._entries: Dict[str, _Entry] = {}
+        self._buckets: Dict[int, List[str]] = defaultdict(list)
+        self._cursor: Optional[int] = None
+        self._changed: Set[str] = set()  # learners to journal on the next commit
+        self._generation = 0  # snapshot number; journal lines from older snapshots are ignored
+        self._journal_lines = 0
+        if self.state_path is not None and self.state_path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, learner_id: object) -> bool:
+        return learner_id in self._entries
+
+    def schedule(
+        self,
+        learner_id: str,
+        name: str,
+        tz: str = "UTC",
+        hour: int = DEFAULT_NUDGE_HOUR,
+        minute: int = 0,
+        *,
+        now: Optional[float] = None,
+    ) -> int:
+        """Add or update a learner's daily nudge time and return the pending deadline (epoch seconds).
+
+        A learner already scheduled at the same local time keeps the deadline they have, even if it
+        has passed (say, during downtime), so the next ``pop_due`` still sends it.
+        """
+
+        previous = self._entries.get(learner_id)
+        if previous is not None and (previous.tz, previous.hour, previous.minute) == (tz, hour, minute):
+            due, day = previous.due, previous.day
+        else:
+            now = time.time() if now is None else now
+            due, day = _next_deadline(tz, hour, minute, now, _local_date(tz, now))
+        self._put(learner_id, _Entry(name, tz, hour, minute, due, day))
+        return due
+
+    def cancel(self, learner_id: str) -> bool:
+        if self._entries.pop(learner_id, None) is None:
+            return False
+        self._changed.add(learner_id)
+        return True
+
+    def next_due(self) -> Optional[int]:
+        """Earliest pending deadline, or None when nothing is scheduled."""
+
+        for bucket in sorted(self._buckets):
+            dues = [
+                entry.due
+                for entry in map(self._entries.get, self._buckets[bucket])
+                if entry is not None and self._bucket(entry.due) == bucket
+            ]
+            if dues:
+                return min(dues)
+        return None
+
+    def _bucket(self, due: int) -> int:
+        return due // self.bucket_seconds
+
+    def _put(self, learner_id: str, entry: _Entry) -> None:
+        previous = self._entries.get(learner_id)
+        self._entries[learner_id] = entry
+        self._changed.add(learner_id)
+        bucket = self._bucket(entry.due)
+        if previous is None or self._bucket(previous.due) != bucket:
+            self._buckets[bucket].append(learner_id)
+
+    def pop_due(self, now: Optional[float] = None) -> List[DueNudge]:
+        """Remove and return every nudge due at or before now, rescheduling each for its next day.
+
+        Deadlines missed by more than ``stale_after`` seconds (e.g. while the process was down)
+        are rescheduled without being returned.
+        """
+
+        now = time.time() if now is None else now
+        current = self._bucket(int(now))
+        if self._cursor is None:
+            self._cursor = min(self._buckets, default=current)
+        if current - self._cursor > len(self._buckets):
+            # Long gap (e.g. after a restart): visit only occupied buckets instead of every slot.
+            buckets: Iterable[int] = sorted(b for b in self._buckets if b <= current)
+        else:
+            buckets = range(self._cursor, current + 1)
+
+        due: List[DueNudge] = []
+        rescheduled: List[Tuple[str, _Entry, int, date]] = []
+        today: Dict[str, date] = {}
+        for bucket in buckets:
+            learner_ids = self._buckets.pop(bucket, None)
+            if not learner_ids:
+                continue
+            seen: Set[str] = set()
+            for learner_id in learner_ids:
+                entry = self._entries.get(learner_id)
+                if entry is None or self._bucket(entry.due) != bucket or learner_id in seen:
+                    continue  # cancelled, moved to another bucket, or listed twice
+                seen.add(learner_id)
+                if entry.due > now:
+                    self._buckets[bucket].append(learner_id)  # later in the current bucket
+                    continue
+                deadline, day = entry.due, entry.day
+                if self.stale_after is not None and now - deadline > self.stale_after:
+                    # Skip missed days; keep only a deadline that is still inside the window.
+                    since = now - self.stale_after
+                    today_then = _local_date(entry.tz, since)
+                    deadline, day = _next_deadline(entry.tz, entry.hour, entry.minute, since, today_then)
+                if deadline <= now:
+                    due.append(DueNudge(learner_id, entry.name, day, deadline))
+                rescheduled.append((learner_id, entry, deadline, day))
+        self._cursor = current
+        for learner_id, entry, deadline, day in rescheduled:
+            tz = entry.tz
+            if deadline <= now:
+                if tz not in today:
+                    today[tz] = _local_date(tz, now)
+                deadline, day = _next_deadline(tz, entry.hour, entry.minute, now, today[tz])
+            self._put(learner_id, _Entry(entry.name, tz, entry.hour, entry.minute, deadline, day))
+        return due
+
+    def run_due(
+        self,
+        handler: Callable[[List[DueNudge]], None],
+        *,
+        now: Optional[float] = None,
+        batch_size: int = 10_000,
+    ) -> int:
+        """Pass due nudges to handler in batches, then commit state; returns how many were dispatched.
+
+        State is only committed when something was dispatched; an idle tick leaves the files alone.
+        """
+
+        due = self.pop_due(now)
+        if not due:
+            return 0
+        for batch in chunked(due, batch_size):
+            handler(batch)
+        if self.state_path is not None:
+            self.commit()
+        return len(due)
+
+    # ---------------- Persistence ----------------
+
+    @property
+    def journal_path(self) -> Optional[Path]:
+        return self.state_path.with_name(self.state_path.name + ".journal") if self.state_path is not None else None
+
+    def commit(self) -> None:
+        """Append the entries changed since the last commit to the journal, or snapshot when it is due."""
+
+        if self.state_path is None or self.journal_path is None:
+            raise ValueError("No state_path configured")
+        if not self.state_path.exists() or self._journal_lines >= self.snapshot_every:
+            self.save()
+            return
+        line = {
+            "generation": self._generation,
+            "cursor": self._cursor,
+            "put": [],
+            "cancel": [],
+        }
+        for learner_id in self._changed:
+            entry = self._entries.get(learner_id)
+            if entry is None:
+                line["cancel"].append(learner_id)
+            else:
+                line["put"].append(_entry_row(learner_id, entry))
+        data = json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self.journal_path.open("ab") as fh:
+            fh.write(data.encode("utf-8"))
+        self._journal_lines += 1
+        self._changed.clear()
+
+    def save(self, path: str | Path | None = None) -> None:
+        """Write a full snapshot; to ``state_path`` (the default) this also empties the journal."""
+
+        target = Path(path) if path is not None else self.state_path
+        if target is None:
+            raise ValueError("No state_path configured")
+        own = target == self.state_path
+        payload = {
+            "version": 1,
+            "generation": self._generation + 1 if own else self._generation,
+            "bucket_seconds": self.bucket_seconds,
+            "cursor": self._cursor,
+            "entries": [_entry_row(lid, e) for lid, e in self._entries.items()],
+        }
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, target)
+        if own and self.journal_path is not None:
+            # The new generation already makes the old journal lines stale; removing them saves replay.
+            self.journal_path.unlink(missing_ok=True)
+            self._generation += 1
+            self._journal_lines = 0
+            self._changed.clear()
+
+    def _load(self) -> None:
+        assert self.state_path is not None and self.journal_path is not None
+        payload = json.loads(self.state_path.read_text(encoding="utf-8"))
+        self._generation = payload.get("generation", 0)
+        self._cursor = payload.get("cursor")
+        for row in payload["entries"]:
+            self._load_row(row)
+        if self.journal_path.exists():
+            self._replay_journal()
+        self._changed.clear()
+        if payload.get("bucket_seconds") != self.bucket_seconds:
+            if self._cursor is not None:
+                self._cursor = self._cursor * payload["bucket_seconds"] // self.bucket_seconds
+            self.save()  # journal lines must use the snapshot's bucket width
+
+    def _load_row(self, row: List[Any]) -> None:
+        learner_id, name, tz, hour, minute, due = row
+        self._put(learner_id, _Entry(name, tz, hour, minute, due, _local_date(tz, due)))
+
+    def _replay_journal(self) -> None:
+        assert self.journal_path is not None
+        good_end = 0
+        with self.journal_path.open("rb") as fh:
+            for raw in fh:
+                if not raw.endswith(b"\n"):
+                    break  # torn by a crash mid-commit; that pass is sent again
+                line = json.loads(raw)
+                good_end += len(raw)
+                if line["generation"] != self._generation:
+                    continue
+                self._cursor = line["cursor"]
+                for row in line["put"]:
+                    self._load_row(row)
+                for learner_id in line["cancel"]:
+                    self._entries.pop(learner_id, None)
+                self._journal_lines += 1
+            fh.seek(0, os.SEEK_END)
+            torn = fh.tell() > good_end
+        if torn:
+            with self.journal_path.open("r+b") as fh:
+                fh.truncate(good_end)
+
+
+def _entry_row(learner_id: str, entry: _Entry) -> List[Any]:
+    return [learner_id, entry.name, entry.tz, entry.hour, entry.minute, entry.due]
+
+
+def outbox_handler(
+    outbox: str | Path, history: Optional[TemplateHistory] = None
+) -> Callable[[List[DueNudge]], None]:
+    """Handler for run_due that writes each batch's motivation messages to an outbox (see nudges).
+
+    With a ``history``, learners do not get the sentences from their last few nudges again.
+    """
+
+    def handle(batch: List[DueNudge]) -> None:
+        by_day: Dict[date, List[DueNudge]] = defaultdict(list)
+        for item in batch:
+            by_day[item.local_date].append(item)
+        rows: List[Tuple[str, str, str]] = []
+        for day, items in by_day.items():
+            profiles = [
+                UserProfile(
+                    name=i.name, learning_goal="", interested_topics=[], current_level="", learner_id=i.learner_id
+                )
+                for i in items
+            ]
+            messages = build_motivation_messages_batch(profiles, on_date=day, history=history)
+            rows.extend((i.learner_id, day.isoformat(), m) for i, m in zip(items, messages))
+        append_outbox(outbox, rows)
+
+    return handle
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m assistant.scheduler", description="Dispatch daily nudges on local time."
+    )
+    parser.add_argument("state_path", help="scheduler state file")
+    parser.add_argument("outbox", help="outbox JSONL file or SQLite database")
+    parser.add_argument(
+        "--learners", help="CSV/JSONL with learner_id, name, timezone, hour, minute columns to (re)schedule"
+    )
+    parser.add_argument("--history", help="template history file, so learners do not get the same sentences again")
+    parser.add_argument(
+        "--history-slots", type=int, default=1 << 16, help="slots in a new history file (about the number of learners)"
+    )
+    parser.add_argument("--once", action="store_true", help="dispatch what is due now and exit")
+    args = parser.parse_args(argv)
+
+    scheduler = NudgeScheduler(args.state_path)
+    if args.learners:
+        for record in read_records(args.learners):
+            scheduler.schedule(
+                str(record["learner_id"]),
+                str(record["name"]),
+                record.get("timezone") or "UTC",
+                int(record.get("hour") or DEFAULT_NUDGE_HOUR),
+                int(record.get("minute") or 0),
+            )
+        scheduler.save()
+    history: Optional[TemplateHistory] = None
+    if args.history:
+        if os.path.exists(args.history):
+            history = TemplateHistory.load(args.history)
+        else:
+            history = TemplateHistory(args.history_slots)
+    handler = outbox_handler(args.outbox, history)
+    while True:
+        if scheduler.run_due(handler) and history is not None:
+            history.save(args.history)
+        if args.once:
+            return 0
+        now = datetime.now(timezone.utc).timestamp()
+        time.sleep(scheduler.bucket_seconds - now % scheduler.bucket_seconds)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .batch import chunked
+from .logger import _naive_utc, decode_record
+from .models import ConversationMessage
+
+# ``timestamp`` keeps the text as written (offset included); ``ts_utc`` is the same instant as
+# naive UTC with fixed-width microseconds, so string order is time order across offsets.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT,
+    learner_id TEXT,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    ts_utc TEXT
+);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS messages_session_ts ON messages (session_id, ts_utc);
+CREATE INDEX IF NOT EXISTS messages_role ON messages (role);
+"""
+
+_INSERT = (
+    "INSERT INTO messages (session_id, learner_id, role, content, timestamp, ts_utc) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+Row = Tuple[Optional[str], Optional[str], str, str, str, str]
+
+
+def _utc_text(ts: datetime) -> str:
+    return _naive_utc(ts).isoformat(timespec="microseconds")
+
+
+def _row(message: ConversationMessage) -> Row:
+    return (
+        message.session_id,
+        message.learner_id,
+        message.role,
+        message.content,
+        message.timestamp.isoformat(),
+        _utc_text(message.timestamp),
+    )
+
+
+def _message(row: Sequence[Any]) -> ConversationMessage:
+    session_id, learner_id, role, content, timestamp = row
+    return ConversationMessage(
+        role=role,
+        content=content,
+        timestamp=datetime.fromisoformat(timestamp),
+        session_id=session_id,
+        learner_id=learner_id,
+    )
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    if "ts_utc" not in {row[1] for row in conn.execute("PRAGMA table_info(messages)")}:
+        _add_utc_column(conn)
+    conn.executescript(_INDEXES)
+    return conn
+
+
+def _add_utc_column(conn: sqlite3.Connection) -> None:
+    """Upgrade a database created before ts_utc existed, filling it in from the stored text."""
+
+    with conn:
+        conn.execute("BEGIN")
+        conn.execute("ALTER TABLE messages ADD COLUMN ts_utc TEXT")
+        conn.execute("DROP INDEX IF EXISTS messages_session_ts")
+        rows = conn.execute("SELECT id, timestamp FROM messages").fetchall()
+        conn.executemany(
+            "UPDATE messages SET ts_utc = ? WHERE id = ?",
+            ((_utc_text(datetime.fromisoformat(ts)), row_id) for row_id, ts in rows),
+        )
+
+
+class SQLiteConversationStore:
+    """Conversation log stored in SQLite, with the same append/extend/load interface as ConversationLogger.
+
+    The database runs in WAL mode so readers do not block the writer. ``extend`` inserts a batch
+    in one transaction; with ``batch_size > 1``, ``append`` also buffers messages and commits
+    them together (call ``flush()`` or ``close()`` to commit the remainder). Indexes on
+    (session_id, timestamp) and role back ``query``; time filters compare instants in UTC, so
+    timestamps written with different offsets (or none, taken as UTC) still order correctly.
+    """
+
+    def __init__(self, db_path: str | Path = "conversation_log.sqlite3", *, batch_size: int = 1) -> None:
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self._conn = _connect(self.db_path)
+        self._pending: List[Row] = []
+        self._lock = threading.Lock()
+
+    def append(self, message: ConversationMessage) -> None:
+        with self._lock:
+            self._pending.append(_row(message))
+            if len(self._pending) >= self.batch_size:
+                self._commit_pending()
+
+    def extend(self, messages: Iterable[ConversationMessage]) -> None:
+        with self._lock:
+            self._pending.extend(_row(m) for m in messages)
+            self._commit_pending()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._commit_pending()
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> "SQLiteConversationStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _commit_pending(self) -> None:
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(_INSERT, self._pending)
+        self._pending.clear()
+
+    def load(self) -> List[ConversationMessage]:
+        return self.query()
+
+    def query(
+        self,
+        *,
+        session_id: Optional[str] = None,
+        role: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[ConversationMessage]:
+        """Return messages matching every given filter, in insertion order."""
+
+        self.flush()
+        clauses: List[str] = []
+        params: List[Any] = []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if role is not None:
+            clauses.append("role = ?")
+            params.append(role)
+        if start is not None:
+            clauses.append("ts_utc >= ?")
+            params.append(_utc_text(start))
+        if end is not None:
+            clauses.append("ts_utc <= ?")
+            params.append(_utc_text(end))
+        sql = "SELECT session_id, learner_id, role, content, timestamp FROM messages"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_message(row) for row in rows]
+
+    def count(self) -> int:
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+@dataclass
+class ImportResult:
+    """Counts from one import_jsonl run."""
+
+    imported: int = 0
+    bad_records: int = 0
+    bad_offsets: List[int] = field(default_factory=list)
+
+
+def import_jsonl(
+    log_path: str | Path, db_path: str | Path, *, batch_size: int = 50_000, max_offsets: int = 100
+) -> ImportResult:
+    """Import a JSONL conversation log into a SQLite store in one transaction.
+
+    Lines that cannot be decoded are skipped and reported in the result (byte offsets up to
+    max_offsets), like ``log_tools.verify_log``; any other failure rolls the whole import back,
+    so a rerun never duplicates rows. When the target table is empty the indexes are dropped
+    for the load and rebuilt once at the end, which is much faster than maintaining them row by
+    row.
+    """
+
+    result = ImportResult()
+    conn = _connect(Path(db_path))
+    fresh = conn.execute("SELECT 1 FROM messages LIMIT 1").fetchone() is None
+    conn.execute("PRAGMA synchronous=OFF")
+
+    def rows() -> Iterator[Row]:
+        with Path(log_path).open("rb") as fh:
+            offset = 0
+            for line in fh:
+                start = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    payload = decode_record(line)
+                    timestamp = payload["timestamp"]
+                    row = (
+                        payload.get("session_id"),
+                        payload.get("learner_id"),
+                        payload["role"],
+                        payload["content"],
+                        timestamp,
+                        _utc_text(datetime.fromisoformat(timestamp)),
+                    )
+                except (ValueError, KeyError, TypeError):
+                    result.bad_records += 1
+                    if len(result.bad_offsets) < max_offsets:
+                        result.bad_offsets.append(start)
+                    continue
+                yield row
+
+    try:
+        with conn:
+            conn.execute("BEGIN")
+            if fresh:
+                conn.execute("DROP INDEX IF EXISTS messages_session_ts")
+                conn.execute("DROP INDEX IF EXISTS messages_role")
+            for batch in chunked(rows(), batch_size):
+                conn.executemany(_INSERT, batch)
+                result.imported += len(batch)
+    finally:
+        conn.executescript(_INDEXES)
+        conn.close()
+    return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m assistant.sqlite_store", description="SQLite conversation store tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="import a JSONL conversation log")
+    importer.add_argument("log_path")
+    importer.add_argument("db_path")
+    importer.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    result = import_jsonl(args.log_path, args.db_path, batch_size=args.batch_size)
+    print(f"Imported {result.imported} messages into {args.db_path}")
+    if result.bad_records:
+        offsets = ", ".join(map(str, result.bad_offsets))
+        print(f"Skipped {result.bad_records} unreadable lines (byte offsets: {offsets})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
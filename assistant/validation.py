@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import typing
+from collections import abc
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Optional, Tuple, Type, TypeVar, Union
+
+from .schemas import LearningProfilePayload
+
+T = TypeVar("T")
+
+# A converter turns a raw JSON value into the field's type, appending to errors on failure.
+_Converter = Callable[[Any, str, List["FieldError"]], Any]
+
+_MISSING = object()
+_INVALID = object()
+
+
+@dataclass(frozen=True)
+class FieldError:
+    """One validation problem; ``path`` is like ``time_commitment.hours_per_week`` or ``[3].name``."""
+
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.path or '<root>'}: {self.message}"
+
+
+class PayloadValidationError(ValueError):
+    """Raised with every problem found in a payload (or batch of payloads), not just the first."""
+
+    def __init__(self, errors: List[FieldError]) -> None:
+        self.errors = errors
+        shown = "; ".join(map(str, errors[:10]))
+        more = f" (+{len(errors) - 10} more)" if len(errors) > 10 else ""
+        super().__init__(f"{len(errors)} validation error(s): {shown}{more}")
+
+
+def _child(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+def _convert_str(value: Any, path: str, errors: List[FieldError]) -> Any:
+    if type(value) is str:
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    errors.append(FieldError(path, "expected a string"))
+    return _INVALID
+
+
+def _convert_int(value: Any, path: str, errors: List[FieldError]) -> Any:
+    if type(value) is int:
+        return value
+    if type(value) is float and value.is_integer():
+        return int(value)
+    if type(value) is str:
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    errors.append(FieldError(path, "expected an integer"))
+    return _INVALID
+
+
+def _convert_float(value: Any, path: str, errors: List[FieldError]) -> Any:
+    if type(value) is float or type(value) is int:
+        return float(value)
+    if type(value) is str:
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    errors.append(FieldError(path, "expected a number"))
+    return _INVALID
+
+
+def _convert_bool(value: Any, path: str, errors: List[FieldError]) -> Any:
+    if type(value) is bool:
+        return value
+    if type(value) is str and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    errors.append(FieldError(path, "expected a boolean"))
+    return _INVALID
+
+
+_SCALARS = {str: _convert_str, int: _convert_int, float: _convert_float, bool: _convert_bool}
+
+
+def _optional(inner: _Converter) -> _Converter:
+    def convert(value: Any, path: str, errors: List[FieldError]) -> Any:
+        return None if value is None else inner(value, path, errors)
+
+    return convert
+
+
+def _list_of(item_type: Any, inner: _Converter) -> _Converter:
+    def convert(value: Any, path: str, errors: List[FieldError]) -> Any:
+        if type(value) is str and item_type is str:
+            # Intake answers arrive as "python, sql"; accept that for lists of strings.
+            return [part.strip() for part in value.split(",") if part.strip()]
+        if type(value) is not list and type(value) is not tuple:
+            errors.append(FieldError(path, "expected a list"))
+            return _INVALID
+        if item_type is str and all(type(item) is str for item in value):
+            return list(value)
+        before = len(errors)
+        items = [inner(item, f"{path}[{i}]", errors) for i, item in enumerate(value)]
+        return items if len(errors) == before else _INVALID
+
+    return convert
+
+
+def _object_of(schema: type, strict: bool) -> _Converter:
+    fields = []
+    for f in dataclasses.fields(schema):
+        factory = f.default_factory if f.default_factory is not dataclasses.MISSING else None
+        default = f.default if f.default is not dataclasses.MISSING else _MISSING
+        fields.append((f.name, factory, default))
+    known = frozenset(name for name, _, _ in fields)
+    hints = typing.get_type_hints(schema)
+    plan = [(name, factory, default, _converter_for(hints[name], strict)) for name, factory, default in fields]
+
+    def convert(value: Any, path: str, errors: List[FieldError]) -> Any:
+        if type(value) is not dict:
+            if isinstance(value, schema):
+                return value
+            errors.append(FieldError(path, "expected an object"))
+            return _INVALID
+        before = len(errors)
+        kwargs = {}
+        for name, factory, default, field_converter in plan:
+            raw = value.get(name, _MISSING)
+            if raw is _MISSING:
+                if factory is not None:
+                    kwargs[name] = factory()
+                elif default is not _MISSING:
+                    kwargs[name] = default
+                else:
+                    errors.append(FieldError(_child(path, name), "field required"))
+            else:
+                kwargs[name] = field_converter(raw, f"{path}.{name}" if path else name, errors)
+        if strict:
+            for name in value.keys() - known:
+                errors.append(FieldError(_child(path, str(name)), "unknown field"))
+        if len(errors) != before:
+            return _INVALID
+        return schema(**kwargs)
+
+    return convert
+
+
+@lru_cache(maxsize=None)
+def _converter_for(annotation: Any, strict: bool) -> _Converter:
+    if annotation in _SCALARS:
+        return _SCALARS[annotation]
+    if annotation is Any:
+        return lambda value, path, errors: value
+    if dataclasses.is_dataclass(annotation):
+        return _object_of(annotation, strict)
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is Union and type(None) in args:
+        rest = [a for a in args if a is not type(None)]
+        inner = _converter_for(rest[0] if len(rest) == 1 else Union[tuple(rest)], strict)
+        return _optional(inner)
+    if origin in (list, List) and args:
+        return _list_of(args[0], _converter_for(args[0], strict))
+    raise TypeError(f"Cannot build a validator for {annotation!r}")
+
+
+class Validator:
+    """Validation plan for one dataclass schema, built once by ``compile_validator``.
+
+    The plan is a tree of small converter functions resolved from the schema's type hints, so
+    parsing does no per-call introspection. Values are coerced where unambiguous ("6" and 6.0
+    for ints, numbers for strings, a comma-separated string for a list of strings); missing
+    fields take their dataclass defaults. All problems are collected and raised together.
+    """
+
+    def __init__(self, schema: Type[T], *, strict: bool = False) -> None:
+        if not dataclasses.is_dataclass(schema):
+            raise TypeError(f"{schema!r} is not a dataclass")
+        self.schema = schema
+        self.strict = strict
+        self._convert = _converter_for(schema, strict)
+
+    def validate(self, data: Any, path: str = "") -> Tuple[Optional[T], List[FieldError]]:
+        """Return (instance, []) for valid data, else (None, errors); never raises for bad data."""
+
+        errors: List[FieldError] = []
+        value = self._convert(data, path, errors)
+        return (None, errors) if errors else (value, errors)
+
+    def parse(self, data: Union[bytes, str, Any]) -> T:
+        """Parse one payload from JSON bytes/str or an already decoded dict."""
+
+        errors: List[FieldError] = []
+        value = self._convert(_loads(data), "", errors)
+        if errors:
+            raise PayloadValidationError(errors)
+        return value
+
+    def parse_many(self, data: Union[bytes, str, Iterable[Any]]) -> List[T]:
+        """Parse a JSON array (bytes/str) or an iterable of dicts; errors are reported as ``[i].field``."""
+
+        items = _loads(data, expect_array=True)
+        convert = self._convert
+        errors: List[FieldError] = []
+        parsed: List[T] = []
+        append = parsed.append
+        for i, item in enumerate(items):
+            # The item index is added to error paths only on failure, keeping the happy path cheap.
+            before = len(errors)
+            value = convert(item, "", errors)
+            if len(errors) != before:
+                prefix = f"[{i}]"
+                errors[before:] = [
+                    FieldError(_child(prefix, e.path) if e.path else prefix, e.message) for e in errors[before:]
+                ]
+            append(value)
+        if errors:
+            raise PayloadValidationError(errors)
+        return parsed
+
+    def partition(
+        self, data: Union[bytes, str, Iterable[Any]]
+    ) -> Tuple[List[T], List[Tuple[int, List[FieldError]]]]:
+        """Like parse_many, but return (valid payloads, [(index, errors), ...]) instead of raising."""
+
+        convert = self._convert
+        valid: List[T] = []
+        rejected: List[Tuple[int, List[FieldError]]] = []
+        for i, item in enumerate(_loads(data, expect_array=True)):
+            errors: List[FieldError] = []
+            value = convert(item, "", errors)
+            if errors:
+                rejected.append((i, errors))
+            else:
+                valid.append(value)
+        return valid, rejected
+
+
+def _loads(data: Any, *, expect_array: bool = False) -> Any:
+    """Decode JSON bytes/str (other values pass through); with expect_array, insist on a sequence of items."""
+
+    if isinstance(data, (bytes, bytearray, memoryview, str)):
+        try:
+            data = json.loads(data)
+        except ValueError as exc:  # JSONDecodeError and invalid UTF-8
+            raise PayloadValidationError([FieldError("", f"invalid JSON: {exc}")]) from None
+    if expect_array and (isinstance(data, (dict, str)) or not isinstance(data, abc.Iterable)):
+        raise PayloadValidationError([FieldError("", "expected a JSON array")])
+    return data
+
+
+@lru_cache(maxsize=None)
+def compile_validator(schema: Type[T], *, strict: bool = False) -> Validator:
+    """Return the (cached) validator for a dataclass schema; ``strict`` rejects unknown fields."""
+
+    return Validator(schema, strict=strict)
+
+
+def parse_payload(data: Union[bytes, str, Any], *, strict: bool = False) -> LearningProfilePayload:
+    """Parse and validate one intake payload from JSON bytes/str or a dict."""
+
+    return compile_validator(LearningProfilePayload, strict=strict).parse(data)
+
+
+def parse_payloads(data: Union[bytes, str, Iterable[Any]], *, strict: bool = False) -> List[LearningProfilePayload]:
+    """Parse and validate a JSON array (or iterable of dicts) of intake payloads."""
+
+    return compile_validator(LearningProfilePayload, strict=strict).parse_many(data)
@@ -0,0 +1,118 @@
+"""Throughput of the assistant codec against plain json on 100k objects.
+
+Run from the repository root: ``python -m benchmarks.codec_bench``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict
+
+from assistant.codec import (
+    as_dict,
+    decode,
+    decode_many,
+    dumps_json,
+    encode,
+    encode_many,
+    loads_json,
+)
+from assistant.models import Course, LearningPlan, LearningPlanStep, UserProfile
+
+N = 100_000
+
+
+def _profiles():
+    return [
+        UserProfile(
+            name=f"Learner {i}",
+            learning_goal="Land a data analyst role",
+            interested_topics=["python", "sql", "pandas"],
+            current_level="beginner",
+            provider_requirements=["DataCamp"],
+            weekly_time_hours=6,
+            timeframe_weeks=8,
+        )
+        for i in range(N)
+    ]
+
+
+def _courses():
+    return [
+        Course(
+            title=f"Introduction to SQL {i}",
+            provider="DataCamp",
+            url="https://www.datacamp.com/courses/introduction-to-sql",
+            topics=["sql", "databases"],
+            level="beginner",
+            summary="Learn to query relational databases with SQL.",
+            est_hours=4,
+        )
+        for i in range(N)
+    ]
+
+
+def _steps():
+    return [
+        LearningPlanStep(
+            title=f"Step {i}: Introduction to SQL",
+            description="Work through the course on DataCamp. Focus on modules matching your goal.",
+            resources=["https://www.datacamp.com/courses/introduction-to-sql"],
+            est_time_hours=4,
+        )
+        for i in range(N)
+    ]
+
+
+def _plans():
+    steps = [
+        LearningPlanStep(
+            title=f"Step {i}: Course",
+            description="Work through the course on DataCamp. Focus on modules matching your goal.",
+            resources=["https://www.datacamp.com/courses/introduction-to-sql"],
+            est_time_hours=4,
+        )
+        for i in range(4)
+    ]
+    return [LearningPlan(goal=f"Goal {i}", steps=list(steps), notes=["Aim for consistent progress."]) for i in range(N)]
+
+
+def _timed(label: str, fn) -> object:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:8.1f} ms  {N / elapsed:>12,.0f} obj/s")
+    return result
+
+
+def _run(name: str, objs, decode_plain) -> None:
+    print(f"{name} x {N:,}")
+    plain = _timed("json (asdict) encode", lambda: [json.dumps(asdict(o)) for o in objs])
+    _timed("json (asdict) decode", lambda: [decode_plain(json.loads(s)) for s in plain])
+    fast = _timed("codec json encode", lambda: [dumps_json(o) for o in objs])
+    _timed("codec json decode", lambda: [loads_json(s) for s in fast])
+    binary = _timed("codec binary encode", lambda: [encode(o) for o in objs])
+    _timed("codec binary decode", lambda: [decode(b) for b in binary])
+    packed = _timed("codec binary encode_many", lambda: encode_many(objs))
+    _timed("codec binary decode_many", lambda: decode_many(packed))
+    print(
+        f"  size: json {sum(map(len, plain)):,} B, codec json {sum(map(len, fast)):,} B, "
+        f"binary {len(packed):,} B"
+    )
+    assert as_dict(decode_many(packed)[-1]) == as_dict(objs[-1])
+
+
+def _plan_from_plain(data):
+    return LearningPlan(goal=data["goal"], steps=[LearningPlanStep(**s) for s in data["steps"]], notes=data["notes"])
+
+
+def main() -> None:
+    _run("UserProfile", _profiles(), lambda d: UserProfile(**d))
+    _run("Course", _courses(), lambda d: Course(**d))
+    _run("LearningPlanStep", _steps(), lambda d: LearningPlanStep(**d))
+    _run("LearningPlan", _plans(), _plan_from_plain)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Append throughput and range-query latency: JSONL ConversationLogger vs SQLiteConversationStore.
+
+Run from the repository root: ``python -m benchmarks.conversation_store_bench``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from assistant.logger import ConversationLogger
+from assistant.models import ConversationMessage
+from assistant.sqlite_store import SQLiteConversationStore, import_jsonl
+
+N = 100_000
+SINGLE = 5_000
+SESSIONS = 1_000
+BASE = datetime(2026, 1, 1)
+
+
+def _messages(n: int):
+    return [
+        ConversationMessage(
+            role="user" if i % 2 else "assistant",
+            content=f"message {i} about pandas and SQL",
+            timestamp=BASE + timedelta(seconds=i),
+            session_id=f"session-{i % SESSIONS}",
+        )
+        for i in range(n)
+    ]
+
+
+def _timed(label: str, count: int, fn) -> object:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40} {elapsed * 1000:9.1f} ms  {count / elapsed:>12,.0f} msg/s")
+    return result
+
+
+def _latency(label: str, fn, repeat: int = 20) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<40} {elapsed * 1000:9.2f} ms  ({len(result)} rows)")
+
+
+def main() -> None:
+    messages = _messages(N)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f"Append ({SINGLE:,} single appends, then {N:,} in one batch)")
+        jsonl = ConversationLogger(root / "single.jsonl")
+        _timed("jsonl append", SINGLE, lambda: [jsonl.append(m) for m in messages[:SINGLE]])
+        with ConversationLogger(root / "buffered.jsonl", buffered=True) as buffered:
+            _timed("jsonl buffered append", SINGLE, lambda: [buffered.append(m) for m in messages[:SINGLE]])
+        with SQLiteConversationStore(root / "single.sqlite3") as store:
+            _timed("sqlite append (commit each)", SINGLE, lambda: [store.append(m) for m in messages[:SINGLE]])
+        with SQLiteConversationStore(root / "batched.sqlite3", batch_size=500) as store:
+            _timed("sqlite append (batch_size=500)", SINGLE, lambda: [store.append(m) for m in messages[:SINGLE]])
+
+        logger = ConversationLogger(root / "bulk.jsonl")
+        _timed("jsonl extend", N, lambda: logger.extend(messages))
+        store = SQLiteConversationStore(root / "bulk.sqlite3")
+        _timed("sqlite extend", N, lambda: store.extend(messages))
+        _timed("sqlite import_jsonl", N, lambda: import_jsonl(root / "bulk.jsonl", root / "imported.sqlite3"))
+
+        print("Range queries")
+        start, end = BASE + timedelta(seconds=N // 2), BASE + timedelta(seconds=N // 2 + 500)
+        _latency("jsonl scan: session", lambda: [m for m in logger.iter_messages() if m.session_id == "session-7"], 3)
+        _latency("sqlite: session", lambda: store.query(session_id="session-7"))
+        _latency(
+            "jsonl scan: time window",
+            lambda: [m for m in logger.iter_messages() if start <= m.timestamp <= end],
+            3,
+        )
+        logger.refresh_index()
+        _latency("jsonl indexed since(): time window", lambda: [m for m in logger.since(start) if m.timestamp <= end], 3)
+        _latency("sqlite: time window", lambda: store.query(start=start, end=end))
+        _latency(
+            "sqlite: session + time window",
+            lambda: store.query(session_id="session-7", start=start, end=end + timedelta(hours=6)),
+        )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Throughput of the compiled payload validator on a JSON array of 100k intake payloads.
+
+Run from the repository root: ``python -m benchmarks.validation_bench``.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+
+from assistant.schemas import CurrentLevel, LearningProfilePayload, TimeCommitment
+from assistant.validation import compile_validator, parse_payload, parse_payloads
+
+N = 100_000
+
+
+def _payloads():
+    return [
+        {
+            "name": f"Learner {i}",
+            "learning_goals": ["Land a data analyst role"],
+            "learning_topics": ["python", "sql", "pandas"],
+            "current_level": {"overall": "Beginner", "notes": None},
+            "preferred_providers": ["DataCamp"],
+            "special_requirements": [],
+            "time_commitment": {"hours_per_week": 6 if i % 2 else "6", "timeframe_weeks": 8},
+        }
+        for i in range(N)
+    ]
+
+
+def _by_hand(data):
+    """The unvalidated dict-to-dataclass conversion endpoints write today."""
+
+    return LearningProfilePayload(
+        name=data.get("name", "Learner"),
+        learning_goals=list(data.get("learning_goals", [])),
+        learning_topics=list(data.get("learning_topics", [])),
+        current_level=CurrentLevel(**data["current_level"]),
+        preferred_providers=list(data.get("preferred_providers", [])),
+        special_requirements=list(data.get("special_requirements", [])),
+        time_commitment=TimeCommitment(
+            int(data["time_commitment"]["hours_per_week"]), data["time_commitment"].get("timeframe_weeks")
+        ),
+    )
+
+
+def _timed(label: str, fn) -> object:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {elapsed * 1000:8.1f} ms  {N / elapsed:>12,.0f} payloads/s")
+    return result
+
+
+def main() -> None:
+    payloads = _payloads()
+    raw = json.dumps(payloads).encode("utf-8")
+    lines = [json.dumps(p).encode("utf-8") for p in payloads]
+    validator = compile_validator(LearningProfilePayload)
+    print(f"LearningProfilePayload x {N:,} ({len(raw):,} B of JSON)")
+    _timed("json.loads only", lambda: json.loads(raw))
+    by_hand = _timed("json.loads + hand conversion", lambda: [_by_hand(p) for p in json.loads(raw)])
+    parsed = _timed("parse_payloads (bytes array)", lambda: parse_payloads(raw))
+    _timed("parse_payload per document", lambda: [parse_payload(line) for line in lines])
+    _timed("Validator.partition (dicts)", lambda: validator.partition(payloads))
+    assert parsed == by_hand
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import argparse
+
 from assistant import (
     build_learning_plan,
     build_motivation_message,
@@ -6,8 +8,9 @@ from assistant import (
     intake_questions,
     recommend_courses,
 )
+from assistant.batch import run_batch
 
-def main():
+def interactive():
     # 1) Ask intake questions and collect answers
     answers = {}
     for q in intake_questions():
@@ -20,7 +23,7 @@ def main():
     courses = recommend_courses(profile, use_builtin_fallback=True)
 
     # 3) Turn recommendations into a sequenced learning plan
-    plan = build_learning_plan(profile, courses)
+    plan = build_learning_plan(profile, courses, fit_to_budget=True)
 
     # 4) Break it down week-by-week
     weekly_plan = build_weekly_plan(
@@ -44,10 +47,39 @@ def main():
     print(plan)
 
     print("\n=== WEEKLY PLAN ===")
-    print(weekly_plan)
+    for week in weekly_plan:
+        print("-", week.to_step())
 
     print("\n=== MOTIVATION ===")
     print(motivation)
 
+def main():
+    parser = argparse.ArgumentParser(description="Run the learning assistant pipeline.")
+    parser.add_argument("--batch", metavar="INPUT", help="JSONL or CSV file of intake answers, one learner per row")
+    parser.add_argument("--output", metavar="OUTPUT", help="JSONL file for batch results (default: INPUT.results.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="learners per worker task")
+    parser.add_argument("--checkpoint", metavar="PATH", help="checkpoint file (default: OUTPUT.ckpt)")
+    parser.add_argument("--overwrite", action="store_true", help="replace OUTPUT when there is no checkpoint to resume")
+    args = parser.parse_args()
+
+    if not args.batch:
+        interactive()
+        return
+
+    output = args.output or f"{args.batch}.results.jsonl"
+    try:
+        count = run_batch(
+            args.batch,
+            output,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            checkpoint_path=args.checkpoint,
+            overwrite=args.overwrite,
+        )
+    except FileExistsError as exc:
+        parser.error(str(exc))
+    print(f"Processed {count} learners -> {output}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+from assistant.analytics import ConversationAnalytics
+from assistant.compaction import RetentionPolicy, compact_log, compact_segments
+from assistant.log_segments import SegmentedConversationLogger
+from assistant.logger import ConversationLogger
+from assistant.models import ConversationMessage
+
+START = datetime(2026, 3, 1, 12, 0)
+
+
+def messages(days, per_day=2):
+    return [
+        ConversationMessage(
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"d{day}-{i}",
+            timestamp=START + timedelta(days=day, minutes=i),
+            session_id=f"s{day % 3}",
+        )
+        for day in days
+        for i in range(per_day)
+    ]
+
+
+def fresh_report(log_path, tmp_path):
+    with ConversationAnalytics(log_path, tmp_path / "fresh.db") as analytics:
+        analytics.update()
+        return analytics.report()
+
+
+def forbid_recount(analytics, monkeypatch):
+    def fail():
+        raise AssertionError("aggregates were recounted from scratch")
+
+    monkeypatch.setattr(analytics, "_reset", fail)
+
+
+def test_bad_lines_are_skipped_counted_and_passed(tmp_path):
+    path = tmp_path / "log.jsonl"
+    ConversationLogger(path).extend(messages([0]))
+    with path.open("ab") as fh:
+        fh.write(b"{torn\n")
+    analytics = ConversationAnalytics(path)
+
+    assert analytics.update() == 2
+    ConversationLogger(path).extend(messages([1]))
+    assert analytics.update() == 2
+
+    report = analytics.report()
+    assert report["total_messages"] == 4
+    assert report["bad_records"] == 1
+    analytics.close()
+
+
+def test_file_aggregates_carry_across_compaction(tmp_path, monkeypatch):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path, compaction_safe=True)
+    logger.extend(messages(range(8)))
+    analytics = ConversationAnalytics(path)
+    analytics.update()
+    forbid_recount(analytics, monkeypatch)
+    logger.extend(messages([8, 9]))  # appended before compaction, not yet counted
+
+    compact_log(path, RetentionPolicy(max_age_days=5), now=START + timedelta(days=9))
+    logger.extend(messages([10]))
+
+    assert analytics.update() == 6
+    report = analytics.report()
+    analytics.close()
+    assert report["total_messages"] == 22
+    assert report == fresh_report(path, tmp_path)
+
+
+def test_file_aggregates_survive_two_compactions_between_updates(tmp_path, monkeypatch):
+    path = tmp_path / "log.jsonl"
+    ConversationLogger(path).extend(messages(range(8)))
+    analytics = ConversationAnalytics(path)
+    analytics.update()
+    forbid_recount(analytics, monkeypatch)
+
+    compact_log(path, RetentionPolicy(max_age_days=5), now=START + timedelta(days=8))
+    compact_log(path, RetentionPolicy(max_age_days=5), now=START + timedelta(days=10))
+
+    assert analytics.update() == 0
+    report = analytics.report()
+    analytics.close()
+    assert report == fresh_report(path, tmp_path)
+
+
+def test_segment_aggregates_carry_across_compaction(tmp_path, monkeypatch):
+    log_dir = tmp_path / "logs"
+    logger = SegmentedConversationLogger(log_dir, compress=False, max_segment_age=None)
+    for day in range(6):
+        logger.extend(messages([day]))
+        logger.rotate()
+    analytics = ConversationAnalytics(log_dir)
+    analytics.update()
+    forbid_recount(analytics, monkeypatch)
+    logger.extend(messages([6]))
+
+    compact_segments(logger, RetentionPolicy(max_age_days=3), now=START + timedelta(days=6))
+
+    assert analytics.update() == 2
+    report = analytics.report()
+    analytics.close()
+    logger.close()
+    assert report["total_messages"] == 14
+    assert report == fresh_report(log_dir, tmp_path)
+
+
+def test_stale_cursor_falls_back_to_a_recount(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path, compaction_safe=True)
+    logger.extend(messages(range(8)))
+    analytics = ConversationAnalytics(path)
+    analytics.update()
+    (tmp_path / "log.jsonl.cursors.json").unlink()
+
+    compact_log(path, RetentionPolicy(max_age_days=5), now=START + timedelta(days=8))
+
+    assert analytics.update() == 10
+    report = analytics.report()
+    analytics.close()
+    assert report == fresh_report(path, tmp_path)
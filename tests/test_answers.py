@@ -0,0 +1,40 @@
+import pytest
+
+from assistant.answers import parse_hours, parse_level, parse_weeks
+
+
+@pytest.mark.parametrize(
+    "answer, hours",
+    [
+        ("10h", 10),
+        ("5-7", 6),
+        ("1 hour a day", 7),
+        ("between 5 and 10", 8),
+        ("between 4 and 6 hours a week", 5),
+        ("1,000", 1000),
+        ("1,5 hours", 2),
+    ],
+)
+def test_parse_hours(answer, hours):
+    assert parse_hours(answer) == hours
+
+
+def test_between_range_gives_the_midpoint_for_weeks_too():
+    assert parse_weeks("between two and four months") == 12
+    assert parse_weeks("between 6 and 8 weeks") == 7
+
+
+def test_thousands_separator_is_not_a_decimal_comma():
+    assert parse_weeks("1,040 days") == 149
+    assert parse_hours("2,5") == 3
+
+
+@pytest.mark.parametrize("answer", ["None", "none", "N/A", "null", " "])
+def test_placeholder_levels_give_none(answer):
+    assert parse_level(answer) is None
+
+
+def test_level_synonyms_still_map():
+    assert parse_level("Total beginner") == "beginner"
+    assert parse_level("no experience") == "beginner"
+    assert parse_level("some experience with SQL") == "intermediate"
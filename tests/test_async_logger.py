@@ -0,0 +1,55 @@
+import threading
+from datetime import datetime
+
+from assistant.async_logger import BackgroundConversationLogger
+from assistant.models import ConversationMessage
+
+
+def message(i):
+    return ConversationMessage(role="user", content=f"m{i}", timestamp=datetime(2026, 3, 1, 12, i))
+
+
+def test_close_timeout_stops_the_writer_instead_of_writing_into_a_closed_log(tmp_path):
+    logger = BackgroundConversationLogger(tmp_path / "log.jsonl", batch_size=1)
+    release = threading.Event()
+    real_extend = logger._logger.extend
+
+    def slow_extend(batch):
+        release.wait(5)
+        real_extend(batch)
+
+    logger._logger.extend = slow_extend
+    logger.extend(message(i) for i in range(5))
+    threading.Timer(0.2, release.set).start()
+    logger.close(timeout=0.05)
+    logger._writer.join(5)
+
+    stats = logger.stats()
+    lines = (tmp_path / "log.jsonl").read_text(encoding="utf-8").splitlines()
+    assert not logger._writer.is_alive()
+    assert stats["written"] == len(lines) == 1
+    assert stats["dropped"] == 4
+
+
+def test_write_failure_counts_only_records_that_were_not_written(tmp_path):
+    logger = BackgroundConversationLogger(tmp_path / "log.jsonl", batch_size=2)
+    real_write = logger._logger._write
+    calls = []
+
+    def failing_write(records):
+        calls.append(len(records))
+        if len(calls) == 1:
+            raise OSError("disk full")
+        real_write(records)
+
+    logger._logger._write = failing_write
+    logger.append(message(0))
+    logger.flush()
+    logger.extend([message(1), message(2)])
+    logger.close()
+
+    stats = logger.stats()
+    assert stats["errors"] == 1
+    assert stats["written"] == 2
+    assert isinstance(logger.last_error, OSError)
+    assert [m.content for m in logger._logger.load()] == ["m1", "m2"]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from assistant import batch
+from assistant.batch import Checkpoint, run_batch
+
+
+def write_learners(path, count, bad_rows=()):
+    lines = []
+    for i in range(count):
+        if i in bad_rows:
+            lines.append("{not json\n")
+            continue
+        row = {
+            "name": f"Learner {i}",
+            "learning_goal": "Learn data analysis",
+            "interested_topics": "python, sql",
+            "current_level": "beginner",
+            "weekly_time_hours": "6",
+            "timeframe_weeks": "8",
+        }
+        lines.append(json.dumps(row) + "\n")
+    path.write_text("".join(lines), encoding="utf-8")
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_results_stay_in_input_order_and_bad_rows_get_errors(tmp_path):
+    source = tmp_path / "learners.jsonl"
+    output = tmp_path / "results.jsonl"
+    write_learners(source, 5, bad_rows={2})
+
+    assert run_batch(source, output, workers=1, chunk_size=2) == 5
+
+    results = read_results(output)
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert "invalid JSON" in results[2]["error"]
+    assert results[4]["profile"]["name"] == "Learner 4"
+
+
+def test_interrupted_run_resumes_from_the_checkpoint(tmp_path, monkeypatch):
+    source = tmp_path / "learners.jsonl"
+    output = tmp_path / "results.jsonl"
+    write_learners(source, 7)
+    real_run_chunk = batch._run_chunk
+    calls = []
+
+    def crash_on_third_chunk(chunk):
+        calls.append(chunk)
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return real_run_chunk(chunk)
+
+    monkeypatch.setattr(batch, "_run_chunk", crash_on_third_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        run_batch(source, output, workers=1, chunk_size=2)
+    with output.open("a", encoding="utf-8") as fh:
+        fh.write('{"index": 4, "partial')  # torn write past the checkpoint
+
+    checkpoint = Checkpoint.load(tmp_path / "results.jsonl.ckpt")
+    assert checkpoint.records == 4
+
+    monkeypatch.setattr(batch, "_run_chunk", real_run_chunk)
+    assert run_batch(source, output, workers=1, chunk_size=2) == 3
+    assert [r["index"] for r in read_results(output)] == list(range(7))
+
+
+def test_fresh_run_refuses_to_replace_existing_results(tmp_path):
+    source = tmp_path / "learners.jsonl"
+    output = tmp_path / "results.jsonl"
+    write_learners(source, 2)
+    output.write_text('{"index": 0, "kept": true}\n', encoding="utf-8")
+
+    with pytest.raises(FileExistsError):
+        run_batch(source, output, workers=1)
+    assert read_results(output) == [{"index": 0, "kept": True}]
+
+    assert run_batch(source, output, workers=1, overwrite=True) == 2
+    assert [r["index"] for r in read_results(output)] == [0, 1]
@@ -0,0 +1,105 @@
+import struct
+
+import pytest
+
+from assistant.codec import CodecError, decode, decode_many, encode, encode_many, from_json_dict, to_json_dict
+from assistant.models import Course, LearningPlan, LearningPlanStep, UserProfile
+
+
+def make_profile(**overrides):
+    fields = dict(
+        name="Ada Lovelace",
+        learning_goal="Become a data analyst ✨",
+        interested_topics=["python", "sql", "statistics"],
+        current_level="beginner",
+        provider_requirements=["Coursera"],
+        weekly_time_hours=6,
+        timeframe_weeks=12,
+        phased_focus=["foundations", "projects"],
+        special_requirements=[],
+        learner_id="emp-0042",
+    )
+    fields.update(overrides)
+    return UserProfile(**fields)
+
+
+def make_plan():
+    return LearningPlan(
+        goal="Become a data analyst",
+        steps=[
+            LearningPlanStep("Step 1: Warm up", "Clarify the goal.", [], 1),
+            LearningPlanStep("Step 2: SQL", "Learn joins — and windows.", ["https://a", "https://b"], None),
+            LearningPlanStep("Step final: Apply", "Build a project.", ["https://kaggle.com"], 8),
+        ],
+        notes=["Aim for consistency.", "Take notes."],
+    )
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        make_profile(),
+        make_profile(weekly_time_hours=None, timeframe_weeks=None, learner_id=None, interested_topics=[]),
+        Course("SQL Basics", "Coursera", "https://c", ["sql"], "beginner", "Intro to SQL", 10),
+        LearningPlanStep("Step 2: SQL", "Joins", ["https://a"], None),
+        make_plan(),
+        LearningPlan(goal="", steps=[], notes=[]),
+    ],
+)
+def test_binary_and_json_round_trip(obj):
+    assert decode(encode(obj)) == obj
+    assert from_json_dict(to_json_dict(obj)) == obj
+
+
+def test_encode_many_round_trip():
+    objs = [make_profile(), make_plan(), make_profile(name="Grace", learner_id="emp-7")]
+    assert decode_many(encode_many(objs)) == objs
+
+
+def test_version_1_profile_still_decodes():
+    strings = ["Ada", "goal", "beginner", "python"]
+    record = (
+        struct.pack("<2sBB", b"LA", 1, 1)
+        + struct.pack("<?i?iIIII", True, 5, False, 0, 1, 0, 0, 0)
+        + struct.pack(f"<I{len(strings)}I", len(strings), *map(len, strings))
+        + "".join(strings).encode("utf-8")
+    )
+    profile = decode(record)
+    assert profile == make_profile(
+        name="Ada",
+        learning_goal="goal",
+        interested_topics=["python"],
+        provider_requirements=[],
+        weekly_time_hours=5,
+        timeframe_weeks=None,
+        phased_focus=[],
+        learner_id=None,
+    )
+
+
+def test_out_of_range_int_raises_codec_error():
+    with pytest.raises(CodecError):
+        encode(make_profile(weekly_time_hours=2**31))
+    with pytest.raises(CodecError):
+        encode(LearningPlanStep("t", "d", [], -(2**40)))
+
+
+def test_lone_surrogate_raises_codec_error():
+    with pytest.raises(CodecError):
+        encode(LearningPlanStep("bad \ud800 title", "d", [], 1))
+    with pytest.raises(CodecError):
+        encode_many([make_profile(name="ok"), make_profile(name="\udfff")])
+
+
+def test_string_count_mismatch_raises_codec_error():
+    data = bytearray(encode(LearningPlanStep("t", "d", ["r1", "r2"], 3)))
+    # Claim one resource fewer than the string table holds.
+    struct.pack_into("<I", data, 4 + 5, 1)
+    with pytest.raises(CodecError):
+        decode(bytes(data))
+
+
+def test_truncated_record_raises_codec_error():
+    data = encode(make_plan())
+    with pytest.raises(CodecError):
+        decode(data[: len(data) // 2])
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from assistant import compaction
+from assistant.compaction import RetentionPolicy, compact_log
+from assistant.logger import ConversationLogger
+from assistant.models import ConversationMessage
+
+START = datetime(2026, 3, 1, 12, 0)
+POLICY = RetentionPolicy(max_age_days=3)
+NOW = START + timedelta(days=6)
+
+
+def message(day, content=None):
+    return ConversationMessage(role="user", content=content or f"day{day}", timestamp=START + timedelta(days=day))
+
+
+def contents(path):
+    return [m.content for m in ConversationLogger(path).load()]
+
+
+def test_appends_during_compaction_are_kept_for_compaction_safe_writers(tmp_path, monkeypatch):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path, compaction_safe=True)
+    logger.extend(message(day) for day in range(6))
+    real_copy = compaction._Compactor.copy
+    calls = []
+
+    def copy_then_append(self, *args, **kwargs):
+        copied = real_copy(self, *args, **kwargs)
+        if not calls:
+            logger.append(message(6, "during"))
+        calls.append(1)
+        return copied
+
+    monkeypatch.setattr(compaction._Compactor, "copy", copy_then_append)
+    result = compact_log(path, POLICY, now=NOW)
+    logger.append(message(7, "after"))
+    logger.close()
+
+    assert result.changed
+    assert contents(path) == ["day3", "day4", "day5", "during", "after"]
+
+
+def test_refuses_while_a_plain_logger_is_writing(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path)
+    logger.extend(message(day) for day in range(6))
+    before = path.read_bytes()
+
+    with pytest.raises(RuntimeError, match="compaction_safe"):
+        compact_log(path, POLICY, now=NOW)
+    assert path.read_bytes() == before
+
+    logger.close()
+    assert compact_log(path, POLICY, now=NOW).changed
+    assert contents(path) == ["day3", "day4", "day5"]
+
+
+def test_refuses_without_fcntl_unless_offline(tmp_path, monkeypatch):
+    path = tmp_path / "log.jsonl"
+    with ConversationLogger(path) as logger:
+        logger.extend(message(day) for day in range(6))
+    monkeypatch.setattr(compaction, "fcntl", None)
+
+    with pytest.raises(RuntimeError, match="offline=True"):
+        compact_log(path, POLICY, now=NOW)
+    assert compact_log(path, POLICY, now=NOW, offline=True).changed
+    assert contents(path) == ["day3", "day4", "day5"]
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from assistant.conversation_store import INDEX_NAME, PartitionedConversationStore
+from assistant.models import ConversationMessage
+
+
+def message(session_id, i):
+    return ConversationMessage(
+        role="user", content=f"{session_id}-{i}", timestamp=datetime(2026, 3, 1, 12, i), session_id=session_id
+    )
+
+
+def test_sessions_round_trip_in_append_order(tmp_path):
+    store = PartitionedConversationStore(tmp_path)
+    store.extend([message("a", 0), message("b", 1), message("a", 2)])
+    store.append(message("a", 3))
+
+    assert [m.content for m in store.load_session("a")] == ["a-0", "a-2", "a-3"]
+    assert sorted(store.session_ids()) == ["a", "b"]
+
+
+def test_corrupt_index_line_is_skipped_and_counted(tmp_path):
+    store = PartitionedConversationStore(tmp_path)
+    store.append(message("a", 0))
+    with (store.partition_dir("a") / INDEX_NAME).open("ab") as fh:
+        fh.write(b"garbage without tabs\n")
+    store.append(message("a", 1))
+
+    reader = PartitionedConversationStore(tmp_path)
+    assert [m.content for m in reader.load_session("a")] == ["a-0", "a-1"]
+    assert reader.bad_index_lines == 1
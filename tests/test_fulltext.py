@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from assistant.compaction import RetentionPolicy, compact_log
+from assistant.fulltext import FullTextIndex
+from assistant.logger import ConversationLogger
+from assistant.models import ConversationMessage
+
+START = datetime(2026, 3, 1, 12, 0)
+
+
+def message(minute, content):
+    return ConversationMessage(role="user", content=content, timestamp=START + timedelta(minutes=minute))
+
+
+def contents(messages):
+    return [m.content for m in messages]
+
+
+def test_search_indexes_in_memory_and_update_writes_one_segment(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path)
+    logger.extend([message(0, "pandas error"), message(1, "numpy install")])
+    index = FullTextIndex(path)
+
+    assert contents(index.search("pandas OR numpy -install")) == ["pandas error"]
+    logger.append(message(2, "pandas groupby"))
+    assert contents(index.search("pandas")) == ["pandas error", "pandas groupby"]
+    assert index.segments == []
+
+    assert index.update() == 3
+    assert [seg.docs for seg in index.segments] == [3]
+    assert contents(FullTextIndex(path).search("pandas", refresh=False)) == ["pandas error", "pandas groupby"]
+
+
+def test_undecodable_lines_are_skipped_and_counted(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path)
+    logger.append(message(0, "before"))
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write("{not json\n")
+    logger.append(message(1, "after"))
+
+    index = FullTextIndex(path)
+    assert index.update() == 2
+    assert index.bad_records == 1
+    assert contents(index.search("after")) == ["after"]
+    assert FullTextIndex(path).bad_records == 1
+
+
+def test_merging_keeps_segments_within_max_segment_docs(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path)
+    index = FullTextIndex(path, max_segment_docs=4, max_segments=2)
+    for i in range(10):
+        logger.append(message(i, f"word{i} common"))
+        index.update()
+
+    docs = [seg.docs for seg in index.segments]
+    assert sum(docs) == len(index) == 10
+    assert max(docs) <= 4
+    assert len(docs) <= 3
+    assert contents(index.search("common", refresh=False)) == [f"word{i} common" for i in range(10)]
+    assert sorted(p.name for p in index.index_dir.glob("*.fts")) == sorted(seg.name for seg in index.segments)
+
+
+def test_search_without_refresh_reindexes_a_compacted_log(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path, compaction_safe=True)
+    logger.extend(message(60 * 24 * day, f"topic day{day}") for day in range(6))
+    index = FullTextIndex(path)
+    index.update()
+
+    compact_log(path, RetentionPolicy(max_age_days=3), now=START + timedelta(days=6))
+
+    assert contents(index.search("topic", refresh=False)) == ["topic day3", "topic day4", "topic day5"]
@@ -0,0 +1,109 @@
+import json
+
+from assistant.importer import ImportReport, import_profiles, iter_profiles, main, normalize_column
+from assistant.profile_store import FileProfileStore, SQLiteProfileStore
+
+
+def write_csv(path, *lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_csv_columns_are_normalized_mapped_and_joined(tmp_path):
+    source = tmp_path / "export.csv"
+    write_csv(
+        source,
+        "Employee ID,First Name,Surname,Skills,Hours per week,Cost Center",
+        "E1,Ada,Lovelace,\"python, sql\",6h,CC-9",
+    )
+
+    [profile] = list(iter_profiles(source))
+
+    assert normalize_column(" Hours per week ") == "hours_per_week"
+    assert profile.learner_id == "E1"
+    assert profile.name == "Ada Lovelace"
+    assert profile.interested_topics == ["python", "sql"]
+    assert profile.weekly_time_hours == 6
+
+
+def test_bad_rows_are_reported_with_their_row_numbers(tmp_path):
+    source = tmp_path / "export.csv"
+    write_csv(
+        source,
+        "learner_id,name,weekly_time_hours,dept",
+        "L1,Ada,5,x",
+        ",Nobody,5,x",
+        "L3,Bob,lots,x",
+        "L4,Short row",
+        "L5,,4,x",
+        "L6,Cy,3,x",
+    )
+    errors = []
+    report = ImportReport()
+
+    profiles = list(iter_profiles(source, report=report, on_error=errors.append))
+
+    assert [p.learner_id for p in profiles] == ["L1", "L6"]
+    assert [(e.row, e.learner_id) for e in errors] == [(2, None), (3, "L3"), (4, None), (5, "L5")]
+    assert "weekly_time_hours" in errors[1].message
+    assert (report.rows, report.failed) == (6, 4)
+
+
+def test_jsonl_rows_accept_lists_and_custom_column_maps(tmp_path):
+    source = tmp_path / "export.jsonl"
+    source.write_text(
+        "\n".join(
+            [
+                json.dumps({"uid": "U1", "name": "Ada", "topics": ["python", "pandas"], "phases": ["basics", "projects"]}),
+                "{not json",
+                json.dumps(["not", "an", "object"]),
+                "",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    errors = []
+
+    [profile] = list(iter_profiles(source, columns={"UID": "learner_id"}, on_error=errors.append))
+
+    assert profile.learner_id == "U1"
+    assert profile.interested_topics == ["python", "pandas"]
+    assert profile.phased_focus == ["basics", "projects"]
+    assert [e.row for e in errors] == [2, 3]
+
+
+def test_import_upserts_duplicates_and_caps_kept_errors(tmp_path):
+    source = tmp_path / "export.csv"
+    write_csv(
+        source,
+        "learner_id,name,goal",
+        "L1,Ada,SQL",
+        "L2,Bob,Pandas",
+        ",x,y",
+        ",x,y",
+        "L1,Ada L.,Statistics",
+    )
+    seen = []
+
+    with SQLiteProfileStore(tmp_path / "profiles.db") as store:
+        store.put_many(list(iter_profiles(source))[1:2])  # L2 from an earlier import
+        report = import_profiles(source, store, batch_size=2, on_error=seen.append, max_errors=1)
+        assert len(store) == 2
+        assert store.get("L1").learning_goal == "Statistics"
+
+    assert (report.rows, report.imported, report.duplicates, report.failed) == (5, 3, 2, 2)
+    assert len(report.errors) == 1
+    assert len(seen) == 2
+
+
+def test_cli_writes_profiles_and_rejected_rows(tmp_path, capsys):
+    source = tmp_path / "export.csv"
+    write_csv(source, "learner_id,name", "L1,Ada", ",Nobody")
+    errors = tmp_path / "errors.jsonl"
+
+    assert main([str(source), str(tmp_path / "profiles.jsonl"), "--errors", str(errors)]) == 0
+
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary["imported"], summary["failed"]) == (1, 1)
+    assert [json.loads(line)["row"] for line in errors.read_text(encoding="utf-8").splitlines()] == [2]
+    with FileProfileStore(tmp_path / "profiles.jsonl") as store:
+        assert store.get("L1").name == "Ada"
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import pytest
+
+from assistant.log_loader import LoadReport, iter_message_batches, map_reduce_log
+from assistant.logger import encode_message
+from assistant.models import ConversationMessage
+
+
+def count_messages(messages):
+    return len(messages)
+
+
+def add(a, b):
+    return a + b
+
+
+@pytest.fixture
+def log_with_bad_lines(tmp_path):
+    path = tmp_path / "log.jsonl"
+    good = [encode_message(ConversationMessage("user", f"m{i}", datetime(2026, 3, 1, 12, i))) for i in range(6)]
+    data = good[0] + good[1] + b"{torn record\n" + good[2] + good[3] + b'{"role": "user"}\n' + good[4] + good[5]
+    path.write_bytes(data + b'{"in flight')
+    return path, len(good[0] + good[1])
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_bad_lines_are_skipped_and_reported(log_with_bad_lines, use_mmap):
+    path, first_bad = log_with_bad_lines
+    report = LoadReport()
+
+    batches = list(iter_message_batches(path, workers=1, chunk_bytes=64, use_mmap=use_mmap, report=report))
+
+    assert [m.content for batch in batches for m in batch] == [f"m{i}" for i in range(6)]
+    assert report.records == 6
+    assert report.bad_records == 2
+    assert report.bad_offsets[0] == first_bad
+
+
+def test_map_reduce_survives_bad_lines_across_workers(log_with_bad_lines):
+    path, _ = log_with_bad_lines
+    report = LoadReport()
+
+    assert map_reduce_log(path, count_messages, add, workers=2, chunk_bytes=64, report=report) == 6
+    assert report.bad_records == 2
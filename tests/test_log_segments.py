@@ -0,0 +1,27 @@
+from datetime import datetime
+from pathlib import Path
+
+from assistant.log_segments import SegmentedConversationLogger
+from assistant.models import ConversationMessage
+
+
+def message(i):
+    return ConversationMessage(role="user", content=f"m{i}", timestamp=datetime(2026, 3, 1, 12, i))
+
+
+def test_reader_follows_a_segment_compressed_after_the_manifest_was_read(tmp_path, monkeypatch):
+    logger = SegmentedConversationLogger(tmp_path / "logs", compress=False)
+    logger.extend(message(i) for i in range(3))
+    logger.rotate()
+    stale = logger.segments()
+    assert not stale[0].compressed
+
+    logger._compress_segment(logger._segments[0])
+    assert not (tmp_path / "logs" / stale[0].name).exists()
+    logger.segments = lambda start=None, end=None: stale
+    # The plain file still looks present, as if it were unlinked between a check and the open.
+    real_exists = Path.exists
+    monkeypatch.setattr(Path, "exists", lambda p: p.name == stale[0].name or real_exists(p))
+
+    assert [m.content for m in logger.iter_messages()] == ["m0", "m1", "m2"]
+    logger.close()
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+from assistant.compaction import RetentionPolicy, compact_log
+from assistant.logger import ConversationLogger
+from assistant.models import ConversationMessage
+
+START = datetime(2026, 3, 1, 12, 0)
+
+
+def message(minute, content=None, tz=None):
+    ts = START + timedelta(minutes=minute)
+    if tz is not None:
+        ts = ts.replace(tzinfo=timezone.utc).astimezone(tz)
+    return ConversationMessage(role="user", content=content or f"m{minute}", timestamp=ts)
+
+
+def test_since_accepts_aware_and_naive_times(tmp_path):
+    logger = ConversationLogger(tmp_path / "log.jsonl", index_every=2)
+    logger.extend(message(i) for i in range(6))
+
+    aware = (START + timedelta(minutes=3)).replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+    assert [m.content for m in logger.since(aware)] == ["m3", "m4", "m5"]
+    assert [m.content for m in logger.since(START + timedelta(minutes=4))] == ["m4", "m5"]
+
+
+def test_since_handles_logs_mixing_aware_and_naive_records(tmp_path):
+    logger = ConversationLogger(tmp_path / "log.jsonl", index_every=2)
+    logger.extend([message(0), message(1, tz=timezone(timedelta(hours=-5))), message(2), message(3, tz=timezone.utc)])
+
+    assert logger.refresh_index()["monotonic"]
+    assert [m.content for m in logger.since(START + timedelta(minutes=1))] == ["m1", "m2", "m3"]
+
+
+def test_cached_index_is_rebuilt_after_compaction_and_regrowth(tmp_path):
+    path = tmp_path / "log.jsonl"
+    logger = ConversationLogger(path, index_every=2, compaction_safe=True)
+    logger.extend(message(60 * 24 * day, content=f"old{day}") for day in range(10))
+    assert logger.page(0, 1)[0].content == "old0"
+
+    compact_log(path, RetentionPolicy(max_age_days=5), now=START + timedelta(days=10))
+    logger.extend(message(60 * 24 * 10 + i, content=f"new{i}-" + "x" * 40) for i in range(10))
+
+    assert [m.content for m in logger.page(0, 3)] == ["old5", "old6", "old7"]
+    assert [m.content for m in logger.since(START + timedelta(days=9))][:2] == ["old9", "new0-" + "x" * 40]
+    assert logger.refresh_index()["records"] == 15
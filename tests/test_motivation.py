@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from assistant.models import UserProfile
+from assistant.motivation import TemplateHistory, build_motivation_message, build_motivation_messages_batch
+
+DAY = date(2026, 3, 2)
+
+
+def profile(i, learner_id=True):
+    return UserProfile(
+        name=f"Learner {i}",
+        learning_goal="",
+        interested_topics=[],
+        current_level="",
+        learner_id=f"L{i}" if learner_id else None,
+    )
+
+
+def test_batch_matches_single_messages_with_and_without_learner_ids():
+    profiles = [profile(i, learner_id=i % 2 == 0) for i in range(20)]
+
+    assert build_motivation_messages_batch(profiles, on_date=DAY) == [
+        build_motivation_message(p, on_date=DAY) for p in profiles
+    ]
+
+
+def test_history_allocates_lazily_and_round_trips(tmp_path):
+    history = TemplateHistory(slots=64)
+    assert len(history._stamps) == 0
+    assert history.recent("L1", DAY) == []
+
+    first = build_motivation_message(profile(1), on_date=DAY, history=history)
+    assert len(history._stamps) == 64 * 3
+    history.save(tmp_path / "history.bin")
+
+    loaded = TemplateHistory.load(tmp_path / "history.bin")
+    assert loaded.recent("L1", DAY + timedelta(days=1)) == history.recent("L1", DAY + timedelta(days=1))
+    assert loaded.recent("L1", DAY + timedelta(days=1))
+    assert build_motivation_message(profile(1), on_date=DAY, history=loaded) == first
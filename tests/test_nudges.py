@@ -0,0 +1,82 @@
+import json
+from datetime import date
+
+import pytest
+
+from assistant import nudges
+from assistant.batch import Checkpoint
+from assistant.nudges import append_outbox, run_nudges
+
+
+def write_learners(path, count):
+    rows = [
+        {"learner_id": f"L{i}", "name": f"Learner {i}", "progress_percent": 10 * (i % 10), "last_action": "quiz"}
+        for i in range(count)
+    ]
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def read_outbox(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_consecutive_days_keep_earlier_outbox_rows(tmp_path):
+    learners = tmp_path / "learners.jsonl"
+    outbox = tmp_path / "outbox.jsonl"
+    write_learners(learners, 7)
+
+    first = run_nudges(learners, outbox, day=date(2026, 3, 1), workers=1, chunk_size=3)
+    append_outbox(outbox, [("manual", "2026-03-01", "Welcome back!")])
+    second = run_nudges(learners, outbox, day=date(2026, 3, 2), workers=1, chunk_size=3)
+
+    assert first.written == second.written == 7
+    rows = read_outbox(outbox)
+    assert [r["day"] for r in rows] == ["2026-03-01"] * 8 + ["2026-03-02"] * 7
+    assert rows[7]["learner_id"] == "manual"
+
+
+def test_resume_never_truncates_rows_appended_by_other_writers(tmp_path, monkeypatch):
+    learners = tmp_path / "learners.jsonl"
+    outbox = tmp_path / "outbox.jsonl"
+    write_learners(learners, 7)
+    real_write_all = nudges._write_all
+    writes = []
+
+    def crash_after_second_chunk(fd, data):
+        real_write_all(fd, data)
+        writes.append(data)
+        if len(writes) == 2:
+            raise KeyboardInterrupt  # written, but the checkpoint never heard of it
+
+    monkeypatch.setattr(nudges, "_write_all", crash_after_second_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        run_nudges(learners, outbox, day=date(2026, 3, 2), workers=1, chunk_size=3)
+    monkeypatch.setattr(nudges, "_write_all", real_write_all)
+    append_outbox(outbox, [("scheduled", "2026-03-02", "Time for your 08:00 lesson")])
+    with outbox.open("ab") as out:
+        out.write(b'{"learner_id": "torn')  # another writer crashed mid-line
+
+    report = run_nudges(learners, outbox, day=date(2026, 3, 2), workers=1, chunk_size=3)
+
+    assert report.written == 4  # the chunk that landed before the crash is committed by this run
+    lines = outbox.read_text(encoding="utf-8").splitlines()
+    assert lines[7] == '{"learner_id": "torn'
+    rows = [json.loads(line) for line in lines[:7] + lines[8:]]
+    assert [r["learner_id"] for r in rows] == [f"L{i}" for i in range(6)] + ["scheduled", "L6"]
+
+
+def test_file_sources_resume_at_the_checkpoint_offset(tmp_path):
+    learners = tmp_path / "learners.jsonl"
+    outbox = tmp_path / "outbox.jsonl"
+    write_learners(learners, 4)
+    with learners.open("a", encoding="utf-8") as fh:
+        fh.write("{not json\n")
+    checkpoint = Checkpoint(tmp_path / "outbox.jsonl.2026-03-02.ckpt", records=2)
+    checkpoint.input_offset = len(b"".join(learners.read_bytes().splitlines(keepends=True)[:2]))
+    checkpoint.save()
+
+    report = run_nudges(learners, outbox, day=date(2026, 3, 2), workers=1, chunk_size=2)
+
+    assert (report.records, report.written, report.skipped) == (3, 2, 1)
+    assert [r["learner_id"] for r in read_outbox(outbox)] == ["L2", "L3"]
+    assert Checkpoint.load(checkpoint.path).input_offset == learners.stat().st_size
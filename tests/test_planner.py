@@ -0,0 +1,148 @@
+from assistant.models import Course, UserProfile
+from assistant.optimizer import select_courses_within_budget
+from assistant.plan_cache import PlanCache
+from assistant.planner import build_learning_plan, build_weekly_plan
+
+
+def make_profile(weekly=None, weeks=None, topics=("python",), goal="Learn data analysis"):
+    return UserProfile(
+        name="Ada",
+        learning_goal=goal,
+        interested_topics=list(topics),
+        current_level="beginner",
+        weekly_time_hours=weekly,
+        timeframe_weeks=weeks,
+    )
+
+
+def make_course(title, topics, hours, level="beginner"):
+    return Course(
+        title=title,
+        provider="Example",
+        url=f"https://example.com/{title.lower().replace(' ', '-')}",
+        topics=list(topics),
+        level=level,
+        summary="",
+        est_hours=hours,
+    )
+
+
+COURSES = [
+    make_course("Python Basics", ["python"], 10),
+    make_course("Pandas Deep Dive", ["python", "pandas"], 30, level="intermediate"),
+    make_course("SQL Intro", ["sql"], 8),
+]
+
+
+def course_titles(plan):
+    return [step.title for step in plan.steps[1:-1]]
+
+
+def test_no_budget_keeps_every_course():
+    plan = build_learning_plan(make_profile(), COURSES, fit_to_budget=True)
+
+    assert course_titles(plan) == [f"Step {i + 1}: {c.title}" for i, c in enumerate(COURSES)]
+
+
+def test_budget_keeps_only_courses_that_fit_and_notes_the_rest():
+    plan = build_learning_plan(make_profile(weekly=7, weeks=4, topics=("python", "sql")), COURSES, fit_to_budget=True)
+
+    assert course_titles(plan) == ["Step 1: SQL Intro", "Step 2: Python Basics"]
+    assert any("1 of 3 suggested courses were left out" in note for note in plan.notes)
+
+
+def test_budget_below_fixed_steps_plans_no_courses_and_says_so():
+    plan = build_learning_plan(make_profile(weekly=2, weeks=4), COURSES, fit_to_budget=True)
+
+    assert course_titles(plan) == []
+    assert [step.title for step in plan.steps] == ["Step 0: Clarify success", "Step final: Apply your skills"]
+    assert any("only covers the warm-up and final project" in note for note in plan.notes)
+
+
+def test_budget_equal_to_fixed_steps_plans_no_courses():
+    plan = build_learning_plan(make_profile(weekly=9, weeks=1), COURSES, fit_to_budget=True)
+
+    assert course_titles(plan) == []
+    assert any("9-hour budget" in note for note in plan.notes)
+
+
+def test_learner_without_topics_gets_courses_in_order_while_they_fit():
+    profile = make_profile(topics=(), goal="Go")
+
+    assert select_courses_within_budget(profile, COURSES, budget_hours=20) == [COURSES[0], COURSES[2]]
+
+
+def test_plan_cache_separates_learners_by_budget():
+    cache = PlanCache()
+    small = cache.learning_plan(make_profile(weekly=2, weeks=4), COURSES, fit_to_budget=True)
+    large = cache.learning_plan(make_profile(weekly=20, weeks=4), COURSES, fit_to_budget=True)
+
+    assert course_titles(small) == []
+    assert course_titles(large) == ["Step 1: Python Basics"]
+    assert cache.stats()["misses"] == 2
+
+
+def test_weekly_plan_cycles_steps_and_matches_list_form():
+    plan = build_learning_plan(make_profile(), COURSES[:1])
+    weekly = build_weekly_plan(plan, weekly_time_hours=5, timeframe_weeks=4)
+
+    assert len(weekly) == 4
+    assert [week.title for week in weekly] == [
+        "Week 1: Step 0: Clarify success",
+        "Week 2: Step 1: Python Basics",
+        "Week 3: Step final: Apply your skills",
+        "Week 4: Step 0: Clarify success",
+    ]
+    assert [step.title for step in weekly.to_steps()] == [week.title for week in weekly]
+    assert weekly[-1].resources == ()
+    assert isinstance(weekly.to_steps()[1].resources, list)
+
+
+def test_weekly_plan_ignores_later_edits_to_the_source_plan():
+    plan = build_learning_plan(make_profile(), COURSES[:1])
+    weekly = build_weekly_plan(plan, timeframe_weeks=3)
+    plan.steps[1].resources.append("https://example.com/extra")
+
+    assert weekly[1].resources == ("https://example.com/python-basics",)
+
+
+def test_zero_weeks_falls_back_to_plan_length():
+    plan = build_learning_plan(make_profile(), COURSES)
+    weekly = build_weekly_plan(plan, timeframe_weeks=0)
+
+    assert len(weekly) == len(plan.steps)
+
+
+def test_negative_weeks_give_an_empty_plan():
+    plan = build_learning_plan(make_profile(), COURSES)
+    weekly = build_weekly_plan(plan, timeframe_weeks=-3)
+
+    assert len(weekly) == 0
+    assert list(weekly) == []
+    assert weekly.to_steps() == []
+    assert weekly[:] == []
+
+
+def test_plan_cache_shares_steps_between_learners():
+    cache = PlanCache()
+    first_steps, _ = cache.shared_plan(make_profile(goal="Learn SQL"), COURSES)
+    second_steps, _ = cache.shared_plan(make_profile(goal="Learn pandas"), COURSES)
+
+    assert first_steps[0].description != second_steps[0].description
+    assert all(a is b for a, b in zip(first_steps[1:], second_steps[1:]))
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+def test_plan_cache_matches_uncached_plan_and_copies_on_request():
+    cache = PlanCache()
+    profile = make_profile(weekly=7, weeks=4, topics=("python", "sql"))
+
+    cached = cache.learning_plan(profile, COURSES, fit_to_budget=True)
+    assert cached == build_learning_plan(profile, COURSES, fit_to_budget=True)
+
+    cached.steps[1].resources.append("https://example.com/extra")
+    again = cache.learning_plan(profile, COURSES, fit_to_budget=True)
+    assert "https://example.com/extra" not in again.steps[1].resources
+    assert cache.weekly_plan(profile, COURSES, fit_to_budget=True).to_steps() == build_weekly_plan(
+        again, weekly_time_hours=7, timeframe_weeks=4
+    ).to_steps()
@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+
+from assistant.models import UserProfile
+from assistant.profile_store import FileProfileStore, SQLiteProfileStore, open_profile_store
+
+
+def profile(learner_id, level="beginner", topics=("python",), name=None):
+    return UserProfile(
+        name=name or learner_id,
+        learning_goal="Learn data analysis",
+        interested_topics=list(topics),
+        current_level=level,
+        learner_id=learner_id,
+    )
+
+
+@pytest.fixture(params=["profiles.db", "profiles.jsonl"])
+def store(request, tmp_path):
+    with open_profile_store(tmp_path / request.param) as store:
+        yield store
+
+
+def test_put_find_delete_and_change_feed(store):
+    store.put_many([profile("L1"), profile("L2", level="Advanced", topics=("SQL",)), profile("L3")])
+    seq = store.put(profile("L1", topics=("pandas",), name="Ada"))
+    assert store.delete("L3")
+    assert not store.delete("L3")
+
+    assert len(store) == 2 and "L1" in store and "L3" not in store
+    assert store.get("L1").name == "Ada"
+    assert [p.learner_id for p in store.find(level="advanced", topic="sql")] == ["L2"]
+    assert store.find(topic="python") == []
+    assert [(c.learner_id, c.deleted) for c in store.changes(seq - 1)] == [("L1", False), ("L3", True)]
+
+
+def test_sqlite_reads_wait_for_the_lock(tmp_path):
+    with SQLiteProfileStore(tmp_path / "profiles.db") as store:
+        store.put(profile("L1"))
+        results = []
+        reader = threading.Thread(target=lambda: results.extend([len(store), store.get("L1"), store.find()]))
+
+        with store._lock:
+            reader.start()
+            reader.join(0.2)
+            assert reader.is_alive() and results == []
+        reader.join(5)
+
+        assert results[0] == 1
+        assert results[1].learner_id == "L1"
+
+
+def test_change_feed_survives_a_compaction_by_another_instance(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    reader = FileProfileStore(path)
+    reader.put_many([profile("L1"), profile("L2"), profile("L1", name="Ada")])
+
+    with FileProfileStore(path) as writer:
+        writer.put(profile("L3"))
+        writer.compact()
+
+    changes = reader.changes()
+    reader.close()
+    assert [(c.seq, c.learner_id) for c in changes] == [(2, "L2"), (3, "L1")]
+    with FileProfileStore(path) as reopened:
+        assert [c.learner_id for c in reopened.changes()] == ["L2", "L1", "L3"]
+
+
+def test_compact_keeps_latest_lines_and_tombstones(tmp_path):
+    path = tmp_path / "profiles.jsonl"
+    with FileProfileStore(path) as store:
+        store.put_many([profile("L1"), profile("L2"), profile("L1", name="Ada")])
+        store.delete("L2")
+        store.compact()
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+        assert store.get("L1").name == "Ada"
+        assert [(c.learner_id, c.deleted) for c in store.changes()] == [("L1", False), ("L2", True)]
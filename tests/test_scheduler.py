@@ -0,0 +1,81 @@
+import json
+from datetime import date, datetime, timezone
+
+from assistant import scheduler as scheduler_module
+from assistant.scheduler import NudgeScheduler
+
+MONDAY_8AM = datetime(2026, 3, 2, 8, 0, tzinfo=timezone.utc).timestamp()
+DAY = 24 * 3600
+
+
+def collect(batches):
+    return lambda batch: batches.extend(batch)
+
+
+def test_passes_are_journaled_and_replayed_without_rewriting_the_snapshot(tmp_path):
+    state = tmp_path / "scheduler.json"
+    scheduler = NudgeScheduler(state, snapshot_every=10)
+    for i in range(3):
+        scheduler.schedule(f"L{i}", f"Learner {i}", "UTC", 8, 0, now=MONDAY_8AM - 60)
+    scheduler.save()
+    snapshot = state.read_bytes()
+
+    sent = []
+    scheduler.cancel("L2")
+    assert scheduler.run_due(collect(sent), now=MONDAY_8AM) == 2
+    assert state.read_bytes() == snapshot
+    journal = [json.loads(line) for line in scheduler.journal_path.read_text(encoding="utf-8").splitlines()]
+    assert sorted(row[0] for row in journal[0]["put"]) == ["L0", "L1"]
+    assert journal[0]["cancel"] == ["L2"]
+
+    restored = NudgeScheduler(state, snapshot_every=10)
+    assert len(restored) == 2
+    assert restored.next_due() == MONDAY_8AM + DAY
+    assert restored.run_due(collect(sent), now=MONDAY_8AM + 60) == 0
+
+
+def test_snapshot_every_commits_empties_the_journal(tmp_path):
+    state = tmp_path / "scheduler.json"
+    scheduler = NudgeScheduler(state, snapshot_every=2)
+    scheduler.schedule("L0", "Learner 0", now=MONDAY_8AM - 60)
+    sent = []
+    for day in range(4):
+        scheduler.run_due(collect(sent), now=MONDAY_8AM + day * DAY)
+
+    assert len(sent) == 4
+    assert json.loads(state.read_text(encoding="utf-8"))["generation"] >= 2
+    assert NudgeScheduler(state).next_due() == MONDAY_8AM + 4 * DAY
+
+
+def test_torn_journal_line_is_dropped_and_that_pass_resent(tmp_path):
+    state = tmp_path / "scheduler.json"
+    scheduler = NudgeScheduler(state)
+    scheduler.schedule("L0", "Learner 0", now=MONDAY_8AM - 60)
+    scheduler.save()
+    scheduler.run_due(collect([]), now=MONDAY_8AM)
+    with scheduler.journal_path.open("ab") as fh:
+        fh.write(b'{"generation":1,"cur')
+
+    restored = NudgeScheduler(state)
+    sent = []
+    assert restored.run_due(collect(sent), now=MONDAY_8AM + DAY) == 1
+    assert [n.local_date for n in sent] == [date(2026, 3, 3)]
+    assert NudgeScheduler(state).next_due() == MONDAY_8AM + 2 * DAY
+
+
+def test_rescheduling_from_the_learner_file_keeps_missed_deadlines(tmp_path, monkeypatch):
+    state = tmp_path / "scheduler.json"
+    learners = tmp_path / "learners.csv"
+    outbox = tmp_path / "outbox.jsonl"
+    learners.write_text("learner_id,name,timezone,hour,minute\nL0,Ada,UTC,8,0\n", encoding="utf-8")
+
+    monkeypatch.setattr(scheduler_module.time, "time", lambda: MONDAY_8AM - 60)
+    scheduler_module.main([str(state), str(outbox), "--learners", str(learners), "--once"])
+    assert not outbox.exists()
+
+    # Down over the deadline; restarting with the learner file must still send it.
+    monkeypatch.setattr(scheduler_module.time, "time", lambda: MONDAY_8AM + 600)
+    scheduler_module.main([str(state), str(outbox), "--learners", str(learners), "--once"])
+
+    rows = [json.loads(line) for line in outbox.read_text(encoding="utf-8").splitlines()]
+    assert [(r["learner_id"], r["day"]) for r in rows] == [("L0", "2026-03-02")]
@@ -0,0 +1,87 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from assistant import sqlite_store
+from assistant.models import ConversationMessage
+from assistant.sqlite_store import SQLiteConversationStore, import_jsonl
+
+START = datetime(2026, 3, 1, 12, 0)
+PLUS_TWO = timezone(timedelta(hours=2))
+
+
+def record(i, ts):
+    return {"role": "user", "content": f"m{i}", "timestamp": ts.isoformat(), "session_id": "s1"}
+
+
+def test_time_filters_compare_instants_across_offsets(tmp_path):
+    store = SQLiteConversationStore(tmp_path / "log.sqlite3")
+    store.extend(
+        [
+            # 13:30+02:00 is 11:30 UTC, earlier than the naive (UTC) 12:00 below.
+            ConversationMessage("user", "early", datetime(2026, 3, 1, 13, 30, tzinfo=PLUS_TWO)),
+            ConversationMessage("user", "noon", START),
+            ConversationMessage("user", "late", datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)),
+        ]
+    )
+
+    assert [m.content for m in store.query(start=START)] == ["noon", "late"]
+    assert [m.content for m in store.query(end=datetime(2026, 3, 1, 14, 0, tzinfo=PLUS_TWO))] == ["early", "noon"]
+    assert store.query()[0].timestamp == datetime(2026, 3, 1, 13, 30, tzinfo=PLUS_TWO)
+    store.close()
+
+
+def test_import_skips_and_reports_bad_lines(tmp_path):
+    log = tmp_path / "log.jsonl"
+    lines = [json.dumps(record(0, START)), "{torn", json.dumps({"role": "user"}), json.dumps(record(1, START))]
+    log.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    result = import_jsonl(log, tmp_path / "log.sqlite3")
+
+    assert result.imported == 2
+    assert result.bad_records == 2
+    assert result.bad_offsets == [len(lines[0]) + 1, len(lines[0]) + len(lines[1]) + 2]
+    with SQLiteConversationStore(tmp_path / "log.sqlite3") as store:
+        assert [m.content for m in store.query(session_id="s1", start=START)] == ["m0", "m1"]
+
+
+def test_failed_import_commits_nothing(tmp_path, monkeypatch):
+    log = tmp_path / "log.jsonl"
+    log.write_text("".join(json.dumps(record(i, START)) + "\n" for i in range(5)), encoding="utf-8")
+    real_chunked = sqlite_store.chunked
+
+    def failing_chunked(rows, size):
+        for n, batch in enumerate(real_chunked(rows, size)):
+            if n == 1:
+                raise OSError("read failed")
+            yield batch
+
+    monkeypatch.setattr(sqlite_store, "chunked", failing_chunked)
+    with pytest.raises(OSError):
+        import_jsonl(log, tmp_path / "log.sqlite3", batch_size=2)
+
+    with SQLiteConversationStore(tmp_path / "log.sqlite3") as store:
+        assert store.count() == 0
+
+
+def test_database_without_utc_column_is_upgraded(tmp_path):
+    db = tmp_path / "old.sqlite3"
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        CREATE TABLE messages (id INTEGER PRIMARY KEY, session_id TEXT, learner_id TEXT,
+                               role TEXT NOT NULL, content TEXT NOT NULL, timestamp TEXT NOT NULL);
+        CREATE INDEX messages_session_ts ON messages (session_id, timestamp);
+        """
+    )
+    conn.execute(
+        "INSERT INTO messages (session_id, learner_id, role, content, timestamp) VALUES (?, ?, ?, ?, ?)",
+        ("s1", None, "user", "old", "2026-03-01T13:30:00+02:00"),
+    )
+    conn.commit()
+    conn.close()
+
+    with SQLiteConversationStore(db) as store:
+        assert [m.content for m in store.query(end=START)] == ["old"]